@@ -0,0 +1,183 @@
+"""End-to-end throughput of ``AddMessageUseCase`` on recorded LM answers.
+
+Runs scripted multi-turn sessions (in-memory repository, real extraction
+services) concurrently and reports turns per second and turn latency. The
+LM is a cassette (``src/infrastructure/lm_cassette.py``):
+
+- ``--record PATH`` calls Gemini (``GEMINI_API_KEY``) and records every LM
+  call with its latency; ``--fake-lm`` records ``FakeLM`` instead, to try
+  the pipeline without quota.
+- ``--replay PATH`` answers from the recording only, offline, so runs
+  before and after a change are comparable; ``--replay-latency`` sleeps
+  for the recorded latencies, otherwise only the code's own time is left.
+
+The sessions depend on ``--sessions`` and ``--seed`` only: replay with the
+values used to record. Exits with status 1 if a request is missing from
+the cassette.
+
+Usage:
+    uv run python benchmarks/add_message.py --record cassettes/bench.jsonl
+    uv run python benchmarks/add_message.py --replay cassettes/bench.jsonl \\
+        --workers 8 --json results.json [--compare baseline.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+# litellm fetches the model cost map at import time otherwise.
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from benchmarks.load_test import _git_revision, percentile
+from src.domain.entities import ChatSession, MessageRole
+from src.infrastructure.repositories.in_memory_chat_repository import (
+    InMemoryChatRepository,
+)
+from src.infrastructure.services.dspy_extraction_service import (
+    DSPyPBIExtractionService,
+    DSPyProjectExtractionService,
+)
+from src.llm_client import GeminiService
+from src.use_cases.chat_session_use_cases import AddMessageUseCase
+
+REQUIREMENTS = (
+    "Vorrei aggiungere l'export CSV degli ordini.",
+    "Dobbiamo implementare anche le notifiche email per i clienti.",
+    "Bisogna aggiungere il filtro per data nella lista ordini.",
+    "Serve implementare il login con SSO aziendale.",
+    "Vorrei aggiungere la paginazione alla ricerca prodotti.",
+)
+PROJECT_TURN = "Il progetto è Bench"
+
+
+def build_scripts(sessions: int, seed: int) -> list[list[str]]:
+    """User turns of every session, the same for the same arguments."""
+    rng = random.Random(seed)
+    scripts = []
+    for _ in range(sessions):
+        turns = rng.sample(REQUIREMENTS, rng.randint(1, 3))
+        turns.insert(rng.randint(1, len(turns)), PROJECT_TURN)
+        scripts.append(turns)
+    return scripts
+
+
+def build_llm_client(args) -> GeminiService:
+    if args.replay:
+        return GeminiService(
+            "",
+            cassette_mode="replay",
+            cassette_path=str(args.replay),
+            replay_latency=args.replay_latency,
+        )
+    lm = None
+    if args.fake_lm:
+        from benchmarks.fakes import FakeLM
+
+        lm = FakeLM(latency_s=0.2, jitter_s=0.1, seed=args.seed)
+    return GeminiService(
+        os.environ.get("GEMINI_API_KEY", ""),
+        lm=lm,
+        cassette_mode="record",
+        cassette_path=str(args.record),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="AddMessageUseCase throughput.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--record", type=Path, help="Cassette to record to")
+    source.add_argument("--replay", type=Path, help="Cassette to replay")
+    parser.add_argument("--fake-lm", action="store_true", help="Record FakeLM")
+    parser.add_argument("--replay-latency", action="store_true")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--compare", type=Path, help="Previous results to compare with")
+    args = parser.parse_args()
+    logging.basicConfig(level="WARNING")
+
+    llm_client = build_llm_client(args)
+    repository = InMemoryChatRepository()
+    add_message = AddMessageUseCase(
+        repository=repository,
+        pbi_extraction=DSPyPBIExtractionService(llm_client),
+        project_extraction=DSPyProjectExtractionService(llm_client),
+    )
+
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def run_session(index: int, turns: list[str]) -> None:
+        # Fixed ids: assistant replies quote them, and the LM sees the replies.
+        chat_id = UUID(int=args.seed << 32 | index)
+        repository.save(ChatSession(chat_id=chat_id))
+        for turn in turns:
+            start = time.perf_counter()
+            add_message.execute(chat_id, MessageRole.USER, turn)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    scripts = build_scripts(args.sessions, args.seed)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for future in [
+            pool.submit(run_session, i, turns) for i, turns in enumerate(scripts)
+        ]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = [latency * 1000 for latency in latencies]
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "config": {k: str(v) for k, v in vars(args).items()},
+        },
+        "turns": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(len(latencies) / elapsed, 3),
+        "mean_ms": round(statistics.fmean(latencies_ms), 2),
+        "p50_ms": round(percentile(latencies_ms, 0.50), 2),
+        "p95_ms": round(percentile(latencies_ms, 0.95), 2),
+        "p99_ms": round(percentile(latencies_ms, 0.99), 2),
+        "cassette_misses": getattr(llm_client.lm, "misses", 0),
+    }
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print(f"{'':<14}{'turns/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = [("run", results)] + ([("baseline", baseline)] if baseline else [])
+    for name, row in rows:
+        print(
+            f"{name:<14}{row['turns_per_s']:>10.2f}{row['p50_ms']:>10.1f}"
+            f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+        )
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if results["cassette_misses"]:
+        print(
+            f"{results['cassette_misses']} LM requests missing from the cassette",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Single-call versus chunked PBI extraction of a long meeting transcript.
+
+Builds a transcript of ``--turns`` speaker turns, a share of them stating a
+distinct requirement, and extracts its PBIs once in a single call and once
+in chunked mode, with ``FakeLM`` answering after a latency that grows with
+the length of its answer. The report has the latency, LM calls and PBIs of
+both runs and the set F1 of the chunked PBIs against the single-call ones.
+
+Exits with status 1 if the chunked PBIs differ from the single-call ones
+(F1 below ``--min-f1``), e.g. because the merge dropped or kept duplicates.
+
+Usage:
+    uv run python benchmarks/chunked_extraction.py [--turns 400] \\
+        [--chunk-tokens 2000] [--parallelism 4] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+# litellm fetches the model cost map at import time otherwise.
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from benchmarks.fakes import FakeLM
+from src.domain.entities import LMUsage
+from src.domain.pbi_matching import pbi_set_f1
+from src.extractors.chunking import split_text
+from src.extractors.profiles import estimate_tokens
+from src.infrastructure.services.dspy_extraction_service import (
+    DSPyPBIExtractionService,
+)
+from src.llm_client import GeminiService
+
+REQUIREMENTS = (
+    "Dobbiamo aggiungere l'export CSV degli ordini evasi",
+    "Serve un sistema di notifiche email per i ritardi di consegna",
+    "Vogliamo integrare il login aziendale con Azure Active Directory",
+    "Bisogna creare la paginazione nella ricerca prodotti",
+    "Dobbiamo implementare la firma digitale sulle fatture elettroniche",
+    "Serve un calendario condiviso per le ferie del reparto",
+    "Vogliamo integrare il magazzino con il gestionale dei fornitori",
+    "Dobbiamo aggiungere un filtro per data nello storico ticket",
+    "Bisogna creare una dashboard con il fatturato per regione",
+    "Serve l'archiviazione automatica dei contratti scaduti",
+    "Dobbiamo implementare i permessi per ruolo sulle anagrafiche",
+    "Vogliamo integrare i pagamenti con carta nel portale clienti",
+    "Bisogna creare un report mensile delle giacenze",
+    "Dobbiamo aggiungere la ricerca full-text nei documenti tecnici",
+    "Serve un'app mobile per le timbrature dei tecnici",
+    "Dobbiamo implementare il backup notturno del database",
+    "Vogliamo integrare la chat di supporto nel sito pubblico",
+    "Bisogna creare l'import massivo dei listini da Excel",
+    "Dobbiamo aggiungere l'autenticazione a due fattori",
+    "Serve la traduzione in inglese e tedesco dell'interfaccia",
+    "Dobbiamo implementare gli avvisi di scorta minima",
+    "Vogliamo integrare il corriere per il tracciamento delle spedizioni",
+    "Bisogna creare un questionario di soddisfazione post-vendita",
+    "Dobbiamo aggiungere la gestione dei resi con etichetta prepagata",
+    "Serve un registro delle modifiche per gli audit di qualità",
+    "Dobbiamo implementare la prenotazione delle sale riunioni",
+    "Vogliamo integrare la fatturazione con il sistema di interscambio",
+    "Bisogna creare una API pubblica per i partner commerciali",
+    "Dobbiamo aggiungere i grafici di andamento delle vendite",
+    "Serve la firma dei verbali di collaudo su tablet",
+    "Dobbiamo implementare la scadenza delle password ogni novanta giorni",
+    "Vogliamo integrare il CRM con la casella di posta commerciale",
+    "Bisogna creare la stampa delle etichette con codice a barre",
+    "Dobbiamo aggiungere la modalità scura all'applicazione",
+    "Serve un workflow di approvazione per le note spese",
+    "Dobbiamo implementare la geolocalizzazione degli interventi",
+    "Vogliamo integrare i sensori IoT delle celle frigorifere",
+    "Bisogna creare l'anonimizzazione dei dati per il GDPR",
+    "Dobbiamo aggiungere le promozioni a tempo sull'e-commerce",
+    "Serve l'esportazione in PDF dei preventivi",
+)
+CHATTER = (
+    "Ok, ci sono tutti?",
+    "Riprendiamo dal punto di prima.",
+    "Su questo ne parliamo la prossima settimana.",
+    "Non sono sicuro che sia una priorità.",
+    "Mandami pure le slide dopo la riunione.",
+    "Va bene, andiamo avanti.",
+)
+
+
+def build_transcript(turns: int, requirement_share: float, seed: int) -> str:
+    """Meeting turns, each requirement stated at most once."""
+    rng = random.Random(seed)
+    requirements = list(REQUIREMENTS)
+    rng.shuffle(requirements)
+    lines = []
+    for i in range(turns):
+        if requirements and rng.random() < requirement_share:
+            lines.append(f"user: {requirements.pop()}.")
+        else:
+            lines.append(f"user: {rng.choice(CHATTER)}")
+        if i % 12 == 11:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def run(service: DSPyPBIExtractionService, transcript: str) -> dict:
+    usage = LMUsage()
+    start = time.perf_counter()
+    pbis = service.extract_pbis(transcript, usage=usage)
+    return {
+        "latency_s": round(time.perf_counter() - start, 3),
+        "lm_calls": usage.calls,
+        "completion_tokens": usage.completion_tokens,
+        "pbis": pbis,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Chunked PBI extraction check.")
+    parser.add_argument("--turns", type=int, default=400)
+    parser.add_argument("--requirement-share", type=float, default=0.15)
+    parser.add_argument("--chunk-tokens", type=int, default=2000)
+    parser.add_argument("--overlap-tokens", type=int, default=100)
+    parser.add_argument("--parallelism", type=int, default=4)
+    parser.add_argument("--lm-latency", type=float, default=0.2)
+    parser.add_argument(
+        "--lm-latency-per-1k", type=float, default=1.0, help="Seconds per 1k tokens"
+    )
+    parser.add_argument("--min-f1", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    transcript = build_transcript(args.turns, args.requirement_share, args.seed)
+    lm = FakeLM(
+        latency_s=args.lm_latency,
+        jitter_s=0,
+        latency_per_1k_tokens_s=args.lm_latency_per_1k,
+    )
+    llm_client = GeminiService("fake", lm=lm)
+    single = run(DSPyPBIExtractionService(llm_client), transcript)
+    chunked = run(
+        DSPyPBIExtractionService(
+            llm_client,
+            chunk_tokens=args.chunk_tokens,
+            chunk_overlap_tokens=args.overlap_tokens,
+            max_parallel_chunks=args.parallelism,
+        ),
+        transcript,
+    )
+    f1 = pbi_set_f1(single["pbis"], chunked["pbis"])
+
+    results = {
+        "transcript_tokens": estimate_tokens(transcript),
+        "chunks": len(split_text(transcript, args.chunk_tokens, args.overlap_tokens)),
+        "f1": round(f1, 3),
+    }
+    print(
+        f"Transcript of {results['transcript_tokens']} tokens, "
+        f"{results['chunks']} chunks of at most {args.chunk_tokens}"
+    )
+    print(f"{'mode':<10}{'latency s':>11}{'LM calls':>10}{'tokens out':>12}{'PBIs':>6}")
+    for name, result in (("single", single), ("chunked", chunked)):
+        pbis = result.pop("pbis")
+        result["pbi_count"] = len(pbis)
+        results[name] = result
+        print(
+            f"{name:<10}{result['latency_s']:>11.2f}{result['lm_calls']:>10}"
+            f"{result['completion_tokens']:>12}{result['pbi_count']:>6}"
+        )
+    print(f"Chunked PBIs against single-call PBIs: F1 {results['f1']:.3f}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if f1 < args.min_f1:
+        print(f"F1 below {args.min_f1}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
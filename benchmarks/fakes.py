@@ -0,0 +1,451 @@
+"""Deterministic fake backends for benchmarks.
+
+- ``FakeLM``: a ``dspy.BaseLM`` that answers the extraction signatures with
+  deterministic output derived from the conversation, after a configurable
+  latency, optionally growing with the length of the answer. Plug it in through ``GeminiService(api_key, lm=FakeLM(...))``.
+- ``FakePromptCache``: a ``PromptPrefixCache`` that records the prompt
+  prefixes of each program, to check that they stay byte-stable, and marks
+  them for caching; ``FakeLM`` then reports the marked prefixes it has
+  already seen as cached prompt tokens, like a provider would.
+- ``FakeAzureDevOpsServer``: a local HTTP server implementing the subset of
+  the Azure DevOps REST API used by ``src.azdo_client``. Point the client at
+  it with ``AZDO_BASE_URL``.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import dspy
+
+from src.extractors.prompt_cache import (
+    PromptPrefixCache,
+    mark_cached_prefix,
+    message_text,
+    prefix_fingerprint,
+)
+
+# Heuristics used by FakeLM to "extract" from the conversation.
+PROJECT_PATTERN = re.compile(r"progetto\s+(?:è\s+)?([A-Za-z][\w-]+)", re.IGNORECASE)
+REQUIREMENT_PATTERN = re.compile(
+    r"\b(aggiung\w*|implement\w*|serv[eo]|vogliamo|dobbiamo|integr\w*|cre\w*)\b",
+    re.IGNORECASE,
+)
+SUMMARY_FIELD = re.compile(r"\[\[ ## summary ## \]\]\n(.*?)(?:\n\n\[\[ ## |\Z)", re.S)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def fake_project(conversation: str) -> str | None:
+    """Last project named by the user, if any."""
+    matches = [
+        m.group(1)
+        for line in conversation.splitlines()
+        if line.startswith("user:")
+        for m in PROJECT_PATTERN.finditer(line)
+    ]
+    return matches[-1] if matches else None
+
+
+def fake_pbis(conversation: str) -> list[dict[str, str]]:
+    """One PBI per user sentence that sounds like a requirement."""
+    pbis = []
+    for line in conversation.splitlines():
+        if not line.startswith("user:"):
+            continue
+        for sentence in re.split(r"[.;!?]\s*", line.removeprefix("user:")):
+            sentence = sentence.strip()
+            if not sentence or not REQUIREMENT_PATTERN.search(sentence):
+                continue
+            words = sentence.split()
+            pbis.append(
+                {
+                    "title": "Implementare " + " ".join(words[:8]),
+                    "description": f"{sentence}. Requisito emerso dalla conversazione.",
+                }
+            )
+    return pbis
+
+
+class FakeLM(dspy.BaseLM):
+    """Deterministic LM for the PBI and project extraction signatures."""
+
+    def __init__(
+        self,
+        latency_s: float = 0.5,
+        jitter_s: float = 0.1,
+        seed: int = 0,
+        latency_per_1k_tokens_s: float = 0.0,
+        model: str = "fake/extractor",
+        **kwargs,
+    ):
+        super().__init__(model=model, cache=False, **kwargs)
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        # Decoding time: real completions take longer the more they output.
+        self.latency_per_1k_tokens_s = latency_per_1k_tokens_s
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # Fingerprints of the prefixes marked cache_control seen so far.
+        self._cached_prefixes: set[str] = set()
+
+    def _sleep(self, completion_tokens: int) -> None:
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_s, self.jitter_s)
+        decoding = self.latency_per_1k_tokens_s * completion_tokens / 1000
+        time.sleep(max(0.0, self.latency_s + decoding + jitter))
+
+    def _answer(self, system: str, user: str) -> str:
+        match = SUMMARY_FIELD.search(user)
+        conversation = match.group(1) if match else user
+
+        sections = []
+        if "[[ ## reasoning ## ]]" in system:
+            sections.append(("reasoning", "Analizzo la conversazione."))
+        if "[[ ## pbi_list ## ]]" in system:
+            sections.append(("pbi_list", json.dumps(fake_pbis(conversation))))
+        if "[[ ## azdo_project ## ]]" in system:
+            project = fake_project(conversation)
+            sections.append(
+                ("azdo_project", json.dumps({"project": project} if project else None))
+            )
+        body = "\n\n".join(f"[[ ## {name} ## ]]\n{value}" for name, value in sections)
+        return f"{body}\n\n[[ ## completed ## ]]"
+
+    def _cached_tokens(self, messages: list[dict]) -> int:
+        """Tokens of the cache-marked prefix, if it was marked before."""
+        marked = [
+            i
+            for i, m in enumerate(messages)
+            if not isinstance(m["content"], str)
+            and any("cache_control" in block for block in m["content"])
+        ]
+        if not marked:
+            return 0
+        prefix_length = marked[-1] + 1
+        fingerprint = prefix_fingerprint(messages, prefix_length)
+        with self._lock:
+            hit = fingerprint in self._cached_prefixes
+            self._cached_prefixes.add(fingerprint)
+        if not hit:
+            return 0
+        return sum(_estimate_tokens(message_text(m)) for m in messages[:prefix_length])
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        messages = messages or [{"role": "user", "content": prompt}]
+        system = "\n".join(message_text(m) for m in messages if m["role"] == "system")
+        user = message_text(messages[-1])
+
+        text = self._answer(system, user)
+
+        # Honour the output limit like a real provider: cut the completion.
+        max_tokens = kwargs.get("max_tokens") or self.kwargs.get("max_tokens")
+        finish_reason = "stop"
+        if max_tokens and _estimate_tokens(text) > max_tokens:
+            text = text[: max_tokens * 4]
+            finish_reason = "length"
+        self._sleep(_estimate_tokens(text))
+
+        usage = {
+            "prompt_tokens": sum(_estimate_tokens(message_text(m)) for m in messages),
+            "completion_tokens": _estimate_tokens(text),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        cached_tokens = self._cached_tokens(messages)
+        if cached_tokens:
+            usage["prompt_tokens_details"] = {"cached_tokens": cached_tokens}
+        # dspy.LM reports usage to the active tracker itself; BaseLM does not.
+        if dspy.settings.usage_tracker is not None:
+            dspy.settings.usage_tracker.add_usage(self.model, usage)
+
+        return SimpleNamespace(
+            model=self.model,
+            usage=usage,
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content=text, tool_calls=None),
+                    finish_reason=finish_reason,
+                )
+            ],
+        )
+
+
+class FakePromptCache(PromptPrefixCache):
+    """Records the prompt prefix of every call and marks it for caching."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Distinct prefix fingerprints by program key: one each if stable.
+        self.prefixes: dict[str, set[str]] = {}
+        self.prefix_tokens: dict[str, int] = {}
+        self.calls = 0
+
+    def prepare(self, key: str, messages: list[dict], prefix_length: int) -> list[dict]:
+        fingerprint = prefix_fingerprint(messages, prefix_length)
+        with self._lock:
+            self.calls += 1
+            self.prefixes.setdefault(key, set()).add(fingerprint)
+            self.prefix_tokens[key] = sum(
+                _estimate_tokens(message_text(m)) for m in messages[:prefix_length]
+            )
+        return mark_cached_prefix(messages, prefix_length)
+
+    def unstable_keys(self) -> list[str]:
+        """Programs whose prefix changed between calls."""
+        return [key for key, prints in self.prefixes.items() if len(prints) > 1]
+
+
+# --- Fake Azure DevOps -----------------------------------------------------
+
+RESOURCE_AREAS_LOCATION = "e81700f7-3be2-46de-8624-2eb35882fcaa"
+WORK_ITEMS_CREATE_LOCATION = "62d3d110-0047-428c-ad3c-4fe872c91c74"
+WORK_ITEMS_LOCATION = "72c7ddf8-2cdc-4f60-90cd-ab71c14a399b"
+WIQL_LOCATION = "1a9c53f7-f243-4447-b110-35ef023636e4"
+WORK_ITEMS_BATCH_LOCATION = "908509b6-4248-4475-a1cd-829139ba419f"
+PROJECTS_LOCATION = "603fe2ac-9723-48b9-88ad-09305aa6c6e1"
+
+API_LOCATIONS = [
+    {
+        "id": RESOURCE_AREAS_LOCATION,
+        "area": "Location",
+        "resourceName": "ResourceAreas",
+        "routeTemplate": "_apis/{resource}/{areaId}",
+    },
+    {
+        "id": WORK_ITEMS_CREATE_LOCATION,
+        "area": "wit",
+        "resourceName": "workitems",
+        "routeTemplate": "{project}/_apis/{area}/{resource}/${type}",
+    },
+    {
+        "id": WORK_ITEMS_LOCATION,
+        "area": "wit",
+        "resourceName": "workItems",
+        "routeTemplate": "{project}/_apis/{area}/{resource}/{id}",
+    },
+    {
+        "id": WIQL_LOCATION,
+        "area": "wit",
+        "resourceName": "wiql",
+        "routeTemplate": "{project}/{team}/_apis/{area}/{resource}/{id}",
+    },
+    {
+        "id": WORK_ITEMS_BATCH_LOCATION,
+        "area": "wit",
+        "resourceName": "workitemsbatch",
+        "routeTemplate": "{project}/_apis/{area}/{resource}",
+    },
+    {
+        "id": PROJECTS_LOCATION,
+        "area": "core",
+        "resourceName": "projects",
+        "routeTemplate": "_apis/{resource}/{*projectId}",
+    },
+]
+
+WORK_ITEM_CREATE_PATH = re.compile(r"/(?P<project>[^/]+)/_apis/wit/workitems/\$")
+WORK_ITEM_PATH = re.compile(r"/(?P<project>[^/]+)/_apis/wit/workItems/(?P<id>\d+)")
+PROJECTS_PATH = re.compile(r"/_apis/projects\b")
+WIQL_PATH = re.compile(r"/_apis/wit/wiql\b")
+WORK_ITEMS_BATCH_PATH = re.compile(r"/_apis/wit/workitemsbatch\b")
+# The only WIQL clauses the fake evaluates (see azdo_client.query_backlog).
+WIQL_PROJECT = re.compile(r"\[System\.TeamProject\] = '((?:[^']|'')*)'")
+WIQL_CHANGED_SINCE = re.compile(r"\[System\.ChangedDate\] >= '([^']+)'")
+
+
+class FakeAzureDevOpsServer:
+    """Local HTTP server emulating the Azure DevOps work item API."""
+
+    def __init__(
+        self,
+        latency_s: float = 0.05,
+        host: str = "127.0.0.1",
+        projects: tuple[str, ...] = ("Bench",),
+    ):
+        self.latency_s = latency_s
+        self.projects = list(projects)
+        self.work_items: list[dict] = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FakeAzureDevOpsServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-azdo", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @staticmethod
+    def _fields(operations: list[dict]) -> dict:
+        return {
+            op["path"].removeprefix("/fields/"): op["value"]
+            for op in operations
+            if op.get("op") in ("add", "replace")
+        }
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(UTC).isoformat()
+
+    def _create_work_item(self, project: str, operations: list[dict]) -> dict:
+        fields = self._fields(operations)
+        with self._lock:
+            work_item = {
+                "id": len(self.work_items) + 1,
+                "rev": 1,
+                "fields": {
+                    "System.WorkItemType": "Product Backlog Item",
+                    "System.State": "New",
+                    **fields,
+                    "System.TeamProject": project,
+                    "System.ChangedDate": self._now(),
+                },
+            }
+            self.work_items.append(work_item)
+        return work_item
+
+    def _update_work_item(
+        self, work_item_id: int, operations: list[dict]
+    ) -> dict | None:
+        with self._lock:
+            if not 1 <= work_item_id <= len(self.work_items):
+                return None
+            work_item = self.work_items[work_item_id - 1]
+            work_item["fields"].update(self._fields(operations))
+            work_item["fields"]["System.ChangedDate"] = self._now()
+            work_item["rev"] += 1
+        return work_item
+
+    def _query(self, wiql: str) -> list[dict]:
+        project = WIQL_PROJECT.search(wiql)
+        since = WIQL_CHANGED_SINCE.search(wiql)
+        with self._lock:
+            work_items = list(self.work_items)
+        return [
+            {"id": item["id"]}
+            for item in work_items
+            if (
+                project is None
+                or item["fields"]["System.TeamProject"]
+                == project.group(1).replace("''", "'")
+            )
+            and (
+                since is None
+                or datetime.fromisoformat(item["fields"]["System.ChangedDate"])
+                >= datetime.fromisoformat(since.group(1))
+            )
+        ]
+
+    def _get_batch(self, ids: list[int]) -> list[dict]:
+        with self._lock:
+            return [
+                self.work_items[i - 1] for i in ids if 1 <= i <= len(self.work_items)
+            ]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, payload) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"null")
+
+            def do_OPTIONS(self):
+                locations = [
+                    {
+                        **location,
+                        "resourceVersion": 3,
+                        "minVersion": "1.0",
+                        "maxVersion": "7.1",
+                        "releasedVersion": "7.0",
+                    }
+                    for location in API_LOCATIONS
+                ]
+                self._reply(200, {"count": len(locations), "value": locations})
+
+            def do_GET(self):
+                if "/_apis/ResourceAreas" in self.path:
+                    # An empty list makes the SDK use the base URL for every area.
+                    self._reply(200, {"count": 0, "value": []})
+                    return
+                if PROJECTS_PATH.search(self.path):
+                    time.sleep(server.latency_s)
+                    query = parse_qs(urlsplit(self.path).query)
+                    skip = int(query.get("$skip", ["0"])[0])
+                    top = int(query.get("$top", [str(len(server.projects))])[0])
+                    projects = [
+                        {"id": str(i), "name": name}
+                        for i, name in enumerate(server.projects)
+                    ][skip : skip + top]
+                    self._reply(200, {"count": len(projects), "value": projects})
+                    return
+                self._reply(404, {"message": f"Not found: {self.path}"})
+
+            def do_POST(self):
+                if WIQL_PATH.search(self.path):
+                    time.sleep(server.latency_s)
+                    query = self._read_json()["query"]
+                    self._reply(200, {"workItems": server._query(query)})
+                    return
+                if WORK_ITEMS_BATCH_PATH.search(self.path):
+                    time.sleep(server.latency_s)
+                    work_items = server._get_batch(self._read_json()["ids"])
+                    self._reply(200, {"count": len(work_items), "value": work_items})
+                    return
+                match = WORK_ITEM_CREATE_PATH.search(self.path)
+                if not match:
+                    self._reply(404, {"message": f"Not found: {self.path}"})
+                    return
+                time.sleep(server.latency_s)
+                work_item = server._create_work_item(
+                    match.group("project"), self._read_json()
+                )
+                self._reply(200, work_item)
+
+            def do_PATCH(self):
+                match = WORK_ITEM_PATH.search(self.path)
+                if not match:
+                    self._reply(404, {"message": f"Not found: {self.path}"})
+                    return
+                time.sleep(server.latency_s)
+                work_item = server._update_work_item(
+                    int(match.group("id")), self._read_json()
+                )
+                if work_item is None:
+                    self._reply(404, {"message": f"Work item not found: {self.path}"})
+                    return
+                self._reply(200, work_item)
+
+        return Handler
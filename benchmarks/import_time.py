@@ -0,0 +1,158 @@
+"""Import-time benchmark for the service entry points.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter for
+each entry point and checks two things:
+
+- the cumulative import time stays under the entry point's budget;
+- modules that the entry point must not load eagerly (dspy, litellm, the
+  Azure DevOps SDK, ...) do not show up in the import trace.
+
+Usage:
+    uv run python benchmarks/import_time.py [--repeat 5] [--json out.json]
+
+Exits with status 1 when any entry point regresses.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("dspy", "litellm", "azure.devops", "msrest")
+
+# Lines look like: "import time:       431 |     394915 |   fastapi"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class EntryPoint:
+    """An importable entry point with its budget and forbidden imports."""
+
+    module: str
+    budget_ms: float
+    forbidden: tuple[str, ...] = HEAVY_MODULES
+
+
+@dataclass
+class EntryPointResult:
+    """Measured import cost of an entry point."""
+
+    module: str
+    budget_ms: float
+    median_ms: float
+    samples_ms: list[float] = field(default_factory=list)
+    forbidden_loaded: list[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return self.median_ms <= self.budget_ms and not self.forbidden_loaded
+
+
+ENTRY_POINTS = (
+    # The API must be able to answer /health before dspy is loaded.
+    EntryPoint("src.server_api", budget_ms=1500),
+    EntryPoint("src.api.dependencies", budget_ms=1500),
+    EntryPoint(
+        "src.domain.entities", budget_ms=250, forbidden=HEAVY_MODULES + ("fastapi",)
+    ),
+    EntryPoint(
+        "src.use_cases.chat_session_use_cases",
+        budget_ms=250,
+        forbidden=HEAVY_MODULES + ("fastapi",),
+    ),
+    # The standalone extractor CLI needs dspy, but not the API or the AzDO SDK.
+    EntryPoint(
+        "src.extractors.azdo",
+        budget_ms=10000,
+        forbidden=("fastapi", "azure.devops", "src.server_api"),
+    ),
+)
+
+
+def _matches(name: str, prefix: str) -> bool:
+    return name == prefix or name.startswith(prefix + ".")
+
+
+def measure_once(module: str) -> tuple[float, set[str]]:
+    """Import ``module`` in a fresh interpreter; return (ms, loaded modules)."""
+    env = {**os.environ, "LITELLM_LOCAL_MODEL_COST_MAP": "True"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    loaded: set[str] = set()
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        loaded.add(name)
+        # Top-level entries (single space of indent) add up to the total.
+        if len(indent) == 1:
+            total_us += int(cumulative)
+    return total_us / 1000, loaded
+
+
+def measure(entry_point: EntryPoint, repeat: int) -> EntryPointResult:
+    samples: list[float] = []
+    loaded: set[str] = set()
+    for _ in range(repeat):
+        elapsed_ms, loaded = measure_once(entry_point.module)
+        samples.append(round(elapsed_ms, 2))
+
+    forbidden_loaded = [
+        prefix
+        for prefix in entry_point.forbidden
+        if any(_matches(name, prefix) for name in loaded)
+    ]
+    return EntryPointResult(
+        module=entry_point.module,
+        budget_ms=entry_point.budget_ms,
+        median_ms=round(statistics.median(samples), 2),
+        samples_ms=samples,
+        forbidden_loaded=forbidden_loaded,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = [measure(ep, args.repeat) for ep in ENTRY_POINTS]
+
+    for result in results:
+        status = "OK  " if result.passed else "FAIL"
+        print(
+            f"{status} {result.module:<40} {result.median_ms:>9.1f} ms "
+            f"(budget {result.budget_ms:.0f} ms)"
+        )
+        if result.forbidden_loaded:
+            print(f"     eagerly loaded: {', '.join(result.forbidden_loaded)}")
+
+    if args.json:
+        args.json.write_text(
+            json.dumps([asdict(r) for r in results], indent=2), encoding="utf-8"
+        )
+
+    return 0 if all(r.passed for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""Load test of the REST API against fake LM and Azure DevOps backends.
+
+Starts ``src.server_api:app`` with uvicorn in-process, with the extraction
+services wired to ``FakeLM`` and the Azure DevOps client pointed at a local
+``FakeAzureDevOpsServer``. Virtual users then run realistic multi-turn
+sessions concurrently:
+
+    create session -> requirements without project (needs info)
+    -> project name (ready for confirmation) -> get detail
+    -> [reject + extra requirement] -> confirm -> list sessions
+
+The report has per-endpoint p50/p95/p99 latency and requests per second, and
+can be written as JSON and compared with a previous run.
+
+Usage:
+    uv run python benchmarks/load_test.py --users 16 --sessions 4 \\
+        --lm-latency 0.5 --json results.json [--compare baseline.json]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.fakes import FakeAzureDevOpsServer, FakeLM
+
+FIRST_TURN = (
+    "Vorrei aggiungere l'export CSV degli ordini. "
+    "Dobbiamo implementare anche le notifiche email per i clienti."
+)
+PROJECT_TURN = "Il progetto è Bench"
+EDIT_TURN = "Aggiungere anche il filtro per data nella lista ordini."
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    latency_s: float
+    status: int
+
+
+@dataclass
+class Recorder:
+    samples: list[Sample] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, sample: Sample) -> None:
+        with self.lock:
+            self.samples.append(sample)
+
+
+class ApiClient:
+    """Keep-alive HTTP client for one virtual user."""
+
+    def __init__(self, host: str, port: int, recorder: Recorder):
+        self._connection = http.client.HTTPConnection(host, port, timeout=300)
+        self._recorder = recorder
+
+    def request(self, method: str, path: str, endpoint: str, body=None):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload else {}
+        start = time.perf_counter()
+        self._connection.request(method, path, body=payload, headers=headers)
+        response = self._connection.getresponse()
+        data = response.read()
+        self._recorder.add(
+            Sample(endpoint, time.perf_counter() - start, response.status)
+        )
+        return json.loads(data) if data else None
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def run_session(client: ApiClient, rng: random.Random, reject_ratio: float) -> None:
+    created = client.request("POST", "/chat/sessions", "POST /chat/sessions")
+    chat_id = created["chat_id"]
+    base = f"/chat/sessions/{chat_id}"
+
+    def send(content: str) -> None:
+        client.request(
+            "POST",
+            f"{base}/messages",
+            "POST /chat/sessions/{id}/messages",
+            {"role": "user", "content": content},
+        )
+
+    send(FIRST_TURN)
+    send(PROJECT_TURN)
+    client.request("GET", base, "GET /chat/sessions/{id}")
+
+    if rng.random() < reject_ratio:
+        client.request(
+            "POST",
+            f"{base}/confirm",
+            "POST /chat/sessions/{id}/confirm",
+            {"confirm": False},
+        )
+        send(EDIT_TURN)
+
+    client.request(
+        "POST", f"{base}/confirm", "POST /chat/sessions/{id}/confirm", {"confirm": True}
+    )
+    client.request("GET", "/chat/sessions", "GET /chat/sessions")
+
+
+def run_user(
+    host: str, port: int, recorder: Recorder, sessions: int, seed: int, reject: float
+) -> None:
+    rng = random.Random(seed)
+    client = ApiClient(host, port, recorder)
+    try:
+        for _ in range(sessions):
+            run_session(client, rng, reject)
+    finally:
+        client.close()
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def summarize(samples: list[Sample], elapsed_s: float) -> dict:
+    by_endpoint: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+
+    def stats(group: list[Sample]) -> dict:
+        latencies_ms = [s.latency_s * 1000 for s in group]
+        return {
+            "count": len(group),
+            "errors": sum(1 for s in group if s.status >= 400),
+            "rps": round(len(group) / elapsed_s, 3),
+            "mean_ms": round(statistics.fmean(latencies_ms), 2),
+            "p50_ms": round(percentile(latencies_ms, 0.50), 2),
+            "p95_ms": round(percentile(latencies_ms, 0.95), 2),
+            "p99_ms": round(percentile(latencies_ms, 0.99), 2),
+        }
+
+    return {
+        "elapsed_s": round(elapsed_s, 3),
+        "total": stats(samples),
+        "endpoints": {
+            name: stats(group) for name, group in sorted(by_endpoint.items())
+        },
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_api(lm: FakeLM, azdo: FakeAzureDevOpsServer, log_level: str):
+    """Start the API with uvicorn in a background thread."""
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ.setdefault("AZDO_PERSONAL_ACCESS_TOKEN", "benchmark")
+    os.environ.setdefault("AZDO_ORGANIZATION", "benchmark")
+    os.environ["AZDO_BASE_URL"] = azdo.base_url
+
+    import uvicorn
+
+    from src.api.dependencies import (
+        get_add_message_use_case,
+        get_async_repository,
+        get_backlog_index,
+        get_project_catalog,
+    )
+    from src.infrastructure.services.dspy_extraction_service import (
+        DSPyPBIExtractionService,
+        DSPyProjectExtractionService,
+    )
+    from src.llm_client import GeminiService
+    from src.server_api import app
+    from src.use_cases.chat_session_use_cases import AsyncAddMessageUseCase
+
+    logging.getLogger().setLevel(log_level)
+
+    llm_client = GeminiService("benchmark", lm=lm)
+    pbi_extraction = DSPyPBIExtractionService(llm_client)
+    project_extraction = DSPyProjectExtractionService(llm_client)
+
+    app.dependency_overrides[get_add_message_use_case] = lambda: AsyncAddMessageUseCase(
+        repository=get_async_repository(),
+        pbi_extraction=pbi_extraction,
+        project_extraction=project_extraction,
+        backlog_index=get_backlog_index(),
+        project_catalog=get_project_catalog(),
+    )
+
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, port
+
+
+def print_report(results: dict, baseline: dict | None) -> None:
+    header = (
+        f"{'endpoint':<38}{'count':>7}{'err':>5}{'rps':>9}"
+        f"{'p50':>10}{'p95':>10}{'p99':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    rows = {**results["endpoints"], "TOTAL": results["total"]}
+    for name, s in rows.items():
+        print(
+            f"{name:<38}{s['count']:>7}{s['errors']:>5}{s['rps']:>9.2f}"
+            f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}"
+        )
+        if baseline:
+            base = {**baseline["endpoints"], "TOTAL": baseline["total"]}.get(name)
+            if base:
+                deltas = [
+                    _delta(s[key], base[key])
+                    for key in ("rps", "p50_ms", "p95_ms", "p99_ms")
+                ]
+                print(f"{'  vs baseline':<50}" + "".join(f"{d:>10}" for d in deltas))
+
+
+def _delta(value: float, base: float) -> str:
+    if not base:
+        return "n/a"
+    return f"{(value - base) / base * 100:+.1f}%"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test with fake backends.")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent virtual users")
+    parser.add_argument("--sessions", type=int, default=3, help="Sessions per user")
+    parser.add_argument(
+        "--lm-latency", type=float, default=0.5, help="Seconds per LM call"
+    )
+    parser.add_argument("--lm-jitter", type=float, default=0.1)
+    parser.add_argument("--azdo-latency", type=float, default=0.05)
+    parser.add_argument("--reject-ratio", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING", help="Application log level")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--compare", type=Path, help="Previous results to compare with")
+    args = parser.parse_args()
+
+    azdo = FakeAzureDevOpsServer(latency_s=args.azdo_latency).start()
+    lm = FakeLM(latency_s=args.lm_latency, jitter_s=args.lm_jitter, seed=args.seed)
+    server, thread, port = start_api(lm, azdo, args.log_level)
+
+    recorder = Recorder()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            futures = [
+                pool.submit(
+                    run_user,
+                    "127.0.0.1",
+                    port,
+                    recorder,
+                    args.sessions,
+                    args.seed + user,
+                    args.reject_ratio,
+                )
+                for user in range(args.users)
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        azdo.stop()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "config": {k: str(v) for k, v in vars(args).items()},
+            "work_items_created": len(azdo.work_items),
+        },
+        **summarize(recorder.samples, elapsed),
+    }
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(results, baseline)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    return 0 if results["total"]["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
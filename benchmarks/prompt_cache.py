@@ -0,0 +1,142 @@
+"""Prompt prefix stability and cache use of the extraction programs.
+
+Runs varied conversations through the PBI and project extraction services,
+in full and economy mode, with the stable-prefix layout, ``FakeLM`` and a
+``FakePromptCache``. Every program must send the same prefix (system
+message and demos) on every call, whatever the conversation; the report
+has the prefix size per program and the share of prompt tokens that
+``FakeLM`` served from its simulated provider cache. ``FakePromptCache``
+marks every prefix: the report also says which ones ``ContextCachePrefix``
+would mark with ``--min-tokens`` (PROMPT_CACHE_MIN_TOKENS), the others
+are not cached in production.
+
+Exits with status 1 if a prefix changed between calls or nothing was
+served from the cache.
+
+Usage:
+    uv run python benchmarks/prompt_cache.py [--conversations 50] \\
+        [--min-tokens 1024] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+# litellm fetches the model cost map at import time otherwise.
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from benchmarks.fakes import FakeLM, FakePromptCache
+from src.domain.entities import ExtractionMode
+from src.infrastructure.services.dspy_extraction_service import (
+    DSPyPBIExtractionService,
+    DSPyProjectExtractionService,
+)
+from src.llm_client import GeminiService
+from src.observability.metrics import LM_TOKENS_TOTAL
+
+REQUIREMENTS = (
+    "Vorrei aggiungere l'export CSV degli ordini.",
+    "Dobbiamo implementare anche le notifiche email per i clienti.",
+    "Bisogna aggiungere il filtro per data nella lista ordini.",
+    "Serve implementare il login con SSO aziendale.",
+    "Vorrei aggiungere la paginazione alla ricerca prodotti.",
+)
+PROJECTS = ("Bench", "WebApp", "Alpha")
+
+
+def build_conversation(rng: random.Random) -> str:
+    turns = rng.sample(REQUIREMENTS, rng.randint(1, len(REQUIREMENTS)))
+    if rng.random() < 0.7:
+        turns.append(f"Il progetto è {rng.choice(PROJECTS)}")
+    return "\n".join(f"user: {turn}" for turn in turns)
+
+
+def tokens(kind: str) -> float:
+    return sum(
+        LM_TOKENS_TOTAL.value(extractor=extractor, kind=kind)
+        for extractor in ("pbi", "project")
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Prompt prefix cache check.")
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--min-tokens",
+        type=int,
+        default=1024,
+        help="Minimum prefix cached by ContextCachePrefix",
+    )
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    cache = FakePromptCache()
+    llm_client = GeminiService("fake", lm=FakeLM(latency_s=0, jitter_s=0))
+    pbi_service = DSPyPBIExtractionService(llm_client, prompt_cache=cache)
+    project_service = DSPyProjectExtractionService(llm_client, prompt_cache=cache)
+
+    rng = random.Random(args.seed)
+    for _ in range(args.conversations):
+        conversation = build_conversation(rng)
+        for mode in ExtractionMode:
+            pbi_service.extract_pbis(conversation, mode=mode)
+            project_service.extract_project(conversation, mode=mode)
+
+    prompt, cached = tokens("prompt"), tokens("cached")
+    results = {
+        "calls": cache.calls,
+        "programs": {
+            key: {
+                "prefixes": len(prints),
+                "prefix_tokens": cache.prefix_tokens[key],
+                "cached_in_production": cache.prefix_tokens[key] >= args.min_tokens,
+            }
+            for key, prints in sorted(cache.prefixes.items())
+        },
+        "prompt_tokens": int(prompt),
+        "cached_tokens": int(cached),
+        "cached_share": round(cached / prompt, 3) if prompt else 0.0,
+    }
+
+    print(f"{'program':<60}{'prefixes':>9}{'tokens':>8}{'cached':>8}")
+    for key, program in results["programs"].items():
+        cached_in_production = "yes" if program["cached_in_production"] else "no"
+        print(
+            f"{key:<60}{program['prefixes']:>9}{program['prefix_tokens']:>8}"
+            f"{cached_in_production:>8}"
+        )
+    print(
+        f"{results['calls']} calls, {results['cached_tokens']} of "
+        f"{results['prompt_tokens']} prompt tokens cached "
+        f"({results['cached_share']:.1%}) with every prefix cached"
+    )
+    long_enough = sum(
+        program["cached_in_production"] for program in results["programs"].values()
+    )
+    print(
+        f"Prefixes of at least {args.min_tokens} tokens, cached in production: "
+        f"{long_enough} of {len(results['programs'])} programs"
+    )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    unstable = cache.unstable_keys()
+    if unstable:
+        print(f"Unstable prompt prefix: {', '.join(unstable)}", file=sys.stderr)
+        return 1
+    if not cached:
+        print("No prompt tokens were served from the cache", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
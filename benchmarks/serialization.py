@@ -0,0 +1,199 @@
+"""Micro-benchmark of session detail serialization.
+
+Compares, for sessions of increasing size, the DTO path (domain entity ->
+pydantic DTOs -> FastAPI response validation -> JSON) with the orjson fast
+path used by the read endpoints (domain entity -> JSON bytes). Both outputs
+are checked to decode to the same document before timing.
+
+Usage:
+    uv run python benchmarks/serialization.py [--sizes 10 100 1000] \\
+        [--pbis 20] [--repeat 5] [--json results.json]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from pydantic import TypeAdapter
+
+from src.api.dtos import (
+    ChatMessageResponse,
+    ChatSessionDetailResponse,
+    DuplicateCandidateResponse,
+    LMUsageResponse,
+    PBIDiffResponse,
+    PBIResponse,
+)
+from src.api.serializers import encode_chat_session_detail
+from src.domain.entities import (
+    PBI,
+    ChatMessage,
+    ChatSession,
+    LMUsage,
+    MessageRole,
+    SessionStatus,
+)
+
+DETAIL_ADAPTER = TypeAdapter(ChatSessionDetailResponse)
+
+
+def build_session(messages: int, pbis: int) -> ChatSession:
+    start = datetime(2025, 1, 1, 9, 0, 0)
+    roles = (MessageRole.USER, MessageRole.ASSISTANT)
+    return ChatSession(
+        messages=[
+            ChatMessage(
+                role=roles[i % 2],
+                content=f"Messaggio {i}: aggiungere l'export CSV degli ordini " * 4,
+                timestamp=start + timedelta(seconds=i, microseconds=i * 7),
+            )
+            for i in range(messages)
+        ],
+        created_at=start,
+        updated_at=start + timedelta(seconds=messages),
+        project="Bench",
+        pbis=[
+            PBI(title=f"PBI {i}", description=f"Descrizione del requisito {i}. " * 3)
+            for i in range(pbis)
+        ],
+        status=SessionStatus.READY_FOR_CONFIRMATION,
+        awaiting_confirmation=True,
+        lm_usage=LMUsage(
+            calls=4, prompt_tokens=1200, completion_tokens=300, wall_time_s=1.23456
+        ),
+    )
+
+
+def to_detail_response(session: ChatSession) -> ChatSessionDetailResponse:
+    """Build the detail DTO the way the routes did before the fast path."""
+    return ChatSessionDetailResponse(
+        chat_id=session.chat_id,
+        version=session.version,
+        messages=[
+            ChatMessageResponse(
+                role=msg.role.value, content=msg.content, timestamp=msg.timestamp
+            )
+            for msg in session.messages
+        ],
+        message_count=len(session.messages),
+        next_cursor=len(session.messages),
+        created_at=session.created_at,
+        updated_at=session.updated_at,
+        project=session.project,
+        pbis=[
+            PBIResponse(
+                id=pbi.id,
+                title=pbi.title,
+                description=pbi.description,
+                work_item_id=pbi.work_item_id,
+                possible_duplicates=[
+                    DuplicateCandidateResponse(
+                        work_item_id=candidate.work_item_id,
+                        title=candidate.title,
+                        score=candidate.score,
+                    )
+                    for candidate in session.duplicates.get(pbi.id, [])
+                ],
+            )
+            for pbi in session.pbis
+        ],
+        pbi_diff=PBIDiffResponse(
+            added=list(session.pbi_diff.added),
+            changed=list(session.pbi_diff.changed),
+            removed=list(session.pbi_diff.removed),
+        ),
+        status=session.status.value,
+        awaiting_confirmation=session.awaiting_confirmation,
+        lm_usage=LMUsageResponse(
+            calls=session.lm_usage.calls,
+            prompt_tokens=session.lm_usage.prompt_tokens,
+            completion_tokens=session.lm_usage.completion_tokens,
+            total_tokens=session.lm_usage.total_tokens,
+            wall_time_s=round(session.lm_usage.wall_time_s, 3),
+        ),
+    )
+
+
+def dto_path(session: ChatSession) -> bytes:
+    """What FastAPI does with a DTO returned from a route with response_model."""
+    response = to_detail_response(session)
+    validated = DETAIL_ADAPTER.validate_python(response, from_attributes=True)
+    content = DETAIL_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_path(session: ChatSession) -> bytes:
+    return encode_chat_session_detail(session)
+
+
+def time_per_call(func, session: ChatSession, repeat: int) -> dict:
+    # Calibrate the loop so that each sample lasts roughly 0.2s.
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func(session)
+        if time.perf_counter() - start >= 0.2:
+            break
+        loops *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func(session)
+        samples.append((time.perf_counter() - start) / loops * 1000)
+    return {"best_ms": min(samples), "median_ms": statistics.median(samples)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Session serialization benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500, 2000])
+    parser.add_argument("--pbis", type=int, default=20, help="PBIs per session")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'messages':>9}{'bytes':>10}{'dto ms':>12}{'fast ms':>10}{'speedup':>9}")
+    for size in args.sizes:
+        session = build_session(size, args.pbis)
+        expected = dto_path(session)
+        if json.loads(fast_path(session)) != json.loads(expected):
+            print(f"Output mismatch for {size} messages", file=sys.stderr)
+            return 1
+
+        dto = time_per_call(dto_path, session, args.repeat)
+        fast = time_per_call(fast_path, session, args.repeat)
+        speedup = dto["best_ms"] / fast["best_ms"]
+        results.append(
+            {
+                "messages": size,
+                "pbis": args.pbis,
+                "bytes": len(expected),
+                "dto": dto,
+                "fast_path": fast,
+                "speedup": round(speedup, 2),
+            }
+        )
+        print(
+            f"{size:>9}{len(expected):>10}{dto['best_ms']:>12.3f}"
+            f"{fast['best_ms']:>10.3f}{speedup:>8.1f}x"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
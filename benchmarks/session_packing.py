@@ -0,0 +1,167 @@
+"""Memory of the in-memory repository with and without packed sessions.
+
+Saves ``--sessions`` sessions of ``--messages`` messages each, measures the
+memory held by the repository (tracemalloc), packs them all as idle and
+measures it again. Then times listing (``get_all``, which leaves the
+messages packed) and reading (``get_by_id``, which unpacks them) on an
+unpacked and a packed repository. Message texts are drawn at random from a
+vocabulary, which compresses worse than real conversations.
+
+Exits with status 1 if a packed session does not read back identical.
+
+Usage:
+    uv run python benchmarks/session_packing.py [--sessions 500] \\
+        [--messages 40] [--json results.json]
+"""
+
+import argparse
+import gc
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.domain.entities import (
+    PBI,
+    ChatMessage,
+    ChatSession,
+    MessageRole,
+    SessionStatus,
+)
+from src.infrastructure.repositories.in_memory_chat_repository import (
+    InMemoryChatRepository,
+)
+
+VOCABULARY = (
+    "dobbiamo aggiungere export ordini clienti report mensile fattura portale "
+    "magazzino login utenti ruoli permessi notifiche email scadenza contratto "
+    "filtro ricerca data stato priorità sprint backlog progetto integrazione "
+    "servizio pagamento carta tracciamento spedizione dashboard grafico vendite "
+    "regione approvazione richiesta ferie calendario documento firma archivio "
+    "il la di che per con una un non sono anche come quando dopo prima va bene"
+).split()
+
+
+def build_sessions(count: int, messages: int, seed: int) -> list[ChatSession]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, 9, 0, 0)
+    roles = (MessageRole.USER, MessageRole.ASSISTANT)
+    sessions = []
+    for _ in range(count):
+        sessions.append(
+            ChatSession(
+                messages=[
+                    ChatMessage(
+                        role=roles[i % 2],
+                        content=" ".join(rng.choices(VOCABULARY, k=rng.randint(8, 60))),
+                        timestamp=start + timedelta(seconds=i, microseconds=i * 7),
+                    )
+                    for i in range(messages)
+                ],
+                created_at=start,
+                updated_at=start + timedelta(seconds=messages),
+                project="Bench",
+                pbis=[PBI(title="Export ordini", description="Export CSV mensile")],
+                status=SessionStatus.COMPLETED,
+            )
+        )
+    return sessions
+
+
+def fill(sessions: list[ChatSession]) -> InMemoryChatRepository:
+    repository = InMemoryChatRepository()
+    for session in sessions:
+        repository.save(session.copy())
+    return repository
+
+
+def timed(function, repeat: int) -> float:
+    """Median wall time of ``function`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Packed session memory check.")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    repository = fill(build_sessions(args.sessions, args.messages, args.seed))
+    gc.collect()
+    unpacked_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    repository.pack_idle(0)
+    gc.collect()
+    packed_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    del repository
+    sessions = build_sessions(args.sessions, args.messages, args.seed)
+    reference, packed = fill(sessions), fill(sessions)
+    packed.pack_idle(0)
+    ids = [session.chat_id for session in sessions]
+
+    identical = all(
+        packed.get_by_id(chat_id).messages == reference.get_by_id(chat_id).messages
+        for chat_id in ids
+    )
+
+    results = {
+        "sessions": args.sessions,
+        "messages_per_session": args.messages,
+        "unpacked_mb": round(unpacked_bytes / 2**20, 2),
+        "packed_mb": round(packed_bytes / 2**20, 2),
+        "reduction": round(1 - packed_bytes / unpacked_bytes, 3),
+        "get_all_ms": {
+            "unpacked": round(timed(reference.get_all, args.repeat), 2),
+            "packed": round(timed(packed.get_all, args.repeat), 2),
+        },
+        "get_by_id_ms": {
+            "unpacked": round(
+                timed(lambda: reference.get_by_id(ids[0]), args.repeat * 20), 3
+            ),
+            "packed": round(
+                timed(lambda: packed.get_by_id(ids[0]), args.repeat * 20), 3
+            ),
+        },
+    }
+    print(
+        f"{args.sessions} sessions x {args.messages} messages: "
+        f"{results['unpacked_mb']:.2f} MB unpacked, {results['packed_mb']:.2f} MB "
+        f"packed ({results['reduction']:.0%} less)"
+    )
+    print(f"{'operation':<12}{'unpacked ms':>13}{'packed ms':>11}")
+    for operation in ("get_all_ms", "get_by_id_ms"):
+        timing = results[operation]
+        print(
+            f"{operation[:-3]:<12}{timing['unpacked']:>13.3f}{timing['packed']:>11.3f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if not identical:
+        print("Packed sessions do not read back identical", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,33 @@
-from . import azdo_client, llm_client, models, server_api
-from .config import settings
-from .extractors import azdo, pbi
+"""Top-level package.
 
-# Main modules
+Submodules are loaded lazily on first attribute access so that importing a
+light module (e.g. ``src.domain``) does not pull in dspy, litellm or the
+Azure DevOps SDK.
+"""
 
-# Config
+import importlib
 
-# Extractors
+_LAZY_SUBMODULES = {
+    "azdo_client": "src.azdo_client",
+    "llm_client": "src.llm_client",
+    "models": "src.models",
+    "server_api": "src.server_api",
+    "settings": "src.config.settings",
+    "azdo": "src.extractors.azdo",
+    "pbi": "src.extractors.pbi",
+}
 
-__all__ = [
-    "azdo_client",
-    "llm_client",
-    "models",
-    "server_api",
-    "settings",
-    "azdo",
-    "pbi",
-]
+__all__ = list(_LAZY_SUBMODULES)
+
+
+def __getattr__(name: str):
+    """Import the requested submodule on first access."""
+    if name not in _LAZY_SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY_SUBMODULES[name])
+    globals()[name] = module
+    return module
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
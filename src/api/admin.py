@@ -0,0 +1,153 @@
+"""Admin diagnostics routes: CPU profile, memory snapshots, slow requests,
+shadow evaluation.
+
+Mounted only when ``ADMIN_ENABLED`` is set, and every route requires the
+``ADMIN_TOKEN`` bearer token.
+"""
+
+import asyncio
+import secrets
+import threading
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from src.api.dependencies import (
+    get_admin_settings,
+    get_memory_profiler,
+    get_pbi_extraction_service,
+    get_slow_request_log,
+)
+from src.domain.services import PBIExtractionService
+from src.infrastructure.services.shadow_extraction import (
+    ShadowPBIExtractionService,
+)
+from src.observability.profiling import (
+    MemoryProfiler,
+    SlowRequestLog,
+    sample_cpu_profile,
+)
+
+_profile_lock = threading.Lock()
+
+
+async def require_admin_token(authorization: str | None = Header(None)) -> None:
+    """Reject requests without the admin bearer token."""
+    token = get_admin_settings().token
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if (
+        not token
+        or scheme.lower() != "bearer"
+        or not secrets.compare_digest(credentials.encode(), token.encode())
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Token di amministrazione mancante o non valido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin_token)],
+)
+
+
+@router.post("/profile/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, description="Sampling duration"),
+    interval_ms: float = Query(5.0, ge=1, description="Sampling interval"),
+) -> PlainTextResponse:
+    """
+    Sample the stacks of all threads for ``seconds``.
+
+    The response is in the folded stack format, one line per stack with its
+    sample count, for flamegraph.pl or speedscope. One profile at a time.
+    """
+    max_seconds = get_admin_settings().max_profile_duration_s
+    if seconds > max_seconds:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Durata massima del profilo: {max_seconds:g} secondi",
+        )
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Profilo CPU già in corso")
+    try:
+        # Sampled from a worker thread: the event loop keeps serving (and
+        # shows up in) the profile.
+        folded = await asyncio.to_thread(
+            sample_cpu_profile, seconds, interval_ms / 1000
+        )
+    finally:
+        _profile_lock.release()
+    return PlainTextResponse(folded)
+
+
+@router.post("/memory/start")
+async def start_memory_tracing(
+    frames: int = Query(25, ge=1, le=100, description="Frames per traceback"),
+    profiler: MemoryProfiler = Depends(get_memory_profiler),
+) -> dict:
+    """Start tracemalloc; allocations slow down until it is stopped."""
+    profiler.start(frames)
+    return {"tracing": True}
+
+
+@router.get("/memory/snapshot")
+async def memory_snapshot(
+    limit: int = Query(20, ge=1, le=200, description="Allocation sites to list"),
+    profiler: MemoryProfiler = Depends(get_memory_profiler),
+) -> dict:
+    """
+    Traced memory by component (repository, sessions, dspy, ...), top
+    allocation sites and live domain and DSPy objects.
+
+    From the second snapshot on, also the growth since the previous one.
+    """
+    if not profiler.tracing:
+        raise HTTPException(
+            status_code=409,
+            detail="Tracciamento memoria non attivo: usare POST /admin/memory/start",
+        )
+    return await asyncio.to_thread(profiler.snapshot, limit)
+
+
+@router.post("/memory/stop")
+async def stop_memory_tracing(
+    profiler: MemoryProfiler = Depends(get_memory_profiler),
+) -> dict:
+    """Stop tracemalloc and discard its snapshots."""
+    profiler.stop()
+    return {"tracing": False}
+
+
+@router.get("/slow-requests")
+async def slow_requests(
+    route: str | None = Query(None, description="Route template, e.g. /chat/sessions"),
+    log: SlowRequestLog = Depends(get_slow_request_log),
+) -> dict:
+    """Latest requests over the threshold by route, with stage timings."""
+    return {"threshold_s": log.threshold_s, "routes": log.dump(route)}
+
+
+@router.delete("/slow-requests")
+async def clear_slow_requests(
+    log: SlowRequestLog = Depends(get_slow_request_log),
+) -> dict:
+    """Forget the slow requests recorded so far."""
+    log.clear()
+    return {"cleared": True}
+
+
+@router.get("/shadow")
+async def shadow_evaluation(
+    service: PBIExtractionService = Depends(get_pbi_extraction_service),
+) -> dict:
+    """Agreement, latency and tokens of the shadowed candidate so far."""
+    if not isinstance(service, ShadowPBIExtractionService):
+        raise HTTPException(
+            status_code=404,
+            detail="Valutazione in ombra non attiva: impostare PBI_SHADOW_FRACTION",
+        )
+    return service.summary()
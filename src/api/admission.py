@@ -0,0 +1,158 @@
+"""Admission control of the routes doing blocking LM and Azure DevOps work.
+
+Those routes run the blocking part of their use case on a worker thread,
+and at most ``max_concurrent`` at a time. Further requests wait in a bounded queue,
+served by priority and then arrival: a confirmation goes ahead of new
+extraction work. A request is shed, with a ``Retry-After`` estimate,
+when:
+
+- the queue is full and nothing of lower priority is waiting (429);
+- it is the newest of the lowest priority waiting when a higher priority
+  request finds the queue full (503, "evicted");
+- it waited longer than ``max_queue_wait_s`` (503).
+
+Reads and ``/health`` never queue: they run on the event loop, which the
+worker threads leave free.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from src.observability.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_QUEUE_WAIT_SECONDS,
+    ADMISSION_SHED_TOTAL,
+)
+
+
+class Priority(IntEnum):
+    """Admission priority; lower values are served first."""
+
+    CONFIRM = 0
+    EXTRACTION = 1
+
+
+class RequestShedError(Exception):
+    """The request was refused by admission control."""
+
+    def __init__(self, reason: str, status_code: int, retry_after_s: float):
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after_s = retry_after_s
+        super().__init__(f"Request shed ({reason}), retry after {retry_after_s}s")
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: Priority
+    seq: int
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class AdmissionController:
+    """Bounded concurrency and priority queue for blocking request work."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 32,
+        max_queue_wait_s: float = 10.0,
+    ):
+        self._max_concurrent = max_concurrent
+        self._max_queue = max_queue
+        self._max_queue_wait_s = max_queue_wait_s
+        self._in_flight = 0
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        # Moving average of the time a slot is held, for Retry-After.
+        self._service_time_s = 1.0
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority):
+        """Hold a worker slot for the block, waiting for one if needed."""
+        await self._acquire(priority)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._service_time_s += 0.1 * (elapsed - self._service_time_s)
+            ADMISSION_IN_FLIGHT.dec(priority=priority.name.lower())
+            self._release()
+
+    def retry_after_s(self) -> int:
+        """Seconds until the current queue has likely drained."""
+        rounds = (len(self._waiters) + 1) / self._max_concurrent
+        return max(1, math.ceil(rounds * self._service_time_s))
+
+    def _shed(self, priority: Priority, reason: str, status_code: int):
+        ADMISSION_SHED_TOTAL.inc(priority=priority.name.lower(), reason=reason)
+        return RequestShedError(reason, status_code, self.retry_after_s())
+
+    def _grant(self, priority: Priority) -> None:
+        self._in_flight += 1
+        ADMISSION_IN_FLIGHT.inc(priority=priority.name.lower())
+
+    async def _acquire(self, priority: Priority) -> None:
+        if self._in_flight < self._max_concurrent and not self._waiters:
+            self._grant(priority)
+            ADMISSION_QUEUE_WAIT_SECONDS.observe(0.0, priority=priority.name.lower())
+            return
+
+        if len(self._waiters) >= self._max_queue:
+            lowest = max(self._waiters)
+            if lowest.priority <= priority:
+                raise self._shed(priority, "queue_full", 429)
+            self._remove(lowest)
+            lowest.future.set_exception(self._shed(lowest.priority, "evicted", 503))
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._seq), loop.create_future(), loop.time())
+        heapq.heappush(self._waiters, waiter)
+        ADMISSION_QUEUE_DEPTH.inc(priority=priority.name.lower())
+        timeout = loop.call_later(self._max_queue_wait_s, self._expire, waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # The client went away: give back a slot granted meanwhile.
+            if waiter.future.done() and not waiter.future.cancelled():
+                ADMISSION_IN_FLIGHT.dec(priority=priority.name.lower())
+                self._release()
+            else:
+                self._remove(waiter)
+            raise
+        finally:
+            timeout.cancel()
+        ADMISSION_QUEUE_WAIT_SECONDS.observe(
+            loop.time() - waiter.enqueued_at, priority=priority.name.lower()
+        )
+
+    def _expire(self, waiter: _Waiter) -> None:
+        if not waiter.future.done():
+            self._remove(waiter)
+            waiter.future.set_exception(
+                self._shed(waiter.priority, "queue_timeout", 503)
+            )
+
+    def _remove(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+            heapq.heapify(self._waiters)
+            ADMISSION_QUEUE_DEPTH.dec(priority=waiter.priority.name.lower())
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        while self._waiters and self._in_flight < self._max_concurrent:
+            waiter = heapq.heappop(self._waiters)
+            ADMISSION_QUEUE_DEPTH.dec(priority=waiter.priority.name.lower())
+            if not waiter.future.done():
+                self._grant(waiter.priority)
+                waiter.future.set_result(None)
@@ -0,0 +1,21 @@
+"""Conditional GET support based on the session version."""
+
+from src.domain.entities import ChatSession
+
+
+def session_etag(session: ChatSession) -> str:
+    """Weak ETag of a session: it changes whenever the session is saved."""
+    return f'W/"{session.version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
@@ -4,103 +4,421 @@ Following Python philosophy: "Explicit is better than implicit."
 All dependencies are clearly defined and injected.
 """
 
-from functools import lru_cache
+import threading
+from collections.abc import Callable
+from functools import lru_cache, wraps
 
-from src.config.settings import EnvironmentSettings
-from src.domain.repositories import ChatSessionRepository
+from fastapi import Request
+
+from src.api.admission import AdmissionController
+from src.config.settings import AdminSettings, EnvironmentSettings
+from src.domain.entities import BudgetPolicy, SessionBudget
+from src.domain.repositories import AsyncChatSessionRepository, ChatSessionRepository
 from src.domain.services import (
     AzureDevOpsService,
+    BacklogIndex,
     PBIExtractionService,
+    ProjectCatalog,
     ProjectExtractionService,
+    TurnGate,
+)
+from src.extractors.profiles import resolve_profile
+from src.extractors.prompt_cache import ContextCachePrefix, PromptPrefixCache
+from src.infrastructure.repositories.async_chat_repository import (
+    AsyncChatRepositoryAdapter,
 )
 from src.infrastructure.repositories.in_memory_chat_repository import (
     InMemoryChatRepository,
 )
+from src.infrastructure.resilience import CircuitBreaker, RetryPolicy
 from src.infrastructure.services.azdo_service import AzureDevOpsServiceImpl
+from src.infrastructure.services.backlog_index import MinHashBacklogIndex
 from src.infrastructure.services.dspy_extraction_service import (
     DSPyPBIExtractionService,
     DSPyProjectExtractionService,
 )
+from src.infrastructure.services.project_catalog import CachedProjectCatalog
+from src.infrastructure.services.session_analytics import (
+    IncrementalSessionAnalytics,
+)
+from src.infrastructure.services.session_search import InvertedSessionIndex
+from src.infrastructure.services.shadow_extraction import (
+    ShadowPBIExtractionService,
+)
+from src.infrastructure.services.turn_gate import LexicalTurnGate, TurnModel
 from src.llm_client import GeminiService
+from src.observability.logs import chat_id_var
+from src.observability.profiling import MemoryProfiler, SlowRequestLog
 from src.use_cases.chat_session_use_cases import (
-    AddMessageUseCase,
-    ConfirmPBICreationUseCase,
-    CreateChatSessionUseCase,
-    DeleteChatSessionUseCase,
-    GetChatSessionUseCase,
-    ListChatSessionsUseCase,
+    AsyncAddMessageUseCase,
+    AsyncConfirmPBICreationUseCase,
+    AsyncCreateChatSessionUseCase,
+    AsyncDeleteChatSessionUseCase,
+    AsyncGetChatSessionUseCase,
+    AsyncListChatSessionsUseCase,
+    GetSessionAnalyticsUseCase,
+    SearchChatSessionsUseCase,
 )
 
 
-@lru_cache
+def singleton[T](factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Cache a provider's result, built once even on concurrent first calls.
+
+    Sync providers run on the threadpool, and ``lru_cache`` alone lets
+    concurrent first calls each build an instance (e.g. two repositories,
+    each holding half of the sessions). Each provider has its own lock:
+    providers only call providers they depend on, so locks are always taken
+    in dependency order.
+    """
+    cached = lru_cache(factory)
+    lock = threading.Lock()
+
+    @wraps(factory)
+    def provider() -> T:
+        if cached.cache_info().currsize:
+            return cached()
+        with lock:
+            return cached()
+
+    provider.cache_clear = cached.cache_clear
+    return provider
+
+
+@singleton
 def get_settings() -> EnvironmentSettings:
     """Get application settings (cached singleton)."""
     return EnvironmentSettings()
 
 
-@lru_cache
+@singleton
+def get_admin_settings() -> AdminSettings:
+    """Get admin diagnostics settings (cached singleton)."""
+    return AdminSettings()
+
+
+@singleton
+def get_slow_request_log() -> SlowRequestLog:
+    """Get the log of slow requests (cached singleton)."""
+    settings = get_admin_settings()
+    return SlowRequestLog(
+        threshold_s=settings.slow_request_threshold_s,
+        per_route=settings.slow_requests_per_route,
+    )
+
+
+@singleton
+def get_memory_profiler() -> MemoryProfiler:
+    """Get the tracemalloc profiler (cached singleton)."""
+    return MemoryProfiler()
+
+
+@singleton
+def get_admission_controller() -> AdmissionController:
+    """Get the admission controller of the blocking routes (cached singleton)."""
+    settings = get_settings()
+    return AdmissionController(
+        max_concurrent=settings.admission_max_concurrent,
+        max_queue=settings.admission_max_queue,
+        max_queue_wait_s=settings.admission_max_queue_wait_s,
+    )
+
+
+@singleton
+def get_session_search_index() -> InvertedSessionIndex | None:
+    """Get the session search index (cached singleton), None if disabled."""
+    if not get_settings().session_search_enabled:
+        return None
+    return InvertedSessionIndex()
+
+
+@singleton
+def get_session_analytics() -> IncrementalSessionAnalytics | None:
+    """Get the session analytics (cached singleton), None if disabled."""
+    settings = get_settings()
+    if not settings.session_analytics_enabled:
+        return None
+    return IncrementalSessionAnalytics(
+        retention_days=settings.session_analytics_retention_days
+    )
+
+
+@singleton
 def get_repository() -> ChatSessionRepository:
     """Get chat session repository (cached singleton)."""
-    return InMemoryChatRepository()
+    settings = get_settings()
+    listeners = (get_session_search_index(), get_session_analytics())
+    return InMemoryChatRepository(
+        listeners=[listener for listener in listeners if listener is not None],
+        pack_completed=settings.session_pack_completed,
+    )
+
+
+@singleton
+def get_async_repository() -> AsyncChatSessionRepository:
+    """Get the repository awaited by the API use cases (cached singleton)."""
+    return AsyncChatRepositoryAdapter(get_repository())
+
+
+@singleton
+def get_retry_policy() -> RetryPolicy:
+    """Get the retry policy of calls to external dependencies."""
+    settings = get_settings()
+    return RetryPolicy(
+        max_attempts=settings.retry_max_attempts,
+        base_delay_s=settings.retry_base_delay_s,
+        max_delay_s=settings.retry_max_delay_s,
+    )
+
+
+@singleton
+def get_lm_breaker() -> CircuitBreaker:
+    """Get the circuit breaker of the LM (cached singleton)."""
+    settings = get_settings()
+    return CircuitBreaker(
+        "lm",
+        failure_threshold=settings.breaker_failure_threshold,
+        reset_timeout_s=settings.breaker_reset_timeout_s,
+    )
+
+
+@singleton
+def get_azdo_breaker() -> CircuitBreaker:
+    """Get the circuit breaker of Azure DevOps (cached singleton)."""
+    settings = get_settings()
+    return CircuitBreaker(
+        "azure_devops",
+        failure_threshold=settings.breaker_failure_threshold,
+        reset_timeout_s=settings.breaker_reset_timeout_s,
+    )
 
 
-@lru_cache
+@singleton
 def get_llm_client():
     """Get LLM client (cached singleton)."""
     settings = get_settings()
-    return GeminiService(settings.gemini_api_key)
+    return GeminiService(
+        settings.gemini_api_key,
+        timeout_s=settings.lm_timeout_s,
+        cassette_mode=settings.lm_cassette_mode,
+        cassette_path=settings.lm_cassette_path,
+        replay_latency=settings.lm_cassette_replay_latency,
+    )
+
+
+@singleton
+def get_prompt_cache() -> PromptPrefixCache | None:
+    """Get the prompt prefix cache, if enabled."""
+    settings = get_settings()
+    if not settings.prompt_cache_enabled:
+        return None
+    return ContextCachePrefix(min_prefix_tokens=settings.prompt_cache_min_tokens)
 
 
+@singleton
 def get_pbi_extraction_service() -> PBIExtractionService:
-    """Get PBI extraction service."""
-    return DSPyPBIExtractionService(get_llm_client())
+    """
+    Get PBI extraction service (cached singleton).
+
+    Shadowed by the candidate pipeline when PBI_SHADOW_FRACTION is set.
+    """
+    settings = get_settings()
+    primary = DSPyPBIExtractionService(
+        get_llm_client(),
+        program_path=settings.pbi_program_path,
+        profile=resolve_profile("pbi", settings.generation_profiles),
+        stable_prefix=settings.prompt_stable_prefix,
+        prompt_cache=get_prompt_cache(),
+        breaker=get_lm_breaker(),
+        retry_policy=get_retry_policy(),
+        chunk_tokens=settings.pbi_chunk_tokens,
+        chunk_overlap_tokens=settings.pbi_chunk_overlap_tokens,
+        max_parallel_chunks=settings.pbi_chunk_parallelism,
+    )
+    if settings.pbi_shadow_fraction <= 0:
+        return primary
+    return ShadowPBIExtractionService(
+        primary,
+        _get_shadow_pbi_extraction_service(),
+        fraction=settings.pbi_shadow_fraction,
+        name=settings.pbi_shadow_name,
+        max_pending=settings.pbi_shadow_max_pending,
+    )
 
 
+def _get_shadow_pbi_extraction_service() -> PBIExtractionService:
+    """Candidate PBI pipeline of shadow evaluation."""
+    settings = get_settings()
+    llm_client = (
+        GeminiService(
+            settings.gemini_api_key,
+            model=settings.pbi_shadow_model,
+            timeout_s=settings.lm_timeout_s,
+        )
+        if settings.pbi_shadow_model
+        else get_llm_client()
+    )
+    profiles = settings.pbi_shadow_generation_profiles
+    # No breaker: a failing candidate must not open the primary's circuit,
+    # nor be retried at the expense of live traffic.
+    return DSPyPBIExtractionService(
+        llm_client,
+        program_path=settings.pbi_shadow_program_path or settings.pbi_program_path,
+        profile=resolve_profile(
+            "pbi", settings.generation_profiles if profiles is None else profiles
+        ),
+        stable_prefix=settings.prompt_stable_prefix,
+        prompt_cache=get_prompt_cache(),
+        chunk_tokens=settings.pbi_chunk_tokens,
+        chunk_overlap_tokens=settings.pbi_chunk_overlap_tokens,
+        max_parallel_chunks=settings.pbi_chunk_parallelism,
+        name="pbi_shadow",
+        # Counted as errors of the candidate, not as disagreements.
+        raise_errors=True,
+    )
+
+
+@singleton
 def get_project_extraction_service() -> ProjectExtractionService:
-    """Get project extraction service."""
-    return DSPyProjectExtractionService(get_llm_client())
+    """Get project extraction service (cached singleton)."""
+    settings = get_settings()
+    return DSPyProjectExtractionService(
+        get_llm_client(),
+        program_path=settings.azdo_program_path,
+        profile=resolve_profile("project", settings.generation_profiles),
+        stable_prefix=settings.prompt_stable_prefix,
+        prompt_cache=get_prompt_cache(),
+        breaker=get_lm_breaker(),
+        retry_policy=get_retry_policy(),
+    )
+
+
+@singleton
+def get_session_budget() -> SessionBudget | None:
+    """Get the per-session LM budget, if any limit is configured."""
+    settings = get_settings()
+    if settings.session_max_tokens is None and settings.session_max_lm_calls is None:
+        return None
+    return SessionBudget(
+        max_tokens=settings.session_max_tokens,
+        max_calls=settings.session_max_lm_calls,
+        policy=BudgetPolicy(settings.session_budget_policy),
+        hard_limit_factor=settings.session_budget_hard_limit_factor,
+    )
 
 
 def get_azdo_service() -> AzureDevOpsService:
     """Get Azure DevOps service."""
-    return AzureDevOpsServiceImpl()
+    return AzureDevOpsServiceImpl(
+        breaker=get_azdo_breaker(), retry_policy=get_retry_policy()
+    )
+
+
+@singleton
+def get_backlog_index() -> BacklogIndex | None:
+    """Get the backlog duplicate index (cached singleton), None if disabled."""
+    settings = get_settings()
+    if not settings.backlog_index_enabled:
+        return None
+    return MinHashBacklogIndex(
+        get_azdo_service(),
+        settings.azdo_organization,
+        sync_interval_s=settings.backlog_sync_interval_s,
+    )
+
+
+@singleton
+def get_project_catalog() -> ProjectCatalog | None:
+    """Get the project catalogue (cached singleton), None if disabled."""
+    settings = get_settings()
+    if not settings.project_catalog_enabled:
+        return None
+    return CachedProjectCatalog(
+        get_azdo_service(),
+        settings.azdo_organization,
+        ttl_s=settings.project_catalog_ttl_s,
+    )
+
+
+@singleton
+def get_turn_gate() -> TurnGate | None:
+    """Get the turn gate (cached singleton), None if disabled."""
+    settings = get_settings()
+    if not settings.turn_gate_enabled:
+        return None
+    model = (
+        TurnModel.load(settings.turn_gate_model_path)
+        if settings.turn_gate_model_path
+        else None
+    )
+    return LexicalTurnGate(model, skip_below=settings.turn_gate_skip_below)
 
 
 # Use Case Factories
-def get_create_session_use_case() -> CreateChatSessionUseCase:
+def get_create_session_use_case() -> AsyncCreateChatSessionUseCase:
     """Get create session use case."""
-    return CreateChatSessionUseCase(repository=get_repository())
+    return AsyncCreateChatSessionUseCase(repository=get_async_repository())
 
 
-def get_add_message_use_case() -> AddMessageUseCase:
+def get_add_message_use_case() -> AsyncAddMessageUseCase:
     """Get add message use case."""
-    return AddMessageUseCase(
-        repository=get_repository(),
+    return AsyncAddMessageUseCase(
+        repository=get_async_repository(),
         pbi_extraction=get_pbi_extraction_service(),
         project_extraction=get_project_extraction_service(),
+        budget=get_session_budget(),
+        backlog_index=get_backlog_index(),
+        project_catalog=get_project_catalog(),
+        turn_gate=get_turn_gate(),
+        log_turn_labels=get_settings().turn_gate_log_labels,
     )
 
 
-def get_confirm_pbi_use_case() -> ConfirmPBICreationUseCase:
+def get_confirm_pbi_use_case() -> AsyncConfirmPBICreationUseCase:
     """Get confirm PBI creation use case."""
     settings = get_settings()
-    return ConfirmPBICreationUseCase(
-        repository=get_repository(),
+    return AsyncConfirmPBICreationUseCase(
+        repository=get_async_repository(),
         azdo_service=get_azdo_service(),
         organization=settings.azdo_organization,
+        backlog_index=get_backlog_index(),
     )
 
 
-def get_get_session_use_case() -> GetChatSessionUseCase:
+def get_get_session_use_case() -> AsyncGetChatSessionUseCase:
     """Get session retrieval use case."""
-    return GetChatSessionUseCase(repository=get_repository())
+    return AsyncGetChatSessionUseCase(repository=get_async_repository())
 
 
-def get_list_sessions_use_case() -> ListChatSessionsUseCase:
+def get_list_sessions_use_case() -> AsyncListChatSessionsUseCase:
     """Get list sessions use case."""
-    return ListChatSessionsUseCase(repository=get_repository())
+    return AsyncListChatSessionsUseCase(repository=get_async_repository())
+
 
+def get_search_sessions_use_case() -> SearchChatSessionsUseCase | None:
+    """Get session search use case, None if search is disabled."""
+    search_index = get_session_search_index()
+    if search_index is None:
+        return None
+    return SearchChatSessionsUseCase(search_index=search_index)
 
-def get_delete_session_use_case() -> DeleteChatSessionUseCase:
+
+def get_session_analytics_use_case() -> GetSessionAnalyticsUseCase | None:
+    """Get session analytics use case, None if analytics are disabled."""
+    analytics = get_session_analytics()
+    if analytics is None:
+        return None
+    return GetSessionAnalyticsUseCase(analytics=analytics)
+
+
+def get_delete_session_use_case() -> AsyncDeleteChatSessionUseCase:
     """Get delete session use case."""
-    return DeleteChatSessionUseCase(repository=get_repository())
+    return AsyncDeleteChatSessionUseCase(repository=get_async_repository())
+
+
+async def bind_chat_log_context(request: Request) -> None:
+    """Tag the logs of the request with the chat id from the path, if any."""
+    # Async so that it runs in the request's context, not a worker thread.
+    chat_id = request.path_params.get("chat_id")
+    if chat_id is not None:
+        chat_id_var.set(str(chat_id))
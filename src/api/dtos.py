@@ -1,6 +1,6 @@
 """Data Transfer Objects for API layer."""
 
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -46,11 +46,40 @@ class MessageResponse(BaseModel):
     message: str
 
 
+class DuplicateCandidateResponse(BaseModel):
+    """Existing work item that an extracted PBI may duplicate."""
+
+    work_item_id: int
+    title: str
+    score: float
+
+
 class PBIResponse(BaseModel):
     """PBI representation in API."""
 
+    id: UUID
     title: str
     description: str
+    work_item_id: int | None = None
+    possible_duplicates: list[DuplicateCandidateResponse] = []
+
+
+class PBIDiffResponse(BaseModel):
+    """PBI ids added, changed and removed by the latest extraction."""
+
+    added: list[UUID]
+    changed: list[UUID]
+    removed: list[UUID]
+
+
+class LMUsageResponse(BaseModel):
+    """Language model usage accumulated by a session."""
+
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    wall_time_s: float
 
 
 class ChatMessageResponse(BaseModel):
@@ -62,25 +91,75 @@ class ChatMessageResponse(BaseModel):
 
 
 class ChatSessionDetailResponse(BaseModel):
-    """Detailed chat session response."""
+    """Detailed chat session response.
+
+    ``messages`` may be a page of the history: pass ``next_cursor`` as
+    ``since`` to fetch the messages that follow.
+    """
 
     chat_id: UUID
+    version: int
     messages: list[ChatMessageResponse]
+    message_count: int
+    next_cursor: int
     created_at: datetime
     updated_at: datetime
     project: str | None = None
     pbis: list[PBIResponse]
+    pbi_diff: PBIDiffResponse
     status: str
     awaiting_confirmation: bool
+    lm_usage: LMUsageResponse
 
 
 class ChatSessionSummaryResponse(BaseModel):
     """Summary of a chat session."""
 
     chat_id: UUID
+    version: int
     message_count: int
     created_at: datetime
     updated_at: datetime
     project: str | None = None
     pbi_count: int
     status: str
+    lm_usage: LMUsageResponse
+
+
+class SessionSearchHitResponse(BaseModel):
+    """Chat session matching a search."""
+
+    chat_id: UUID
+    score: float
+    project: str | None = None
+    status: str
+    updated_at: datetime
+    fields: list[str]
+    pbi_titles: list[str]
+
+
+class SessionSearchResponse(BaseModel):
+    """A page of session search results, best first."""
+
+    query: str
+    total: int
+    offset: int
+    hits: list[SessionSearchHitResponse]
+
+
+class DailyPBICountResponse(BaseModel):
+    """Work items created for a project on a day."""
+
+    day: date
+    project: str | None = None
+    count: int
+
+
+class SessionAnalyticsResponse(BaseModel):
+    """Aggregate figures about the chat sessions."""
+
+    total_sessions: int
+    sessions_by_status: dict[str, int]
+    pbis_created: list[DailyPBICountResponse]
+    confirmations: int
+    average_turns_to_confirmation: float | None = None
@@ -0,0 +1,132 @@
+"""ASGI middleware for the API layer."""
+
+import time
+from uuid import uuid4
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.observability.logs import chat_id_var, request_id_var
+from src.observability.metrics import HTTP_REQUEST_DURATION_SECONDS, stage_trace_var
+from src.observability.profiling import SlowRequestLog
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class CorrelationIdMiddleware:
+    """
+    Bind a request id to the logs of each HTTP request.
+
+    The id is taken from the X-Request-ID header when the client sends one,
+    otherwise generated, and echoed in the response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = (
+            next(
+                (
+                    value.decode("latin-1")[:MAX_REQUEST_ID_LENGTH]
+                    for name, value in scope["headers"]
+                    if name == REQUEST_ID_HEADER
+                ),
+                None,
+            )
+            or uuid4().hex
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [
+                    *message.get("headers", []),
+                    (REQUEST_ID_HEADER, request_id.encode("latin-1")),
+                ]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        request_token = request_id_var.set(request_id)
+        chat_token = chat_id_var.set(None)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(request_token)
+            chat_id_var.reset(chat_token)
+
+
+class MetricsMiddleware:
+    """Record end-to-end latency of every HTTP request by route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by template (e.g. /chat/sessions/{chat_id}) to keep the
+            # number of series bounded.
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
+
+
+class SlowRequestMiddleware:
+    """Trace the stages of every HTTP request and keep the slow ones."""
+
+    def __init__(self, app: ASGIApp, log: SlowRequestLog):
+        self.app = app
+        self.log = log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stages: list[tuple[str, float, float]] = []
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = stage_trace_var.set(stages)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stage_trace_var.reset(token)
+            route = scope.get("route")
+            self.log.record(
+                getattr(route, "path", "unmatched"),
+                scope["method"],
+                status_code,
+                start,
+                time.perf_counter() - start,
+                stages,
+                request_id_var.get(),
+            )
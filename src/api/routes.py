@@ -1,17 +1,24 @@
 """API routes following clean architecture principles."""
 
 import logging
+import math
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 
+from src.api.admission import AdmissionController, Priority, RequestShedError
+from src.api.conditional import etag_matches, session_etag
 from src.api.dependencies import (
+    bind_chat_log_context,
     get_add_message_use_case,
+    get_admission_controller,
     get_confirm_pbi_use_case,
     get_create_session_use_case,
     get_delete_session_use_case,
     get_get_session_use_case,
     get_list_sessions_use_case,
+    get_search_sessions_use_case,
+    get_session_analytics_use_case,
 )
 from src.api.dtos import (
     AddMessageRequest,
@@ -20,33 +27,60 @@ from src.api.dtos import (
     ChatSessionResponse,
     ChatSessionSummaryResponse,
     ConfirmPBIRequest,
+    DailyPBICountResponse,
     MessageResponse,
+    SessionAnalyticsResponse,
+    SessionSearchHitResponse,
+    SessionSearchResponse,
 )
-from src.api.mappers import (
-    to_chat_session_detail_response,
-    to_chat_session_summary_response,
+from src.api.serializers import (
+    ORJSONBytesResponse,
+    encode_chat_session_detail,
+    encode_chat_session_summaries,
 )
 from src.domain.entities import MessageRole
+from src.domain.services import AmbiguousWriteError, DependencyUnavailableError
 from src.use_cases.chat_session_use_cases import (
-    AddMessageUseCase,
-    ConfirmPBICreationUseCase,
-    CreateChatSessionUseCase,
-    DeleteChatSessionUseCase,
-    GetChatSessionUseCase,
-    ListChatSessionsUseCase,
+    AsyncAddMessageUseCase,
+    AsyncConfirmPBICreationUseCase,
+    AsyncCreateChatSessionUseCase,
+    AsyncDeleteChatSessionUseCase,
+    AsyncGetChatSessionUseCase,
+    AsyncListChatSessionsUseCase,
+    GetSessionAnalyticsUseCase,
+    SearchChatSessionsUseCase,
 )
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/chat/sessions", tags=["Chat Sessions"])
+
+def _unavailable_dependency(error: BaseException) -> DependencyUnavailableError | None:
+    """The DependencyUnavailableError behind ``error``, if any."""
+    while error is not None and not isinstance(error, DependencyUnavailableError):
+        error = error.__cause__
+    return error
+
+
+def _ambiguous_write(error: BaseException) -> bool:
+    """Whether ``error`` comes from a write that may have been applied."""
+    while error is not None and not isinstance(error, AmbiguousWriteError):
+        error = error.__cause__
+    return error is not None
+
+
+router = APIRouter(
+    prefix="/chat/sessions",
+    tags=["Chat Sessions"],
+    dependencies=[Depends(bind_chat_log_context)],
+)
 
 
 @router.post("", response_model=ChatSessionResponse)
 async def create_chat_session(
-    use_case: CreateChatSessionUseCase = Depends(get_create_session_use_case),
+    use_case: AsyncCreateChatSessionUseCase = Depends(get_create_session_use_case),
 ) -> ChatSessionResponse:
     """Create a new chat session."""
-    session = use_case.execute()
+    session = await use_case.execute()
     return ChatSessionResponse(
         chat_id=session.chat_id,
         message=f"Sessione di chat creata con ID: {session.chat_id}",
@@ -55,41 +89,129 @@ async def create_chat_session(
 
 @router.get("", response_model=list[ChatSessionSummaryResponse])
 async def list_chat_sessions(
-    use_case: ListChatSessionsUseCase = Depends(get_list_sessions_use_case),
-) -> list[ChatSessionSummaryResponse]:
+    use_case: AsyncListChatSessionsUseCase = Depends(get_list_sessions_use_case),
+) -> ORJSONBytesResponse:
     """List all chat sessions with summary information."""
-    sessions = use_case.execute()
-    logger.info(f"Listing {len(sessions)} chat sessions")
-    return [to_chat_session_summary_response(s) for s in sessions]
+    sessions = await use_case.execute()
+    logger.info("Listing %d chat sessions", len(sessions))
+    return ORJSONBytesResponse(encode_chat_session_summaries(sessions))
+
 
+@router.get("/search", response_model=SessionSearchResponse)
+async def search_chat_sessions(
+    q: str = Query(..., min_length=1, description="Words to search for"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    use_case: SearchChatSessionsUseCase | None = Depends(get_search_sessions_use_case),
+) -> SessionSearchResponse:
+    """
+    Search sessions by the words of their messages, PBIs and project name.
+
+    Sessions containing more of the words, or containing them in the project
+    name or PBI titles, come first. The index is in memory: the search runs
+    inline, without a worker thread.
+    """
+    if use_case is None:
+        raise HTTPException(status_code=404, detail="Ricerca sessioni non abilitata")
+    results = use_case.execute(q, limit=limit, offset=offset)
+    return SessionSearchResponse(
+        query=q,
+        total=results.total,
+        offset=offset,
+        hits=[
+            SessionSearchHitResponse(
+                chat_id=hit.chat_id,
+                score=hit.score,
+                project=hit.project,
+                status=hit.status.value,
+                updated_at=hit.updated_at,
+                fields=list(hit.fields),
+                pbi_titles=list(hit.pbi_titles),
+            )
+            for hit in results.hits
+        ],
+    )
+
+
+@router.get("/analytics", response_model=SessionAnalyticsResponse)
+async def get_session_analytics(
+    use_case: GetSessionAnalyticsUseCase | None = Depends(
+        get_session_analytics_use_case
+    ),
+) -> SessionAnalyticsResponse:
+    """
+    Aggregate figures about the chat sessions.
 
-@router.get("/{chat_id}", response_model=ChatSessionDetailResponse)
+    Sessions by status, work items created per project and day, and user
+    turns to confirmation, read from counters updated on every save: cheap
+    enough for dashboards to poll.
+    """
+    if use_case is None:
+        raise HTTPException(status_code=404, detail="Statistiche non abilitate")
+    report = use_case.execute()
+    return SessionAnalyticsResponse(
+        total_sessions=sum(report.sessions_by_status.values()),
+        sessions_by_status={
+            status.value: count for status, count in report.sessions_by_status.items()
+        },
+        pbis_created=[
+            DailyPBICountResponse(day=item.day, project=item.project, count=item.count)
+            for item in report.pbis_created
+        ],
+        confirmations=report.confirmations,
+        average_turns_to_confirmation=report.average_turns_to_confirmation,
+    )
+
+
+@router.get(
+    "/{chat_id}",
+    response_model=ChatSessionDetailResponse,
+    responses={304: {"description": "Session unchanged since the given ETag"}},
+)
 async def get_chat_session(
     chat_id: UUID,
-    use_case: GetChatSessionUseCase = Depends(get_get_session_use_case),
-) -> ChatSessionDetailResponse:
-    """Get detailed information about a specific chat session."""
-    session = use_case.execute(chat_id)
+    since: int = Query(0, ge=0, description="Cursor: position of the first message"),
+    limit: int | None = Query(None, ge=1, description="Maximum messages to return"),
+    if_none_match: str | None = Header(None),
+    use_case: AsyncGetChatSessionUseCase = Depends(get_get_session_use_case),
+) -> Response:
+    """
+    Get detailed information about a specific chat session.
+
+    The ETag changes on every update of the session: polling clients should
+    send it back in If-None-Match and get 304 while nothing changed, and use
+    ``since=next_cursor`` to fetch only the new messages.
+    """
+    session = await use_case.execute(chat_id)
     if not session:
         raise HTTPException(
             status_code=404, detail=f"Sessione di chat non trovata: {chat_id}"
         )
 
-    logger.info(f"Retrieved chat session: {chat_id}")
-    return to_chat_session_detail_response(session)
+    etag = session_etag(session)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    logger.info("Retrieved chat session: %s", chat_id)
+    return ORJSONBytesResponse(
+        encode_chat_session_detail(session, since, limit), headers=headers
+    )
 
 
 @router.post("/{chat_id}/messages", response_model=AddMessageResponse)
 async def add_message_to_chat(
     chat_id: UUID,
     request: AddMessageRequest,
-    use_case: AddMessageUseCase = Depends(get_add_message_use_case),
+    use_case: AsyncAddMessageUseCase = Depends(get_add_message_use_case),
+    admission: AdmissionController = Depends(get_admission_controller),
 ) -> AddMessageResponse:
     """
     Add a message to a chat session.
 
     If the message is from a user, the system automatically analyzes
-    the conversation and generates an assistant response.
+    the conversation and generates an assistant response. The analysis
+    runs on a worker thread under admission control (lowest priority).
     """
     try:
         role = MessageRole(request.role.lower())
@@ -100,7 +222,10 @@ async def add_message_to_chat(
         )
 
     try:
-        session, assistant_response = use_case.execute(chat_id, role, request.content)
+        async with admission.admit(Priority.EXTRACTION):
+            session, assistant_response = await use_case.execute(
+                chat_id, role, request.content
+            )
 
         # Build confirm_url when the session is ready for confirmation
         confirm_url: str | None = None
@@ -126,10 +251,12 @@ async def add_message_to_chat(
             confirm_url=confirm_url,
         )
 
+    except RequestShedError:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"Error adding message: {e}", exc_info=True)
+        logger.error("Error adding message: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Errore interno: {str(e)}")
 
 
@@ -137,33 +264,64 @@ async def add_message_to_chat(
 async def confirm_pbi_creation(
     chat_id: UUID,
     request: ConfirmPBIRequest,
-    use_case: ConfirmPBICreationUseCase = Depends(get_confirm_pbi_use_case),
+    use_case: AsyncConfirmPBICreationUseCase = Depends(get_confirm_pbi_use_case),
+    admission: AdmissionController = Depends(get_admission_controller),
 ) -> MessageResponse:
-    """Confirm or reject PBI creation for a chat session."""
+    """
+    Confirm or reject PBI creation for a chat session.
+
+    The Azure DevOps calls run on a worker thread, admitted ahead of
+    pending extraction work.
+    """
     try:
-        success, message = use_case.execute(chat_id, request.confirm)
+        async with admission.admit(Priority.CONFIRM):
+            _, message = await use_case.execute(chat_id, request.confirm)
         return MessageResponse(message=message)
 
+    except RequestShedError:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error confirming PBI creation: {e}", exc_info=True)
+        if _ambiguous_write(e):
+            # Not worth an automatic retry: confirming again first looks up
+            # the work item that may have been created.
+            raise HTTPException(
+                status_code=502,
+                detail="Azure DevOps non ha confermato la creazione di un PBI: "
+                "alla prossima conferma verrà cercato nel backlog prima di crearlo "
+                "di nuovo.",
+            )
+        unavailable = _unavailable_dependency(e)
+        if unavailable is not None:
+            # Work items already created are kept and not created again.
+            headers = (
+                {"Retry-After": str(math.ceil(unavailable.retry_after_s))}
+                if unavailable.retry_after_s is not None
+                else None
+            )
+            raise HTTPException(
+                status_code=503,
+                detail="Azure DevOps non è al momento raggiungibile. Riprova più tardi.",
+                headers=headers,
+            )
+        logger.error("Error confirming PBI creation: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Errore interno: {str(e)}")
 
 
 @router.delete("/{chat_id}", response_model=MessageResponse)
 async def delete_chat_session(
     chat_id: UUID,
-    use_case: DeleteChatSessionUseCase = Depends(get_delete_session_use_case),
+    use_case: AsyncDeleteChatSessionUseCase = Depends(get_delete_session_use_case),
 ) -> MessageResponse:
     """Delete a chat session."""
-    success = use_case.execute(chat_id)
+    success = await use_case.execute(chat_id)
     if not success:
         raise HTTPException(
             status_code=404, detail=f"Sessione di chat non trovata: {chat_id}"
         )
 
-    logger.info(f"Deleted chat session: {chat_id}")
+    logger.info("Deleted chat session: %s", chat_id)
     return MessageResponse(
         message=f"Sessione di chat {chat_id} eliminata con successo."
     )
@@ -0,0 +1,101 @@
+"""Fast-path JSON encoding of domain entities for API responses.
+
+Building one pydantic DTO per message and per PBI, which FastAPI then
+validates and serializes again, dominates the response time of large
+sessions, so the read endpoints encode the domain entities straight to JSON
+bytes with orjson instead. The output has the same
+shape as the DTOs in ``src.api.dtos``, which remain the OpenAPI schema of the
+routes through ``response_model``.
+
+``ChatMessage`` dataclasses are passed to orjson as they are: their fields
+(role, content, timestamp) are exactly those of ``ChatMessageResponse``, and
+orjson serializes dataclasses, str enums, UUIDs and datetimes natively.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+from src.domain.entities import ChatSession, LMUsage
+
+
+class ORJSONBytesResponse(Response):
+    """JSON response whose body is already encoded."""
+
+    media_type = "application/json"
+
+
+def _lm_usage(usage: LMUsage) -> dict[str, Any]:
+    return {
+        "calls": usage.calls,
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+        "wall_time_s": round(usage.wall_time_s, 3),
+    }
+
+
+def _session_detail(
+    session: ChatSession, since: int, limit: int | None
+) -> dict[str, Any]:
+    end = None if limit is None else since + limit
+    messages = session.messages[since:end]
+    return {
+        "chat_id": session.chat_id,
+        "version": session.version,
+        "messages": messages,
+        "message_count": len(session.messages),
+        "next_cursor": min(since, len(session.messages)) + len(messages),
+        "created_at": session.created_at,
+        "updated_at": session.updated_at,
+        "project": session.project,
+        "pbis": [
+            {
+                "id": pbi.id,
+                "title": pbi.title,
+                "description": pbi.description,
+                "work_item_id": pbi.work_item_id,
+                # DuplicateCandidate has the fields of DuplicateCandidateResponse.
+                "possible_duplicates": session.duplicates.get(pbi.id, []),
+            }
+            for pbi in session.pbis
+        ],
+        # Same fields as PBIDiffResponse: lists of UUIDs.
+        "pbi_diff": session.pbi_diff,
+        "status": session.status.value,
+        "awaiting_confirmation": session.awaiting_confirmation,
+        "lm_usage": _lm_usage(session.lm_usage),
+    }
+
+
+def _session_summary(session: ChatSession) -> dict[str, Any]:
+    return {
+        "chat_id": session.chat_id,
+        "version": session.version,
+        "message_count": len(session.messages),
+        "created_at": session.created_at,
+        "updated_at": session.updated_at,
+        "project": session.project,
+        "pbi_count": len(session.pbis),
+        "status": session.status.value,
+        "lm_usage": _lm_usage(session.lm_usage),
+    }
+
+
+def encode_chat_session_detail(
+    session: ChatSession, since: int = 0, limit: int | None = None
+) -> bytes:
+    """
+    Encode a session as ``ChatSessionDetailResponse`` JSON.
+
+    Only the messages from position ``since`` on are included, at most
+    ``limit`` of them. Messages are append-only, so positions are stable
+    cursors.
+    """
+    return orjson.dumps(_session_detail(session, since, limit))
+
+
+def encode_chat_session_summaries(sessions: list[ChatSession]) -> bytes:
+    """Encode sessions as a ``list[ChatSessionSummaryResponse]`` JSON array."""
+    return orjson.dumps([_session_summary(s) for s in sessions])
@@ -1,7 +1,14 @@
 import logging
+import threading
+from functools import cache
 
 from azure.devops.connection import Connection
-from azure.devops.v7_1.work_item_tracking.models import JsonPatchOperation
+from azure.devops.v7_1.work_item_tracking.models import (
+    JsonPatchOperation,
+    TeamContext,
+    Wiql,
+    WorkItemBatchGetRequest,
+)
 from msrest.authentication import BasicAuthentication
 
 from src.config import settings
@@ -9,31 +16,144 @@ from src.models import PBI
 
 logger = logging.getLogger(__name__)
 
-ORGANIZATION_BASE_URL = "https://dev.azure.com/"
+BACKLOG_FIELDS = [
+    "System.Id",
+    "System.Title",
+    "System.Description",
+    "System.State",
+    "System.ChangedDate",
+]
+# Massimo numero di ID per richiesta batch.
+BATCH_SIZE = 200
+# Progetti per pagina nell'elenco dei progetti.
+PROJECTS_PAGE_SIZE = 100
 
 
-def add_pbi(pbis: list[PBI], organization: str, project: str) -> None:
-    """Aggiunge una lista di PBI ad Azure DevOps."""
+def _configure_transport(config, timeout_s: float) -> None:
+    # Niente retry dell'SDK: li gestisce AzureDevOpsServiceImpl, con backoff
+    # e circuit breaker.
+    config.connection.timeout = timeout_s
+    config.retry_policy.retries = 0
 
-    envs = settings.EnvironmentSettings()
-    credentials = BasicAuthentication("", envs.azdo_personal_access_token)
-    connection = Connection(
-        base_url=f"{ORGANIZATION_BASE_URL}{organization}",
-        creds=credentials,
+
+@cache
+def _settings() -> settings.EnvironmentSettings:
+    return settings.EnvironmentSettings()
+
+
+_connections: dict[str, Connection] = {}
+_connections_lock = threading.Lock()
+
+
+def _connection(organization: str) -> Connection:
+    """Connessione all'organizzazione, creata una volta sola."""
+
+    # L'SDK tiene in cache nella connessione i client e le resource area:
+    # riusarla evita di ripetere la ricerca delle resource area a ogni chiamata.
+    with _connections_lock:
+        connection = _connections.get(organization)
+        if connection is None:
+            envs = _settings()
+            connection = _connections[organization] = Connection(
+                base_url=f"{envs.azdo_base_url.rstrip('/')}/{organization}",
+                creds=BasicAuthentication("", envs.azdo_personal_access_token),
+            )
+        return connection
+
+
+def _configured(client):
+    """Il client, con il timeout configurato e senza retry dell'SDK."""
+
+    _configure_transport(client.config, _settings().azdo_timeout_s)
+    return client
+
+
+def get_work_item_client(organization: str):
+    """Client delle API work item tracking dell'organizzazione."""
+
+    return _configured(
+        _connection(organization).clients.get_work_item_tracking_client()
     )
 
-    for pbi in pbis:
-        wit_client = connection.clients.get_work_item_tracking_client()
-        work_item_data = [
-            JsonPatchOperation(op="add", path="/fields/System.Title", value=pbi.title),
-            JsonPatchOperation(
-                op="add", path="/fields/System.Description", value=pbi.description
-            ),
-        ]
-
-        wit_client.create_work_item(
-            project=project,
-            type="Product Backlog Item",
-            document=work_item_data,
-        )
+
+def list_projects(organization: str) -> list[str]:
+    """Nomi dei progetti dell'organizzazione."""
+
+    core_client = _configured(_connection(organization).clients.get_core_client())
+    names: list[str] = []
+    while True:
+        page = core_client.get_projects(top=PROJECTS_PAGE_SIZE, skip=len(names))
+        names.extend(project.name for project in page)
+        if len(page) < PROJECTS_PAGE_SIZE:
+            return names
+
+
+def _pbi_fields(pbi: PBI) -> list[JsonPatchOperation]:
+    # "add" su un campo esistente ne sostituisce il valore.
+    return [
+        JsonPatchOperation(op="add", path="/fields/System.Title", value=pbi.title),
+        JsonPatchOperation(
+            op="add", path="/fields/System.Description", value=pbi.description
+        ),
+    ]
+
+
+def create_work_item(wit_client, project: str, pbi: PBI) -> int:
+    """Crea un PBI e restituisce l'ID del work item."""
+
+    work_item = wit_client.create_work_item(
+        project=project,
+        type="Product Backlog Item",
+        document=_pbi_fields(pbi),
+    )
+    return work_item.id
+
+
+def update_work_item(wit_client, project: str, work_item_id: int, pbi: PBI) -> None:
+    """Aggiorna titolo e descrizione di un work item esistente."""
+
+    wit_client.update_work_item(
+        document=_pbi_fields(pbi), id=work_item_id, project=project
+    )
+
+
+def add_pbi(pbis: list[PBI], organization: str, project: str) -> list[int]:
+    """Aggiunge una lista di PBI ad Azure DevOps e restituisce gli ID creati."""
+
+    wit_client = get_work_item_client(organization)
+    work_item_ids = [create_work_item(wit_client, project, pbi) for pbi in pbis]
     logger.info("PBIs processed successfully.")
+    return work_item_ids
+
+
+def query_backlog(wit_client, project: str, changed_since: str | None = None) -> list:
+    """PBI del progetto modificati da ``changed_since`` (data ISO 8601) in poi."""
+
+    project_literal = project.replace("'", "''")
+    query = (
+        "SELECT [System.Id] FROM WorkItems"
+        f" WHERE [System.TeamProject] = '{project_literal}'"
+        " AND [System.WorkItemType] = 'Product Backlog Item'"
+    )
+    if changed_since:
+        query += f" AND [System.ChangedDate] >= '{changed_since}'"
+    query += " ORDER BY [System.ChangedDate] ASC"
+
+    result = wit_client.query_by_wiql(
+        Wiql(query=query),
+        team_context=TeamContext(project=project),
+        time_precision=True,
+    )
+    ids = [reference.id for reference in result.work_items or []]
+
+    work_items = []
+    for start in range(0, len(ids), BATCH_SIZE):
+        work_items.extend(
+            wit_client.get_work_items_batch(
+                WorkItemBatchGetRequest(
+                    ids=ids[start : start + BATCH_SIZE], fields=BACKLOG_FIELDS
+                ),
+                project=project,
+            )
+        )
+    return work_items
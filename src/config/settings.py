@@ -1,3 +1,5 @@
+from typing import Any, Literal
+
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
 
@@ -6,5 +8,153 @@ class EnvironmentSettings(BaseSettings):
     gemini_api_key: str
     azdo_personal_access_token: str
     azdo_organization: str
+    azdo_base_url: str = "https://dev.azure.com/"
+
+    # Compiled extraction programs produced by `python -m src.extractors.optimize`.
+    # When unset, the uncompiled ChainOfThought programs are used.
+    pbi_program_path: str | None = None
+    azdo_program_path: str | None = None
+
+    # Overrides of the per-extractor generation profiles ("pbi", "project"),
+    # see src/extractors/profiles.py, e.g.
+    # GENERATION_PROFILES='{"pbi": {"max_tokens": 8192, "reasoning": false}}'.
+    generation_profiles: dict[str, dict[str, Any]] = {}
+    # Stable-prefix prompt layout: instructions, field definitions and demos
+    # form a prefix identical on every call, the conversation comes last.
+    # With prompt_cache_enabled the prefix is marked for provider context
+    # caching, once at least prompt_cache_min_tokens long. The uncompiled
+    # programs' prefixes are 250-600 tokens, under the default (Gemini's
+    # minimum): only compiled programs with enough demos get cached, and a
+    # warning is logged for each program that does not.
+    prompt_stable_prefix: bool = False
+    prompt_cache_enabled: bool = False
+    prompt_cache_min_tokens: int = 1024
+    # PBI extraction of conversations longer than pbi_chunk_tokens (estimated)
+    # runs on chunks split at paragraph, turn and sentence boundaries, up to
+    # pbi_chunk_parallelism at a time, then merges near-identical PBIs.
+    # 0 (the default) always extracts in a single call.
+    pbi_chunk_tokens: int = 0
+    pbi_chunk_overlap_tokens: int = 200
+    pbi_chunk_parallelism: int = 4
+
+    # Shadow evaluation: this fraction of PBI extractions also runs, in the
+    # background, through a candidate pipeline (model, compiled program and
+    # generation profiles; unset ones as the primary). Agreement, latency and
+    # tokens are on /metrics and GET /admin/shadow. 0 disables it.
+    pbi_shadow_fraction: float = 0.0
+    pbi_shadow_name: str = "candidate"
+    pbi_shadow_model: str | None = None
+    pbi_shadow_program_path: str | None = None
+    pbi_shadow_generation_profiles: dict[str, dict[str, Any]] | None = None
+    pbi_shadow_max_pending: int = 4
+
+    # Per-session LM budget; unset limits are not enforced.
+    # Policy "degrade" switches to cheaper extraction once over budget and
+    # refuses past hard_limit_factor x budget; "refuse" refuses right away.
+    session_max_tokens: int | None = None
+    session_max_lm_calls: int | None = None
+    session_budget_policy: Literal["degrade", "refuse"] = "degrade"
+    session_budget_hard_limit_factor: float = 2.0
+
+    # Duplicate detection against the existing backlog of the target project.
+    # Each project is re-synced (changed items only) at most this often.
+    backlog_index_enabled: bool = False
+    backlog_sync_interval_s: float = 300.0
+
+    # Extracted project names are checked against the organization's projects,
+    # a list cached for this many seconds.
+    project_catalog_enabled: bool = True
+    project_catalog_ttl_s: float = 600.0
+
+    # Transient LM and Azure DevOps failures are retried with jittered
+    # exponential backoff; a dependency failing breaker_failure_threshold
+    # times in a row is skipped for breaker_reset_timeout_s (see /health).
+    retry_max_attempts: int = 3
+    retry_base_delay_s: float = 0.5
+    retry_max_delay_s: float = 8.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout_s: float = 30.0
+    # Per-request timeouts, in seconds.
+    lm_timeout_s: float = 60.0
+    azdo_timeout_s: float = 30.0
+
+    # Turn gate: acknowledgements and repeats of the known project reuse the
+    # previous analysis without LM calls; other turns are scored by the model
+    # trained with `python -m src.infrastructure.services.turn_gate`, if set,
+    # and skipped below turn_gate_skip_below. turn_gate_log_labels logs each
+    # extracted turn (text included) with whether it changed the extraction.
+    turn_gate_enabled: bool = False
+    turn_gate_model_path: str | None = None
+    turn_gate_skip_below: float = 0.2
+    turn_gate_log_labels: bool = False
+
+    # Admission control of the message and confirm routes: at most
+    # admission_max_concurrent run at once, admission_max_queue wait (a
+    # confirmation before new extraction work) for up to
+    # admission_max_queue_wait_s; other requests get 429/503 + Retry-After.
+    admission_max_concurrent: int = 8
+    admission_max_queue: int = 32
+    admission_max_queue_wait_s: float = 10.0
+
+    # Full-text search of sessions (GET /chat/sessions/search), from an index
+    # of messages, PBIs and project names updated on every save (under the
+    # session's lock, so off by default).
+    session_search_enabled: bool = False
+
+    # Session analytics (GET /chat/sessions/analytics): counters updated on
+    # every save (under the session's lock, so off by default); work items
+    # created are kept per day for this many days.
+    session_analytics_enabled: bool = False
+    session_analytics_retention_days: int = 90
+
+    # Messages of completed sessions, and of sessions not updated for
+    # session_pack_idle_after_s (0 to keep them unpacked), are kept
+    # compressed in memory and unpacked when the session is read.
+    session_pack_completed: bool = False
+    session_pack_idle_after_s: float = 0.0
+
+    # LM cassettes: "record" appends every LM call (with its latency) to
+    # lm_cassette_path, "replay" answers from that file only, offline.
+    lm_cassette_mode: Literal["record", "replay"] | None = None
+    lm_cassette_path: str = "cassettes/lm.jsonl"
+    lm_cassette_replay_latency: bool = False
+
+    # The .env file also holds the LOG_* and ADMIN_* keys of the classes below.
+    model_config = ConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class LoggingSettings(BaseSettings):
+    """Service logging, read from LOG_* variables."""
+
+    level: str = "INFO"
+    # "text" or "json" (one object per line, with correlation ids).
+    format: str = "text"
+    # Fraction of records below WARNING kept per logger (prefix match), e.g.
+    # LOG_SAMPLE_RATES='{"src.infrastructure.repositories": 0.1}'.
+    sample_rates: dict[str, float] = {}
+    # Records are dropped, not waited for, when the queue is full.
+    queue_size: int = 10000
+
+    model_config = ConfigDict(
+        env_prefix="LOG_", env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class AdminSettings(BaseSettings):
+    """Admin diagnostics endpoints, read from ADMIN_* variables."""
+
+    # Off by default: /admin routes and request tracing exist only when
+    # enabled, and only with a token (sent as "Authorization: Bearer ...").
+    enabled: bool = False
+    token: str | None = None
+    # Requests slower than this are kept with their stage breakdown, the
+    # latest slow_requests_per_route of each route.
+    slow_request_threshold_s: float = 1.0
+    slow_requests_per_route: int = 20
+    max_profile_duration_s: float = 60.0
 
-    model_config = ConfigDict(env_file=".env", env_file_encoding="utf-8")
+    model_config = ConfigDict(
+        env_prefix="ADMIN_", env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
@@ -1,10 +1,13 @@
 """Domain entities representing core business concepts."""
 
-from dataclasses import dataclass, field
-from datetime import datetime
+import copy
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime
 from enum import Enum
 from uuid import UUID, uuid4
 
+from src.domain.pbi_matching import IDENTITY_THRESHOLD, match_pbis, normalize_text
+
 
 class MessageRole(str, Enum):
     """Role of the message sender."""
@@ -24,12 +27,40 @@ class SessionStatus(str, Enum):
     ERROR = "error"
 
 
+class ExtractionMode(str, Enum):
+    """How much LM effort an extraction may spend."""
+
+    FULL = "full"
+    # Cheaper extraction: no reasoning tokens, known project is reused.
+    ECONOMY = "economy"
+
+
+class BudgetPolicy(str, Enum):
+    """What to do once a session exceeds its LM budget."""
+
+    DEGRADE = "degrade"
+    REFUSE = "refuse"
+
+
 @dataclass
 class PBI:
-    """Product Backlog Item."""
+    """
+    Product Backlog Item.
+
+    ``id`` stays the same across extractions of the same item (see
+    ``ChatSession.update_extraction``). ``work_item_id`` and
+    ``synced_fingerprint`` record the Azure DevOps work item created for it
+    and the content it was last written with. ``create_attempted_at`` is set
+    when creating the work item failed without telling whether it was
+    created: it is looked for in the backlog before creating it again.
+    """
 
     title: str
     description: str
+    id: UUID = field(default_factory=uuid4)
+    work_item_id: int | None = None
+    synced_fingerprint: str | None = None
+    create_attempted_at: datetime | None = None
 
     def __post_init__(self):
         if not self.title or not self.title.strip():
@@ -37,6 +68,158 @@ class PBI:
         if not self.description or not self.description.strip():
             raise ValueError("PBI description cannot be empty")
 
+    def fingerprint(self) -> str:
+        """Normalized content; formatting-only edits do not change it."""
+        return f"{normalize_text(self.title)}\n{normalize_text(self.description)}"
+
+    def needs_update(self) -> bool:
+        """Check if the work item exists but differs from this content."""
+        return (
+            self.work_item_id is not None
+            and self.fingerprint() != self.synced_fingerprint
+        )
+
+    def mark_synced(self, work_item_id: int | None = None) -> None:
+        """Record that the work item now holds this content."""
+        if work_item_id is not None:
+            self.work_item_id = work_item_id
+            self.create_attempted_at = None
+        self.synced_fingerprint = self.fingerprint()
+
+
+@dataclass
+class PBIDiff:
+    """PBI ids added, changed and removed by the latest extraction."""
+
+    added: list[UUID] = field(default_factory=list)
+    changed: list[UUID] = field(default_factory=list)
+    removed: list[UUID] = field(default_factory=list)
+
+
+@dataclass
+class BacklogItem:
+    """Existing work item of a project backlog."""
+
+    work_item_id: int
+    title: str
+    description: str
+    changed_date: datetime
+    # Deleted from the backlog (state "Removed").
+    removed: bool = False
+
+    def fingerprint(self) -> str:
+        """Normalized content, comparable with ``PBI.fingerprint``."""
+        return f"{normalize_text(self.title)}\n{normalize_text(self.description)}"
+
+
+@dataclass(frozen=True)
+class DuplicateCandidate:
+    """Existing work item that a PBI likely duplicates."""
+
+    work_item_id: int
+    title: str
+    score: float
+
+
+@dataclass(frozen=True)
+class SessionSearchHit:
+    """Chat session matching a search."""
+
+    chat_id: UUID
+    score: float
+    project: str | None
+    status: SessionStatus
+    updated_at: datetime
+    # Fields the query words were found in: project, pbi_title,
+    # pbi_description, message.
+    fields: tuple[str, ...]
+    # Titles of the current PBIs containing any of the query words.
+    pbi_titles: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class SessionSearchResults:
+    """A page of search hits, best first, and the number of matches."""
+
+    total: int
+    hits: list[SessionSearchHit]
+
+
+@dataclass(frozen=True)
+class DailyPBICount:
+    """Work items created for a project on a day."""
+
+    day: date
+    project: str | None
+    count: int
+
+
+@dataclass(frozen=True)
+class SessionAnalyticsReport:
+    """Aggregates over the sessions, kept up to date as they change."""
+
+    sessions_by_status: dict[SessionStatus, int]
+    # Oldest day first, within the retention period.
+    pbis_created: list[DailyPBICount]
+    confirmations: int
+    # User messages sent before each confirmation, on average.
+    average_turns_to_confirmation: float | None
+
+
+@dataclass
+class LMUsage:
+    """Accumulated language model usage."""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    wall_time_s: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, other: "LMUsage") -> None:
+        """Accumulate another usage record into this one."""
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.wall_time_s += other.wall_time_s
+
+
+@dataclass
+class SessionBudget:
+    """
+    Per-session LM budget.
+
+    Limits left as None are not enforced. With the DEGRADE policy, sessions
+    over budget use cheaper extractions until they reach ``hard_limit_factor``
+    times the budget, then extraction is refused.
+    """
+
+    max_tokens: int | None = None
+    max_calls: int | None = None
+    policy: BudgetPolicy = BudgetPolicy.DEGRADE
+    hard_limit_factor: float = 2.0
+
+    def _exceeds(self, usage: LMUsage, factor: float) -> bool:
+        if (
+            self.max_tokens is not None
+            and usage.total_tokens >= self.max_tokens * factor
+        ):
+            return True
+        return self.max_calls is not None and usage.calls >= self.max_calls * factor
+
+    def extraction_mode(self, usage: LMUsage) -> ExtractionMode | None:
+        """Mode allowed for the next extraction, or None if it must be refused."""
+        if not self._exceeds(usage, 1.0):
+            return ExtractionMode.FULL
+        if self.policy == BudgetPolicy.REFUSE or self._exceeds(
+            usage, self.hard_limit_factor
+        ):
+            return None
+        return ExtractionMode.ECONOMY
+
 
 @dataclass
 class ChatMessage:
@@ -67,6 +250,45 @@ class ChatSession:
     pbis: list[PBI] = field(default_factory=list)
     status: SessionStatus = SessionStatus.ACTIVE
     awaiting_confirmation: bool = False
+    lm_usage: LMUsage = field(default_factory=LMUsage)
+    pbi_diff: PBIDiff = field(default_factory=PBIDiff)
+    # PBIs no longer extracted that already have (or may have) a work item,
+    # kept so that they get it back if they are extracted again.
+    retired_pbis: list[PBI] = field(default_factory=list)
+    # Likely duplicates in the project backlog, by PBI id.
+    duplicates: dict[UUID, list[DuplicateCandidate]] = field(default_factory=dict)
+    # Assistant reply of the last completed analysis, reused for turns that
+    # cannot change it; None when the session has moved on since.
+    last_analysis: str | None = None
+    # Version of the stored session this one was read at, incremented by
+    # the repository on every save; 0 until first saved. A save from an
+    # outdated version is refused (see ChatSessionRepository.save).
+    version: int = 0
+
+    def copy(self, messages: list[ChatMessage] | None = None) -> "ChatSession":
+        """
+        Independent copy: changing one does not change the other.
+
+        Messages and duplicate candidates are never changed in place and
+        are shared; the PBIs and the containers are copied. ``messages``,
+        if given, replaces the copied messages list.
+        """
+        return replace(
+            self,
+            messages=list(self.messages) if messages is None else messages,
+            pbis=[copy.copy(pbi) for pbi in self.pbis],
+            lm_usage=replace(self.lm_usage),
+            pbi_diff=PBIDiff(
+                list(self.pbi_diff.added),
+                list(self.pbi_diff.changed),
+                list(self.pbi_diff.removed),
+            ),
+            retired_pbis=[copy.copy(pbi) for pbi in self.retired_pbis],
+            duplicates={
+                pbi_id: list(candidates)
+                for pbi_id, candidates in self.duplicates.items()
+            },
+        )
 
     def add_message(self, role: MessageRole, content: str) -> ChatMessage:
         """Add a message to the session."""
@@ -76,11 +298,61 @@ class ChatSession:
         return message
 
     def update_extraction(self, project: str | None, pbis: list[PBI]) -> None:
-        """Update session with extracted project and PBIs."""
+        """
+        Update session with extracted project and PBIs.
+
+        Each extracted PBI similar enough to a known one (current or retired)
+        takes over its id and work item; the differences with the current
+        PBIs are recorded in ``pbi_diff``.
+        """
+        known = self.pbis + self.retired_pbis
+        matched = {
+            j: known[i] for i, j, _ in match_pbis(known, pbis, IDENTITY_THRESHOLD)
+        }
+        current_ids = {pbi.id for pbi in self.pbis}
+
+        diff = PBIDiff()
+        for j, pbi in enumerate(pbis):
+            previous = matched.get(j)
+            if previous is None:
+                diff.added.append(pbi.id)
+                continue
+            pbi.id = previous.id
+            pbi.work_item_id = previous.work_item_id
+            pbi.synced_fingerprint = previous.synced_fingerprint
+            pbi.create_attempted_at = previous.create_attempted_at
+            if previous.id not in current_ids:
+                diff.added.append(pbi.id)
+            elif pbi.fingerprint() != previous.fingerprint():
+                diff.changed.append(pbi.id)
+
+        kept_ids = {pbi.id for pbi in pbis}
+        removed = [pbi for pbi in self.pbis if pbi.id not in kept_ids]
+        diff.removed = [pbi.id for pbi in removed]
+        self.retired_pbis = [
+            pbi
+            for pbi in (*self.retired_pbis, *removed)
+            if pbi.id not in kept_ids
+            and (pbi.work_item_id is not None or pbi.create_attempted_at is not None)
+        ]
+
         self.project = project
         self.pbis = pbis
+        self.pbi_diff = diff
         self.updated_at = datetime.now()
 
+    def pbis_to_create(self) -> list[PBI]:
+        """PBIs without a work item yet."""
+        return [pbi for pbi in self.pbis if pbi.work_item_id is None]
+
+    def pbis_to_update(self) -> list[PBI]:
+        """PBIs whose work item content is out of date."""
+        return [pbi for pbi in self.pbis if pbi.needs_update()]
+
+    def record_lm_usage(self, usage: LMUsage) -> None:
+        """Add the LM usage of an extraction to the session totals."""
+        self.lm_usage.add(usage)
+
     def update_status(self, status: SessionStatus) -> None:
         """Update the session status."""
         self.status = status
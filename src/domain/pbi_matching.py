@@ -0,0 +1,107 @@
+"""Similarity and matching rules between PBIs.
+
+Pure functions shared by evaluation, diffing and deduplication. They work on
+any object exposing ``title`` and ``description`` attributes, so both domain
+entities and the Pydantic models returned by the extractors are accepted.
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Protocol, Sequence
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Weight of the title in the combined similarity; descriptions are longer
+# and paraphrased more freely between extractions.
+TITLE_WEIGHT = 0.7
+
+# Minimum similarity for a newly extracted PBI to keep the identity (and the
+# Azure DevOps work item) of a previously extracted one.
+IDENTITY_THRESHOLD = 0.7
+
+# Minimum similarity for an existing work item to be flagged as a likely
+# duplicate of an extracted PBI.
+DUPLICATE_THRESHOLD = 0.6
+
+
+class PBILike(Protocol):
+    title: str
+    description: str
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _WHITESPACE.sub(" ", _NON_WORD.sub(" ", without_accents)).strip()
+
+
+def text_similarity(a: str, b: str) -> float:
+    """Similarity ratio in [0, 1] between two normalized texts."""
+    a, b = normalize_text(a), normalize_text(b)
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def pbi_similarity(a: PBILike, b: PBILike) -> float:
+    """Weighted title/description similarity between two PBIs."""
+    title = text_similarity(a.title, b.title)
+    if title == 1.0:
+        return 1.0
+    description = text_similarity(a.description, b.description)
+    return TITLE_WEIGHT * title + (1 - TITLE_WEIGHT) * description
+
+
+def match_pbis(
+    left: Sequence[PBILike], right: Sequence[PBILike], threshold: float
+) -> list[tuple[int, int, float]]:
+    """
+    Greedily pair PBIs of ``left`` with PBIs of ``right``.
+
+    Pairs are taken in decreasing similarity order; each PBI is used at
+    most once and pairs below ``threshold`` are discarded.
+
+    Returns:
+        list: (left_index, right_index, similarity) tuples
+    """
+    candidates = sorted(
+        (
+            (pbi_similarity(a, b), i, j)
+            for i, a in enumerate(left)
+            for j, b in enumerate(right)
+        ),
+        reverse=True,
+    )
+    used_left: set[int] = set()
+    used_right: set[int] = set()
+    pairs: list[tuple[int, int, float]] = []
+    for score, i, j in candidates:
+        if score < threshold:
+            break
+        if i in used_left or j in used_right:
+            continue
+        used_left.add(i)
+        used_right.add(j)
+        pairs.append((i, j, score))
+    return pairs
+
+
+def pbi_set_f1(
+    expected: Sequence[PBILike], predicted: Sequence[PBILike], threshold: float = 0.6
+) -> float:
+    """F1 score of ``predicted`` against ``expected`` using :func:`match_pbis`."""
+    if not expected and not predicted:
+        return 1.0
+    if not expected or not predicted:
+        return 0.0
+    matched = len(match_pbis(expected, predicted, threshold))
+    precision = matched / len(predicted)
+    recall = matched / len(expected)
+    if matched == 0:
+        return 0.0
+    return 2 * precision * recall / (precision + recall)
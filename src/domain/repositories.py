@@ -1,27 +1,53 @@
 """Repository interfaces (ports) for the domain layer."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from uuid import UUID
 
 from src.domain.entities import ChatSession
 
 
+class ConcurrentModificationError(Exception):
+    """A session was saved from a version that is no longer the stored one."""
+
+    def __init__(self, chat_id: UUID, expected: int, actual: int | None):
+        self.chat_id = chat_id
+        self.expected = expected
+        self.actual = actual
+        super().__init__(
+            f"Chat session {chat_id} changed: read at version {expected}, "
+            f"stored {'deleted' if actual is None else f'at version {actual}'}"
+        )
+
+
 class ChatSessionRepository(ABC):
-    """Interface for chat session persistence."""
+    """
+    Interface for chat session persistence.
+
+    Sessions are read as snapshots: changing one does not change the store
+    until it is saved, and later saves do not change it. ``save`` is a
+    compare-and-swap on ``session.version``.
+    """
 
     @abstractmethod
     def save(self, session: ChatSession) -> None:
-        """Save a chat session."""
+        """
+        Save a chat session, incrementing ``session.version``.
+
+        Raises:
+            ConcurrentModificationError: the stored session is no longer at
+                ``session.version`` (saved or deleted meanwhile).
+        """
         pass
 
     @abstractmethod
     def get_by_id(self, chat_id: UUID) -> ChatSession | None:
-        """Retrieve a chat session by ID."""
+        """Retrieve a snapshot of a chat session by ID."""
         pass
 
     @abstractmethod
     def get_all(self) -> list[ChatSession]:
-        """Retrieve all chat sessions."""
+        """Retrieve snapshots of all chat sessions."""
         pass
 
     @abstractmethod
@@ -33,3 +59,80 @@ class ChatSessionRepository(ABC):
     def exists(self, chat_id: UUID) -> bool:
         """Check if a chat session exists."""
         pass
+
+
+class ChatSessionListener(ABC):
+    """
+    Receives the changes of a repository's sessions as they are stored.
+
+    Called by the repository in store order for each session, so that
+    derived views (search index, analytics) are kept up to date without
+    rescanning the store. Calls are synchronous and must be quick; the
+    session passed is the stored copy and must not be changed.
+    """
+
+    @abstractmethod
+    def session_saved(self, session: ChatSession) -> None:
+        """A session was created or updated."""
+        pass
+
+    @abstractmethod
+    def session_deleted(self, chat_id: UUID) -> None:
+        """A session was deleted."""
+        pass
+
+
+class AsyncChatSessionRepository(ABC):
+    """
+    Interface for chat session persistence that does not block the caller.
+
+    For storage backends doing disk or network I/O, awaited from the event
+    loop, with the snapshot and compare-and-swap semantics of
+    ``ChatSessionRepository``. The batch operations default to one call per
+    session; backends with a cheaper bulk query override them.
+    """
+
+    @abstractmethod
+    async def save(self, session: ChatSession) -> None:
+        """
+        Save a chat session, incrementing ``session.version``.
+
+        Raises:
+            ConcurrentModificationError: the stored session is no longer at
+                ``session.version`` (saved or deleted meanwhile).
+        """
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, chat_id: UUID) -> ChatSession | None:
+        """Retrieve a snapshot of a chat session by ID."""
+        pass
+
+    @abstractmethod
+    async def get_all(self) -> list[ChatSession]:
+        """Retrieve snapshots of all chat sessions."""
+        pass
+
+    @abstractmethod
+    async def delete(self, chat_id: UUID) -> bool:
+        """Delete a chat session."""
+        pass
+
+    @abstractmethod
+    async def exists(self, chat_id: UUID) -> bool:
+        """Check if a chat session exists."""
+        pass
+
+    async def get_many(self, chat_ids: Iterable[UUID]) -> dict[UUID, ChatSession]:
+        """Retrieve the sessions that exist among ``chat_ids``, by ID."""
+        sessions = {}
+        for chat_id in chat_ids:
+            session = await self.get_by_id(chat_id)
+            if session is not None:
+                sessions[chat_id] = session
+        return sessions
+
+    async def save_many(self, sessions: Iterable[ChatSession]) -> None:
+        """Save several chat sessions, each compare-and-swap on its own."""
+        for session in sessions:
+            await self.save(session)
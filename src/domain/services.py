@@ -1,16 +1,39 @@
 """Service interfaces (ports) for the domain layer."""
 
 from abc import ABC, abstractmethod
+from datetime import datetime
+from uuid import UUID
 
-from src.domain.entities import PBI
+from src.domain.entities import (
+    PBI,
+    BacklogItem,
+    ChatSession,
+    DuplicateCandidate,
+    ExtractionMode,
+    LMUsage,
+    SessionAnalyticsReport,
+    SessionSearchResults,
+)
 
 
 class PBIExtractionService(ABC):
     """Interface for PBI extraction from text."""
 
     @abstractmethod
-    def extract_pbis(self, conversation: str) -> list[PBI]:
-        """Extract PBIs from conversation text."""
+    def extract_pbis(
+        self,
+        conversation: str,
+        usage: LMUsage | None = None,
+        mode: ExtractionMode = ExtractionMode.FULL,
+    ) -> list[PBI]:
+        """
+        Extract PBIs from conversation text.
+
+        LM usage of the extraction is added to ``usage`` when given.
+
+        Raises:
+            DependencyUnavailableError: if the LM is failing
+        """
         pass
 
 
@@ -18,15 +41,180 @@ class ProjectExtractionService(ABC):
     """Interface for project extraction from text."""
 
     @abstractmethod
-    def extract_project(self, conversation: str) -> str | None:
-        """Extract project name from conversation text."""
+    def extract_project(
+        self,
+        conversation: str,
+        usage: LMUsage | None = None,
+        mode: ExtractionMode = ExtractionMode.FULL,
+    ) -> str | None:
+        """
+        Extract project name from conversation text.
+
+        LM usage of the extraction is added to ``usage`` when given.
+
+        Raises:
+            DependencyUnavailableError: if the LM is failing
+        """
         pass
 
 
+class WorkItemSyncError(Exception):
+    """Work item creation failed after creating some of them."""
+
+    def __init__(
+        self, message: str, created_ids: list[int], outcome_unknown: bool = False
+    ):
+        super().__init__(message)
+        # IDs of the work items created before the failure, in order.
+        self.created_ids = created_ids
+        # Whether the work item after them may have been created too.
+        self.outcome_unknown = outcome_unknown
+
+
+class DependencyUnavailableError(Exception):
+    """An external dependency is failing; the call was not (fully) made."""
+
+    def __init__(self, dependency: str, retry_after_s: float | None = None):
+        super().__init__(f"{dependency} is unavailable")
+        self.dependency = dependency
+        # Seconds after which a new attempt may succeed, when known.
+        self.retry_after_s = retry_after_s
+
+
+class AmbiguousWriteError(Exception):
+    """A non-idempotent call failed without telling whether it took effect."""
+
+    def __init__(self, dependency: str):
+        super().__init__(f"{dependency} call outcome is unknown")
+        self.dependency = dependency
+
+
 class AzureDevOpsService(ABC):
     """Interface for Azure DevOps operations."""
 
     @abstractmethod
-    def create_pbis(self, pbis: list[PBI], organization: str, project: str) -> None:
-        """Create PBIs in Azure DevOps."""
+    def create_pbis(
+        self, pbis: list[PBI], organization: str, project: str
+    ) -> list[int]:
+        """
+        Create PBIs in Azure DevOps.
+
+        Returns:
+            list: IDs of the created work items, in the order of ``pbis``
+
+        Raises:
+            WorkItemSyncError: if creation fails part-way
+        """
+        pass
+
+    @abstractmethod
+    def update_pbis(self, pbis: list[PBI], organization: str, project: str) -> None:
+        """Update the work items of PBIs already created in Azure DevOps."""
+        pass
+
+    @abstractmethod
+    def fetch_backlog_items(
+        self, organization: str, project: str, changed_since: datetime | None = None
+    ) -> list[BacklogItem]:
+        """PBIs of a project changed at or after ``changed_since`` (all if None)."""
+        pass
+
+    @abstractmethod
+    def list_projects(self, organization: str) -> list[str]:
+        """Names of the projects of the organization."""
+        pass
+
+
+class BacklogIndex(ABC):
+    """Interface for duplicate detection against existing backlogs."""
+
+    @abstractmethod
+    def find_duplicates(
+        self, project: str, pbis: list[PBI]
+    ) -> dict[UUID, list[DuplicateCandidate]]:
+        """
+        Likely duplicates of ``pbis`` among the project's work items.
+
+        Answers from local state only, without remote calls: a project that
+        is not indexed yet has no candidates and is scheduled for sync.
+
+        Returns:
+            dict: candidates by PBI id, best first; PBIs without any are omitted
+        """
+        pass
+
+    @abstractmethod
+    def record_work_items(self, project: str, pbis: list[PBI]) -> None:
+        """Index PBIs just created as work items, ahead of the next sync."""
+        pass
+
+
+class SessionSearchIndex(ABC):
+    """Interface for keyword search over chat sessions."""
+
+    @abstractmethod
+    def search(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> SessionSearchResults:
+        """
+        Sessions whose project, PBIs or messages contain words of ``query``.
+
+        Ranked by relevance; only the sessions containing a query word are
+        looked at.
+        """
+        pass
+
+
+class SessionAnalytics(ABC):
+    """Interface for aggregate figures about the chat sessions."""
+
+    @abstractmethod
+    def report(self) -> SessionAnalyticsReport:
+        """
+        Current figures, maintained as sessions change.
+
+        Takes constant time in the number of sessions: nothing is scanned.
+        """
+        pass
+
+
+class ProjectCatalog(ABC):
+    """Interface for resolving extracted project names to existing projects."""
+
+    @abstractmethod
+    def resolve(self, name: str) -> str | None:
+        """
+        Name of the existing project ``name`` refers to.
+
+        Matches exactly, then ignoring case and punctuation, then fuzzily,
+        from local state only. While no catalogue is available (not loaded
+        yet or unreachable) ``name`` is returned unchanged.
+
+        Returns:
+            str: the canonical project name, or None if no project matches
+        """
+        pass
+
+    @abstractmethod
+    def suggest(self, name: str, limit: int = 3) -> list[str]:
+        """Project names loosely similar to ``name``, best first."""
+        pass
+
+    @abstractmethod
+    def refresh(self) -> int:
+        """Reload the catalogue; returns the number of projects."""
+        pass
+
+
+class TurnGate(ABC):
+    """Interface for deciding whether a user turn needs a new extraction."""
+
+    @abstractmethod
+    def should_extract(self, message: str, session: ChatSession) -> bool:
+        """
+        Whether ``message``, the latest user message of ``session``, could
+        change the project or the requirements extracted so far.
+
+        Must be cheap (no LM, no I/O): it runs before every extraction.
+        """
         pass
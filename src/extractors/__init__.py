@@ -1,4 +1,17 @@
-from .azdo import ExtractAzdoModule
-from .pbi import ExtractPBIModule
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "ExtractAzdoModule": "src.extractors.azdo",
+    "ExtractPBIModule": "src.extractors.pbi",
+}
 
 __all__ = ["ExtractPBIModule", "ExtractAzdoModule"]
+
+
+def __getattr__(name: str):
+    """Import extractor modules (and dspy) only when an extractor is requested."""
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
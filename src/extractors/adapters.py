@@ -0,0 +1,50 @@
+"""DSPy adapters of the extraction programs."""
+
+from typing import Any
+
+import dspy
+
+from src.extractors.prompt_cache import PromptPrefixCache
+
+
+class StablePrefixChatAdapter(dspy.ChatAdapter):
+    """
+    Chat adapter whose prompts share a byte-stable prefix across calls.
+
+    The output format reminder that ``ChatAdapter`` appends to the last user
+    message moves to the end of the system message, so the conversation is
+    the only variable content and comes last. The prefix (system message
+    and demos) is then handed to ``prompt_cache``, if any.
+    """
+
+    def __init__(self, prompt_cache: PromptPrefixCache | None = None):
+        super().__init__()
+        self.prompt_cache = prompt_cache
+
+    def format_task_description(self, signature: type[dspy.Signature]) -> str:
+        description = super().format_task_description(signature)
+        requirements = self.user_message_output_requirements(signature)
+        return f"{description}\n\n{requirements}" if requirements else description
+
+    def format_user_message_content(
+        self,
+        signature: type[dspy.Signature],
+        inputs: dict[str, Any],
+        prefix: str = "",
+        suffix: str = "",
+        main_request: bool = False,
+    ) -> str:
+        # The output requirements are already in the system message.
+        return super().format_user_message_content(signature, inputs, prefix, suffix)
+
+    def format(
+        self,
+        signature: type[dspy.Signature],
+        demos: list[dict[str, Any]],
+        inputs: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        messages = super().format(signature, demos, inputs)
+        if self.prompt_cache is None:
+            return messages
+        key = f"{signature.__name__}({', '.join(signature.fields)})"
+        return self.prompt_cache.prepare(key, messages, len(messages) - 1)
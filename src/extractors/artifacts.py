@@ -0,0 +1,63 @@
+"""Save and load compiled extraction programs.
+
+An artifact is a JSON file holding the DSPy state of an extractor module
+(instructions and few-shot demos) together with the metadata needed to
+rebuild it: whether it reasons (ChainOfThought) or not (Predict), the
+variant name and the evaluation metrics it was selected with.
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, TypeVar
+
+import dspy
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT_VERSION = 1
+
+ModuleT = TypeVar("ModuleT", bound=dspy.Module)
+
+
+def save_program(
+    module: dspy.Module,
+    path: str | Path,
+    *,
+    variant: str,
+    metrics: dict[str, Any] | None = None,
+) -> None:
+    """Write a compiled extractor module to ``path``."""
+    artifact = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "module": type(module).__name__,
+        "variant": variant,
+        "reasoning": module.reasoning,
+        "created_at": datetime.now().isoformat(),
+        "metrics": metrics or {},
+        "state": module.dump_state(),
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(artifact, ensure_ascii=False, indent=2), "utf-8")
+    logger.info("Saved %s (%s) to %s", artifact["module"], variant, path)
+
+
+def load_program(module_cls: type[ModuleT], path: str | Path) -> ModuleT:
+    """Rebuild an extractor module of type ``module_cls`` from ``path``."""
+    artifact = json.loads(Path(path).read_text("utf-8"))
+
+    if artifact.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact format {artifact.get('format_version')} in {path}"
+        )
+    if artifact["module"] != module_cls.__name__:
+        raise ValueError(
+            f"Artifact {path} contains {artifact['module']}, not {module_cls.__name__}"
+        )
+
+    module = module_cls(reasoning=artifact["reasoning"])
+    module.load_state(artifact["state"])
+    logger.info("Loaded %s (%s) from %s", artifact["module"], artifact["variant"], path)
+    return module
@@ -16,13 +16,18 @@ class ExtractAzdoSignature(dspy.Signature):
 
 
 class ExtractAzdoModule(dspy.Module):
-    def __init__(self):
+    def __init__(self, reasoning: bool = True):
         super().__init__()
-        self.program = dspy.ChainOfThought(ExtractAzdoSignature)
-
-    def forward(self, summary: str) -> str | None:
-        result = self.program(summary=summary)
-        logger.info(f"Extracted Azure DevOps project: {result.azdo_project}")
+        self.reasoning = reasoning
+        predictor = dspy.ChainOfThought if reasoning else dspy.Predict
+        self.program = predictor(ExtractAzdoSignature)
+        # Adapter formatting the LM calls; None keeps DSPy's default.
+        self.adapter = None
+
+    def forward(self, summary: str, config: dict | None = None) -> str | None:
+        with dspy.context(adapter=self.adapter):
+            result = self.program(summary=summary, config=config or {})
+        logger.info("Extracted Azure DevOps project: %s", result.azdo_project)
         if result.azdo_project is None:
             return None
 
@@ -0,0 +1,104 @@
+"""Splitting of long inputs for map-reduce PBI extraction.
+
+A pasted meeting transcript can be too long for one extraction call: slow,
+close to the context limit, and with an output that gets truncated. It is
+split into chunks at the strongest boundary that fits (paragraphs, then
+lines or turns, then sentences, words as a last resort), the chunks are
+extracted in parallel, and ``merge_pbis`` drops the near-identical PBIs
+found in more than one chunk.
+
+This module does not import dspy, so it can be loaded at startup.
+"""
+
+import re
+from collections.abc import Sequence
+
+from src.domain.pbi_matching import PBILike, match_pbis
+from src.extractors.profiles import CHARS_PER_TOKEN
+
+# Minimum similarity for PBIs of two chunks to be merged: near-identical,
+# i.e. the same requirement seen by both, usually through their overlap.
+# Stricter than IDENTITY_THRESHOLD: distinct requirements of one meeting
+# often share most of their wording.
+MERGE_THRESHOLD = 0.85
+
+# Boundaries from the strongest to the weakest; each piece keeps the
+# separator that follows it, so that joining the pieces restores the text.
+_BOUNDARIES = (
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?;])\s+"),
+    re.compile(r"\s+"),
+)
+
+
+def _pieces(text: str, level: int, max_chars: int) -> list[str]:
+    """``text`` cut into pieces of at most ``max_chars`` where possible."""
+    if len(text) <= max_chars or level == len(_BOUNDARIES):
+        return [text]
+    pieces, start = [], 0
+    for match in _BOUNDARIES[level].finditer(text):
+        pieces.append(text[start : match.end()])
+        start = match.end()
+    pieces.append(text[start:])
+    return [
+        piece
+        for part in pieces
+        if part
+        for piece in _pieces(part, level + 1, max_chars)
+    ]
+
+
+def split_text(text: str, max_tokens: int, overlap_tokens: int = 0) -> list[str]:
+    """
+    Chunks of about ``max_tokens`` cut at semantic boundaries.
+
+    Each chunk after the first starts with the last pieces of the previous
+    one, up to ``overlap_tokens``, so that a requirement spanning a boundary
+    is seen whole at least once.
+    """
+    # Sizes in characters: token estimates of small pieces do not add up.
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    overlap_chars = overlap_tokens * CHARS_PER_TOKEN
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for piece in _pieces(text, 0, max_chars):
+        if current and size + len(piece) > max_chars:
+            chunks.append("".join(current).strip())
+            overlap: list[str] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                if overlap_size + len(previous) > overlap_chars:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += len(previous)
+            current, size = overlap, overlap_size
+        current.append(piece)
+        size += len(piece)
+    if current:
+        chunks.append("".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+def merge_pbis[P: PBILike](
+    groups: Sequence[Sequence[P]], threshold: float = MERGE_THRESHOLD
+) -> list[P]:
+    """
+    PBIs of all chunks, in order, without near-duplicates across chunks.
+
+    PBIs of the same chunk are kept apart, as the extractor returned them.
+    Each PBI of a chunk is paired with at most one PBI of the previous
+    chunks at least ``threshold`` similar; of the two, the one with the
+    longer description is kept, in the position of the first.
+    """
+    merged: list[P] = []
+    for group in groups:
+        pairs = {j: i for i, j, _ in match_pbis(merged, group, threshold)}
+        for j, pbi in enumerate(group):
+            i = pairs.get(j)
+            if i is None:
+                merged.append(pbi)
+            elif len(pbi.description) > len(merged[i].description):
+                merged[i] = pbi
+    return merged
@@ -0,0 +1,160 @@
+"""Evaluation harness for the extraction programs.
+
+Runs an extractor module over a labelled set of summaries and reports
+accuracy together with latency and token usage, so that program variants
+can be compared on accuracy-per-latency.
+
+Dataset format (JSON Lines), one labelled summary per line:
+
+    {"summary": "...", "project": "WebApp",
+     "pbis": [{"title": "...", "description": "..."}]}
+
+``project`` may be null when the summary does not name a project.
+"""
+
+import json
+import logging
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import dspy
+
+from src.domain.pbi_matching import normalize_text, pbi_set_f1
+from src.models import PBI, Azdo
+
+logger = logging.getLogger(__name__)
+
+# A bootstrapped demo is kept only when the teacher was at least this good.
+BOOTSTRAP_MIN_F1 = 0.8
+
+Metric = Callable[[dspy.Example, Any, Any], float | bool]
+
+
+@dataclass
+class LabelledSummary:
+    """A summary with the expected extraction results."""
+
+    summary: str
+    project: str | None
+    pbis: list[PBI] = field(default_factory=list)
+
+
+@dataclass
+class EvaluationResult:
+    """Aggregated quality and cost of a program over a dataset."""
+
+    accuracy: float
+    mean_latency_s: float
+    p95_latency_s: float
+    mean_prompt_tokens: float
+    mean_completion_tokens: float
+    errors: int
+    examples: int
+
+    @property
+    def accuracy_per_second(self) -> float:
+        """Accuracy divided by mean latency; higher is better."""
+        if self.mean_latency_s <= 0:
+            return self.accuracy
+        return self.accuracy / self.mean_latency_s
+
+
+def load_dataset(path: str | Path) -> list[LabelledSummary]:
+    """Load labelled summaries from a JSON Lines file."""
+    items = []
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            raw = json.loads(line)
+            items.append(
+                LabelledSummary(
+                    summary=raw["summary"],
+                    project=raw.get("project"),
+                    pbis=[PBI(**pbi) for pbi in raw.get("pbis", [])],
+                )
+            )
+    return items
+
+
+def to_pbi_example(item: LabelledSummary) -> dspy.Example:
+    """Build a DSPy example for ``ExtractPBIsSignature``."""
+    return dspy.Example(summary=item.summary, pbi_list=item.pbis).with_inputs("summary")
+
+
+def to_azdo_example(item: LabelledSummary) -> dspy.Example:
+    """Build a DSPy example for ``ExtractAzdoSignature``."""
+    project = Azdo(project=item.project) if item.project else None
+    return dspy.Example(summary=item.summary, azdo_project=project).with_inputs(
+        "summary"
+    )
+
+
+def pbi_metric(example: dspy.Example, prediction: Any, trace: Any = None):
+    """PBI-set F1 of ``ExtractPBIModule`` output against the labels."""
+    score = pbi_set_f1(example.pbi_list, prediction or [])
+    if trace is not None:
+        return score >= BOOTSTRAP_MIN_F1
+    return score
+
+
+def azdo_metric(example: dspy.Example, prediction: Any, trace: Any = None):
+    """Exact (normalized) match of ``ExtractAzdoModule`` output."""
+    expected = example.azdo_project.project if example.azdo_project else None
+    if expected is None or prediction is None:
+        score = float(expected is None and prediction is None)
+    else:
+        score = float(normalize_text(expected) == normalize_text(prediction))
+    if trace is not None:
+        return score == 1.0
+    return score
+
+
+def evaluate_program(
+    program: dspy.Module, examples: list[dspy.Example], metric: Metric
+) -> EvaluationResult:
+    """Run ``program`` over ``examples`` sequentially and aggregate metrics."""
+    scores: list[float] = []
+    latencies: list[float] = []
+    prompt_tokens: list[int] = []
+    completion_tokens: list[int] = []
+    errors = 0
+
+    for example in examples:
+        with dspy.track_usage() as usage:
+            start = time.perf_counter()
+            try:
+                prediction = program(**example.inputs())
+            except Exception as e:
+                logger.warning("Program failed on example: %s", e)
+                prediction = None
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+        scores.append(float(metric(example, prediction)))
+        totals = usage.get_total_tokens().values()
+        prompt_tokens.append(sum(t.get("prompt_tokens") or 0 for t in totals))
+        completion_tokens.append(sum(t.get("completion_tokens") or 0 for t in totals))
+
+    return EvaluationResult(
+        accuracy=statistics.fmean(scores) if scores else 0.0,
+        mean_latency_s=statistics.fmean(latencies) if latencies else 0.0,
+        p95_latency_s=_percentile(latencies, 0.95),
+        mean_prompt_tokens=statistics.fmean(prompt_tokens) if prompt_tokens else 0.0,
+        mean_completion_tokens=(
+            statistics.fmean(completion_tokens) if completion_tokens else 0.0
+        ),
+        errors=errors,
+        examples=len(examples),
+    )
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
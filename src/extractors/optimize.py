@@ -0,0 +1,227 @@
+"""Offline optimization of the extraction programs.
+
+Compiles several variants of ``ExtractPBIModule`` and ``ExtractAzdoModule``
+against a labelled dataset, evaluates them on a held-out split and saves
+the variant with the best accuracy-per-latency as an artifact that the
+extraction services load at startup (see ``PBI_PROGRAM_PATH`` and
+``AZDO_PROGRAM_PATH``).
+
+Usage:
+    uv run python -m src.extractors.optimize \\
+        --dataset data/extraction_eval.jsonl --output-dir artifacts
+"""
+
+import argparse
+import json
+import logging
+import random
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import dspy
+
+from src.config.settings import EnvironmentSettings
+from src.extractors.artifacts import save_program
+from src.extractors.azdo import ExtractAzdoModule
+from src.extractors.evaluation import (
+    EvaluationResult,
+    LabelledSummary,
+    Metric,
+    azdo_metric,
+    evaluate_program,
+    load_dataset,
+    pbi_metric,
+    to_azdo_example,
+    to_pbi_example,
+)
+from src.extractors.pbi import ExtractPBIModule
+from src.llm_client import GeminiService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Variant:
+    """How to build a candidate program."""
+
+    reasoning: bool
+    # None (uncompiled), "labeled" (gold demos) or "bootstrap" (demos
+    # generated by the program itself and filtered by the metric).
+    compiler: str | None
+
+
+VARIANTS = {
+    "cot": Variant(reasoning=True, compiler=None),
+    "cot_bootstrap": Variant(reasoning=True, compiler="bootstrap"),
+    "predict": Variant(reasoning=False, compiler=None),
+    "predict_labeled": Variant(reasoning=False, compiler="labeled"),
+    "predict_bootstrap": Variant(reasoning=False, compiler="bootstrap"),
+}
+
+
+@dataclass(frozen=True)
+class Task:
+    """An extractor to optimize."""
+
+    name: str
+    module_cls: type[dspy.Module]
+    to_example: Callable[[LabelledSummary], dspy.Example]
+    metric: Metric
+    artifact_name: str
+
+
+TASKS = {
+    "pbi": Task(
+        "pbi", ExtractPBIModule, to_pbi_example, pbi_metric, "pbi_program.json"
+    ),
+    "azdo": Task(
+        "azdo", ExtractAzdoModule, to_azdo_example, azdo_metric, "azdo_program.json"
+    ),
+}
+
+
+def compile_variant(
+    task: Task, variant: Variant, trainset: list[dspy.Example], max_demos: int
+) -> dspy.Module:
+    """Build and, if requested, compile a program for ``variant``."""
+    student = task.module_cls(reasoning=variant.reasoning)
+    if variant.compiler is None:
+        return student
+    if variant.compiler == "labeled":
+        return dspy.LabeledFewShot(k=max_demos).compile(student, trainset=trainset)
+    if variant.compiler == "bootstrap":
+        optimizer = dspy.BootstrapFewShot(
+            metric=task.metric,
+            max_bootstrapped_demos=max_demos,
+            max_labeled_demos=max_demos,
+        )
+        return optimizer.compile(student, trainset=trainset)
+    raise ValueError(f"Unknown compiler: {variant.compiler}")
+
+
+def select_variant(
+    results: dict[str, EvaluationResult], min_accuracy_ratio: float
+) -> str:
+    """
+    Pick the variant to ship.
+
+    Only variants within ``min_accuracy_ratio`` of the most accurate one are
+    eligible; among those, the best accuracy-per-second wins.
+    """
+    best_accuracy = max(r.accuracy for r in results.values())
+    eligible = {
+        name: result
+        for name, result in results.items()
+        if result.accuracy >= best_accuracy * min_accuracy_ratio
+    }
+    return max(eligible, key=lambda name: eligible[name].accuracy_per_second)
+
+
+def split_dataset(
+    items: list[LabelledSummary], dev_fraction: float, seed: int
+) -> tuple[list[LabelledSummary], list[LabelledSummary]]:
+    """Deterministically split ``items`` into (train, dev)."""
+    shuffled = items[:]
+    random.Random(seed).shuffle(shuffled)
+    dev_size = max(1, round(len(shuffled) * dev_fraction))
+    return shuffled[dev_size:], shuffled[:dev_size]
+
+
+def optimize_task(
+    task: Task,
+    train: list[LabelledSummary],
+    dev: list[LabelledSummary],
+    variant_names: list[str],
+    output_dir: Path,
+    max_demos: int,
+    min_accuracy_ratio: float,
+) -> dict:
+    """Compile, evaluate and save the best variant of ``task``."""
+    trainset = [task.to_example(item) for item in train]
+    devset = [task.to_example(item) for item in dev]
+
+    programs: dict[str, dspy.Module] = {}
+    results: dict[str, EvaluationResult] = {}
+    for name in variant_names:
+        logger.info("[%s] compiling variant %s", task.name, name)
+        programs[name] = compile_variant(task, VARIANTS[name], trainset, max_demos)
+        results[name] = evaluate_program(programs[name], devset, task.metric)
+        logger.info("[%s] %s: %s", task.name, name, results[name])
+
+    chosen = select_variant(results, min_accuracy_ratio)
+    artifact_path = output_dir / task.artifact_name
+    save_program(
+        programs[chosen], artifact_path, variant=chosen, metrics=asdict(results[chosen])
+    )
+
+    return {
+        "chosen": chosen,
+        "artifact": str(artifact_path),
+        "variants": {
+            name: {
+                **asdict(result),
+                "accuracy_per_second": result.accuracy_per_second,
+            }
+            for name, result in results.items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile extraction programs.")
+    parser.add_argument(
+        "--dataset", type=Path, default=Path("data/extraction_eval.jsonl")
+    )
+    parser.add_argument("--output-dir", type=Path, default=Path("artifacts"))
+    parser.add_argument("--task", choices=[*TASKS, "all"], default="all")
+    parser.add_argument(
+        "--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS)
+    )
+    parser.add_argument("--dev-fraction", type=float, default=0.4)
+    parser.add_argument("--max-demos", type=int, default=3)
+    parser.add_argument(
+        "--min-accuracy-ratio",
+        type=float,
+        default=0.95,
+        help="Variants below this fraction of the best accuracy are not shipped.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    settings = EnvironmentSettings()
+    dspy.configure(lm=GeminiService(settings.gemini_api_key).lm)
+
+    items = load_dataset(args.dataset)
+    train, dev = split_dataset(items, args.dev_fraction, args.seed)
+    logger.info(
+        "Loaded %d examples: %d train / %d dev", len(items), len(train), len(dev)
+    )
+
+    tasks = list(TASKS.values()) if args.task == "all" else [TASKS[args.task]]
+    report = {
+        task.name: optimize_task(
+            task,
+            train,
+            dev,
+            args.variants,
+            args.output_dir,
+            args.max_demos,
+            args.min_accuracy_ratio,
+        )
+        for task in tasks
+    }
+
+    report_path = args.output_dir / "optimization_report.json"
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for name, task_report in report.items():
+        print(
+            f"{name}: shipping '{task_report['chosen']}' -> {task_report['artifact']}"
+        )
+    print(f"Report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
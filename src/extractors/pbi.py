@@ -35,10 +35,18 @@ class ExtractPBIsSignature(dspy.Signature):
 
 
 class ExtractPBIModule(dspy.Module):
-    def __init__(self):
+    def __init__(self, reasoning: bool = True):
         super().__init__()
-        self.program = dspy.ChainOfThought(ExtractPBIsSignature)
-
-    def forward(self, summary: str) -> list[PBI]:
-        result = self.program(summary=summary)
+        # Without reasoning the LM emits only the output fields, which is
+        # cheaper and faster once the program is compiled with demos.
+        self.reasoning = reasoning
+        predictor = dspy.ChainOfThought if reasoning else dspy.Predict
+        self.program = predictor(ExtractPBIsSignature)
+        # Adapter formatting the LM calls; None keeps DSPy's default.
+        self.adapter = None
+
+    def forward(self, summary: str, config: dict | None = None) -> list[PBI]:
+        # ``config`` holds per-call LM arguments such as max_tokens.
+        with dspy.context(adapter=self.adapter):
+            result = self.program(summary=summary, config=config or {})
         return result.pbi_list
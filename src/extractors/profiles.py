@@ -0,0 +1,108 @@
+"""Generation profiles of the extraction signatures.
+
+Each extractor gets its own LM settings instead of one global
+``max_tokens``: the output limit is computed per call from the size of the
+input and, for PBIs, from the number of PBIs the conversation is expected
+to yield. A call whose completion hits the limit is considered truncated
+and retried once with a larger one (see ``DSPyPBIExtractionService``).
+
+This module does not import dspy, so it can be loaded at startup.
+"""
+
+import math
+import re
+from dataclasses import dataclass, replace
+from typing import Any
+
+# Rough tokens-per-character ratio of Italian and English text.
+CHARS_PER_TOKEN = 4
+MAX_EXPECTED_PBIS = 40
+
+_SENTENCE_SPLIT = re.compile(r"[.;!?\n]+")
+_ROLE_PREFIX = re.compile(r"^(user|assistant|system):\s*")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_pbi_count(text: str) -> int:
+    """
+    Upper estimate of the PBIs a conversation or summary yields.
+
+    Counts the sentences of at least four words written by the user (or of
+    the whole text when it is not a conversation); assistant turns only
+    restate earlier requirements.
+    """
+    lines = text.splitlines()
+    if any(line.startswith("user:") for line in lines):
+        lines = [line for line in lines if line.startswith("user:")]
+    sentences = sum(
+        1
+        for line in lines
+        for sentence in _SENTENCE_SPLIT.split(_ROLE_PREFIX.sub("", line))
+        if len(sentence.split()) >= 4
+    )
+    return max(1, min(MAX_EXPECTED_PBIS, sentences))
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """
+    LM generation settings of one extraction signature.
+
+    Output limit = ``base_tokens`` (field markers, JSON, provider-side
+    thinking) + ``reasoning_tokens`` when the program reasons
+    + ``tokens_per_pbi`` x expected PBIs + ``input_ratio`` x input tokens,
+    capped at ``max_tokens``.
+    """
+
+    base_tokens: int
+    reasoning_tokens: int = 0
+    tokens_per_pbi: int = 0
+    input_ratio: float = 0.0
+    max_tokens: int = 8192
+    temperature: float = 0.0
+    reasoning: bool = True
+
+    def max_tokens_for(self, text: str, reasoning: bool) -> int:
+        """Output token limit for a call on ``text``."""
+        limit = self.base_tokens
+        if reasoning:
+            limit += self.reasoning_tokens
+        if self.tokens_per_pbi:
+            limit += self.tokens_per_pbi * estimate_pbi_count(text)
+        limit += int(self.input_ratio * estimate_tokens(text))
+        return min(limit, self.max_tokens)
+
+    def retry_max_tokens(self, previous: int) -> int:
+        """Larger limit for the retry of a truncated call."""
+        return min(previous * 2, self.max_tokens)
+
+    def lm_config(self, max_tokens: int) -> dict[str, Any]:
+        """Per-call LM arguments, passed to DSPy predictors as ``config``."""
+        return {"max_tokens": max_tokens, "temperature": self.temperature}
+
+
+DEFAULT_PROFILES: dict[str, GenerationProfile] = {
+    # One short field: the project name or null.
+    "project": GenerationProfile(
+        base_tokens=512, reasoning_tokens=512, max_tokens=4096
+    ),
+    # A list of PBIs whose size grows with the requirements discussed.
+    "pbi": GenerationProfile(
+        base_tokens=1024,
+        reasoning_tokens=1024,
+        tokens_per_pbi=250,
+        input_ratio=0.25,
+        max_tokens=16384,
+    ),
+}
+
+
+def resolve_profile(
+    name: str, overrides: dict[str, dict[str, Any]] | None = None
+) -> GenerationProfile:
+    """Default profile of extractor ``name`` with configured overrides applied."""
+    return replace(DEFAULT_PROFILES[name], **(overrides or {}).get(name, {}))
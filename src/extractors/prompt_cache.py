@@ -0,0 +1,116 @@
+"""Reuse of the static prompt prefix of the extraction programs.
+
+With the stable-prefix layout (``src.extractors.adapters``) every call of a
+program starts with the same messages: the system message (instructions,
+field definitions, output format) followed by the few-shot demos. Only the
+final user message carries the conversation. A ``PromptPrefixCache``
+receives each prompt with the length of that prefix and may register it
+with the provider's context-caching facility.
+
+This module does not import dspy, so it can be loaded at startup.
+"""
+
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any
+
+from src.extractors.profiles import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def message_text(message: dict[str, Any]) -> str:
+    """Text of a message, whether its content is a string or a block list."""
+    content = message["content"]
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content)
+
+
+def prefix_fingerprint(messages: list[dict[str, Any]], prefix_length: int) -> str:
+    """Hash of the first ``prefix_length`` messages, byte for byte."""
+    prefix = [
+        {"role": message["role"], "content": message_text(message)}
+        for message in messages[:prefix_length]
+    ]
+    encoded = json.dumps(prefix, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def mark_cached_prefix(
+    messages: list[dict[str, Any]], prefix_length: int
+) -> list[dict[str, Any]]:
+    """
+    Copy of ``messages`` with the last prefix message marked ``cache_control``.
+
+    litellm turns the marked prefix into a provider cache entry (Gemini
+    cachedContents, Anthropic prompt caching) and reuses it on later calls.
+    """
+    if prefix_length <= 0:
+        return messages
+    marked = list(messages)
+    last = marked[prefix_length - 1]
+    marked[prefix_length - 1] = {
+        **last,
+        "content": [
+            {"type": "text", "text": message_text(last), "cache_control": CACHE_CONTROL}
+        ],
+    }
+    return marked
+
+
+class PromptPrefixCache(ABC):
+    """Provider context caching of the static prompt prefix."""
+
+    @abstractmethod
+    def prepare(
+        self, key: str, messages: list[dict[str, Any]], prefix_length: int
+    ) -> list[dict[str, Any]]:
+        """
+        Messages to send for one call of program ``key``.
+
+        The first ``prefix_length`` messages are identical on every call of
+        the same program.
+        """
+        pass
+
+
+class ContextCachePrefix(PromptPrefixCache):
+    """
+    Mark the prefix for litellm's provider context caching.
+
+    Prefixes shorter than ``min_prefix_tokens`` are sent unmarked, and a
+    warning is logged once per program. The uncompiled programs have
+    prefixes of 250-600 tokens: only compiled programs with enough demos
+    reach the provider minimum.
+    """
+
+    def __init__(self, min_prefix_tokens: int = 1024):
+        # Providers refuse to cache shorter prefixes (1024 tokens for
+        # Gemini 2.5 Flash).
+        self._min_prefix_tokens = min_prefix_tokens
+        self._short_keys: set[str] = set()
+
+    def prepare(
+        self, key: str, messages: list[dict[str, Any]], prefix_length: int
+    ) -> list[dict[str, Any]]:
+        prefix_tokens = sum(
+            estimate_tokens(message_text(message))
+            for message in messages[:prefix_length]
+        )
+        if prefix_tokens < self._min_prefix_tokens:
+            if key not in self._short_keys:
+                self._short_keys.add(key)
+                logger.warning(
+                    "Prompt prefix of %s is about %d tokens, under the %d "
+                    "needed for context caching: not cached",
+                    key,
+                    prefix_tokens,
+                    self._min_prefix_tokens,
+                )
+            return messages
+        return mark_cached_prefix(messages, prefix_length)
@@ -0,0 +1,167 @@
+"""Record and replay of LM calls ("cassettes").
+
+In record mode every call goes to the wrapped LM and the request, the
+response and the observed latency are appended to a JSON Lines file. In
+replay mode the file alone answers: calls are matched on messages and
+call arguments, with no network access and no quota used, optionally
+sleeping for the recorded latency. A request recorded several times (the
+same conversation in several sessions) is answered with its recordings in
+turn.
+
+Loaded by ``GeminiService`` only when a cassette mode is set: it imports
+dspy.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import dspy
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+CASSETTE_MODES = (RECORD, REPLAY)
+
+# Call arguments that do not change the answer.
+_IGNORED_KWARGS = {"cache", "rollout_id"}
+
+
+class CassetteMissError(LookupError):
+    """The replayed cassette has no recording of the request."""
+
+
+def _plain(value: Any) -> Any:
+    """JSON-compatible copy of a litellm response part."""
+    if hasattr(value, "model_dump"):
+        value = value.model_dump()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def request_key(messages: list[dict], kwargs: dict[str, Any]) -> str:
+    """Hash of the messages and arguments of a call."""
+    request = {
+        "messages": messages,
+        "kwargs": {k: v for k, v in kwargs.items() if k not in _IGNORED_KWARGS},
+    }
+    encoded = json.dumps(request, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class CassetteLM(dspy.BaseLM):
+    """LM that records the calls of another LM, or replays a recording."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        mode: str,
+        lm: dspy.BaseLM | None = None,
+        model: str = "gemini/gemini-2.5-flash",
+        replay_latency: bool = False,
+    ):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode!r}")
+        if mode == RECORD and lm is None:
+            raise ValueError("Recording needs the LM to record")
+        super().__init__(model=lm.model if lm else model, cache=False)
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lm = lm
+        self._lock = threading.Lock()
+        # Recordings by request key, and the next one to replay of each.
+        self._recordings: dict[str, list[dict]] = defaultdict(list)
+        self._next: dict[str, int] = defaultdict(int)
+        self.misses = 0
+        if mode == REPLAY:
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _load(self) -> None:
+        with self.path.open(encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._recordings[entry["key"]].append(entry)
+        logger.info(
+            "Loaded %d LM recordings from %s",
+            sum(map(len, self._recordings.values())),
+            self.path,
+        )
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        messages = messages or [{"role": "user", "content": prompt}]
+        key = request_key(messages, kwargs)
+        if self.mode == RECORD:
+            return self._record(key, messages, kwargs)
+        return self._replay(key)
+
+    def _record(self, key: str, messages: list[dict], kwargs: dict[str, Any]):
+        start = time.perf_counter()
+        # The wrapped LM reports usage to the active tracker itself.
+        response = self._lm.forward(messages=messages, **kwargs)
+        latency_s = time.perf_counter() - start
+        entry = {
+            "key": key,
+            "model": self.model,
+            "messages": messages,
+            "kwargs": _plain(kwargs),
+            "response": {
+                "model": response.model,
+                "choices": [
+                    {
+                        "content": choice.message.content,
+                        "finish_reason": choice.finish_reason,
+                    }
+                    for choice in response.choices
+                ],
+                "usage": _plain(response.usage),
+            },
+            "latency_s": round(latency_s, 4),
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            # One line per call, flushed: an interrupted run stays usable.
+            with self.path.open("a", encoding="utf-8") as file:
+                file.write(line + "\n")
+        return response
+
+    def _replay(self, key: str):
+        with self._lock:
+            recordings = self._recordings.get(key)
+            if not recordings:
+                self.misses += 1
+                raise CassetteMissError(f"No recording of LM request {key[:12]}")
+            entry = recordings[self._next[key] % len(recordings)]
+            self._next[key] += 1
+        if self.replay_latency:
+            time.sleep(entry["latency_s"])
+
+        response = entry["response"]
+        usage = dict(response["usage"])
+        # dspy.LM reports usage to the active tracker itself; BaseLM does not.
+        if dspy.settings.usage_tracker is not None:
+            dspy.settings.usage_tracker.add_usage(self.model, usage)
+        return SimpleNamespace(
+            model=response["model"],
+            usage=usage,
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content=choice["content"], tool_calls=None),
+                    finish_reason=choice["finish_reason"],
+                )
+                for choice in response["choices"]
+            ],
+        )
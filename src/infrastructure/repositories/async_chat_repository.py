@@ -0,0 +1,70 @@
+"""Async adapter over a synchronous chat session repository."""
+
+import asyncio
+from collections.abc import Iterable
+from uuid import UUID
+
+from src.domain.entities import ChatSession
+from src.domain.repositories import AsyncChatSessionRepository, ChatSessionRepository
+
+
+class AsyncChatRepositoryAdapter(AsyncChatSessionRepository):
+    """
+    ``AsyncChatSessionRepository`` backed by a ``ChatSessionRepository``.
+
+    The in-memory repository answers in microseconds and is called inline:
+    a worker thread would cost more than the call. A synchronous backend
+    doing I/O is wrapped with ``offload=True``, its calls then run on the
+    default executor; a batch operation takes one hop for all sessions.
+    """
+
+    def __init__(self, repository: ChatSessionRepository, offload: bool = False):
+        self.repository = repository
+        self._offload = offload
+
+    async def _call(self, function, *args):
+        if self._offload:
+            return await asyncio.to_thread(function, *args)
+        return function(*args)
+
+    async def save(self, session: ChatSession) -> None:
+        """Save a chat session."""
+        await self._call(self.repository.save, session)
+
+    async def get_by_id(self, chat_id: UUID) -> ChatSession | None:
+        """Retrieve a chat session by ID."""
+        return await self._call(self.repository.get_by_id, chat_id)
+
+    async def get_all(self) -> list[ChatSession]:
+        """Retrieve all chat sessions."""
+        return await self._call(self.repository.get_all)
+
+    async def delete(self, chat_id: UUID) -> bool:
+        """Delete a chat session."""
+        return await self._call(self.repository.delete, chat_id)
+
+    async def exists(self, chat_id: UUID) -> bool:
+        """Check if a chat session exists."""
+        return await self._call(self.repository.exists, chat_id)
+
+    async def get_many(self, chat_ids: Iterable[UUID]) -> dict[UUID, ChatSession]:
+        """Retrieve the sessions that exist among ``chat_ids``, by ID."""
+
+        def get_many() -> dict[UUID, ChatSession]:
+            sessions = {}
+            for chat_id in chat_ids:
+                session = self.repository.get_by_id(chat_id)
+                if session is not None:
+                    sessions[chat_id] = session
+            return sessions
+
+        return await self._call(get_many)
+
+    async def save_many(self, sessions: Iterable[ChatSession]) -> None:
+        """Save several chat sessions."""
+
+        def save_many() -> None:
+            for session in sessions:
+                self.repository.save(session)
+
+        await self._call(save_many)
@@ -0,0 +1,92 @@
+"""Compressed storage of the messages of sessions that are rarely read.
+
+The messages of a completed or idle session are packed into one
+zlib-compressed JSON blob: a few hundred bytes per kilobyte of text, instead
+of a ``ChatMessage`` object, a string and a datetime per message. The other
+fields of the session stay as they are, so listing it needs no unpacking.
+"""
+
+import zlib
+from collections.abc import Iterable, MutableSequence
+from datetime import datetime
+
+import orjson
+
+from src.domain.entities import ChatMessage, MessageRole
+from src.observability.metrics import STAGE_DURATION_SECONDS
+
+COMPRESSION_LEVEL = 6
+
+
+def pack_messages(messages: Iterable[ChatMessage]) -> bytes:
+    """Compressed blob of ``messages``."""
+    with STAGE_DURATION_SECONDS.time(stage="session_pack"):
+        rows = [
+            (message.role.value, message.content, message.timestamp.isoformat())
+            for message in messages
+        ]
+        return zlib.compress(orjson.dumps(rows), COMPRESSION_LEVEL)
+
+
+def unpack_messages(blob: bytes) -> list[ChatMessage]:
+    """Messages of a blob made by ``pack_messages``."""
+    with STAGE_DURATION_SECONDS.time(stage="session_unpack"):
+        return [
+            ChatMessage(MessageRole(role), content, datetime.fromisoformat(timestamp))
+            for role, content, timestamp in orjson.loads(zlib.decompress(blob))
+        ]
+
+
+class PackedMessages(MutableSequence[ChatMessage]):
+    """
+    Messages kept packed until first used.
+
+    The length is known without unpacking; any other access unpacks the
+    messages into this instance. Stored sessions hold one that is never
+    accessed: the repository hands out a ``view`` of it, or an unpacked list.
+    """
+
+    __slots__ = ("blob", "_count", "_messages")
+
+    def __init__(self, blob: bytes, count: int):
+        self.blob = blob
+        self._count = count
+        self._messages: list[ChatMessage] | None = None
+
+    @classmethod
+    def pack(cls, messages: list[ChatMessage]) -> "PackedMessages":
+        return cls(pack_messages(messages), len(messages))
+
+    def view(self) -> "PackedMessages":
+        """A packed copy sharing the blob, which stays packed."""
+        return PackedMessages(self.blob, self._count)
+
+    def unpack(self) -> list[ChatMessage]:
+        """A new list of the messages."""
+        return unpack_messages(self.blob)
+
+    def _unpacked(self) -> list[ChatMessage]:
+        if self._messages is None:
+            self._messages = self.unpack()
+        return self._messages
+
+    def __len__(self) -> int:
+        if self._messages is None:
+            return self._count
+        return len(self._messages)
+
+    def __getitem__(self, index):
+        return self._unpacked()[index]
+
+    def __setitem__(self, index, value):
+        self._unpacked()[index] = value
+
+    def __delitem__(self, index):
+        del self._unpacked()[index]
+
+    def insert(self, index: int, value: ChatMessage) -> None:
+        self._unpacked().insert(index, value)
+
+    def __repr__(self) -> str:
+        state = "packed" if self._messages is None else "unpacked"
+        return f"<PackedMessages {len(self)} messages, {state}>"
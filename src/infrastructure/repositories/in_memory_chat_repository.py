@@ -1,42 +1,156 @@
 """In-memory implementation of chat session repository."""
 
 import logging
+import threading
+from collections.abc import Iterable
+from dataclasses import replace
+from datetime import datetime, timedelta
 from uuid import UUID
 
-from src.domain.entities import ChatSession
-from src.domain.repositories import ChatSessionRepository
+from src.domain.entities import ChatSession, SessionStatus
+from src.domain.repositories import (
+    ChatSessionListener,
+    ChatSessionRepository,
+    ConcurrentModificationError,
+)
+from src.infrastructure.repositories.cold_storage import PackedMessages
+from src.observability.metrics import (
+    ERRORS_TOTAL,
+    SESSIONS_PACKED_TOTAL,
+    STAGE_DURATION_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
+# Saves of sessions hashing to different stripes never wait for each other.
+LOCK_STRIPES = 64
+
 
 class InMemoryChatRepository(ChatSessionRepository):
-    """In-memory storage for chat sessions."""
+    """
+    In-memory storage for chat sessions.
+
+    The stored sessions are private copies, replaced (never changed) on
+    save: reads copy them without locking. A save compares and swaps the
+    version under the lock of its session's stripe; the listeners are
+    called under the same lock, so they see each session's changes in
+    order.
 
-    def __init__(self):
+    With ``pack_completed`` the messages of completed sessions are stored
+    compressed (see ``cold_storage``), and ``pack_idle`` compresses those of
+    sessions not updated for a while: ``get_by_id`` unpacks them,
+    ``get_all`` returns them packed until used.
+    """
+
+    def __init__(
+        self,
+        listeners: Iterable[ChatSessionListener] = (),
+        pack_completed: bool = False,
+    ):
         self._sessions: dict[UUID, ChatSession] = {}
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._listeners = list(listeners)
+        self._pack_completed = pack_completed
+
+    def _lock(self, chat_id: UUID) -> threading.Lock:
+        return self._locks[chat_id.int % LOCK_STRIPES]
+
+    def _notify(self, method: str, argument) -> None:
+        # A failing listener must not fail the save, already done.
+        for listener in self._listeners:
+            try:
+                getattr(listener, method)(argument)
+            except Exception as e:
+                ERRORS_TOTAL.inc(stage="repository_listener", type=type(e).__name__)
+                logger.exception("Listener %r failed on %s", listener, method)
+
+    @staticmethod
+    def _packed(session: ChatSession) -> ChatSession:
+        return replace(session, messages=PackedMessages.pack(session.messages))
+
+    @staticmethod
+    def _snapshot(session: ChatSession, unpack: bool = True) -> ChatSession:
+        if not isinstance(session.messages, PackedMessages):
+            return session.copy()
+        # Never touch the stored messages: using them would unpack them.
+        packed = session.messages
+        return session.copy(packed.unpack() if unpack else packed.view())
 
     def save(self, session: ChatSession) -> None:
-        """Save a chat session."""
-        self._sessions[session.chat_id] = session
-        logger.info(f"Saved chat session: {session.chat_id}")
+        """Save a chat session if still at the stored version."""
+        with STAGE_DURATION_SECONDS.time(stage="repository_save"):
+            stored = session.copy()
+            kept = stored
+            if self._pack_completed and stored.status == SessionStatus.COMPLETED:
+                kept = self._packed(stored)
+            with self._lock(session.chat_id):
+                current = self._sessions.get(session.chat_id)
+                if current is None and session.version != 0:
+                    raise ConcurrentModificationError(
+                        session.chat_id, session.version, None
+                    )
+                if current is not None and current.version != session.version:
+                    raise ConcurrentModificationError(
+                        session.chat_id, session.version, current.version
+                    )
+                session.version += 1
+                stored.version = kept.version = session.version
+                self._sessions[session.chat_id] = kept
+                # Listeners get the messages unpacked.
+                self._notify("session_saved", stored)
+        if kept is not stored:
+            SESSIONS_PACKED_TOTAL.inc(reason="completed")
+        logger.info("Saved chat session: %s (v%d)", session.chat_id, session.version)
 
     def get_by_id(self, chat_id: UUID) -> ChatSession | None:
-        """Retrieve a chat session by ID."""
-        return self._sessions.get(chat_id)
+        """Retrieve a snapshot of a chat session by ID."""
+        with STAGE_DURATION_SECONDS.time(stage="repository_get"):
+            session = self._sessions.get(chat_id)
+            return self._snapshot(session) if session is not None else None
 
     def get_all(self) -> list[ChatSession]:
-        """Retrieve all chat sessions."""
-        return list(self._sessions.values())
+        """Retrieve snapshots of all chat sessions."""
+        with STAGE_DURATION_SECONDS.time(stage="repository_get_all"):
+            return [
+                self._snapshot(session, unpack=False)
+                for session in list(self._sessions.values())
+            ]
 
     def delete(self, chat_id: UUID) -> bool:
         """Delete a chat session."""
-        if chat_id in self._sessions:
-            del self._sessions[chat_id]
-            logger.info(f"Deleted chat session: {chat_id}")
+        with STAGE_DURATION_SECONDS.time(stage="repository_delete"):
+            with self._lock(chat_id):
+                deleted = self._sessions.pop(chat_id, None) is not None
+                if deleted:
+                    self._notify("session_deleted", chat_id)
+        if deleted:
+            logger.info("Deleted chat session: %s", chat_id)
             return True
-        logger.warning(f"Chat session not found for deletion: {chat_id}")
+        logger.warning("Chat session not found for deletion: %s", chat_id)
         return False
 
     def exists(self, chat_id: UUID) -> bool:
         """Check if a chat session exists."""
         return chat_id in self._sessions
+
+    def pack_idle(self, idle_s: float) -> int:
+        """Compress the sessions not updated for ``idle_s``; returns how many."""
+        cutoff = datetime.now() - timedelta(seconds=idle_s)
+        count = 0
+        for chat_id, session in list(self._sessions.items()):
+            if (
+                session.updated_at > cutoff
+                or not session.messages
+                or isinstance(session.messages, PackedMessages)
+            ):
+                continue
+            packed = self._packed(session)
+            with self._lock(chat_id):
+                # Not if saved meanwhile: the packed copy would be outdated.
+                if self._sessions.get(chat_id) is session:
+                    self._sessions[chat_id] = packed
+                    count += 1
+        if count:
+            SESSIONS_PACKED_TOTAL.inc(count, reason="idle")
+            logger.info("Packed %d idle chat sessions", count)
+        return count
@@ -0,0 +1,196 @@
+"""Retries and circuit breakers for calls to external dependencies.
+
+Transient failures (timeouts, connection errors, 429 and 5xx responses)
+are retried with jittered exponential backoff. Each dependency (the LM,
+Azure DevOps) has a circuit breaker: after ``failure_threshold``
+consecutive transient failures it opens and calls fail immediately with
+``DependencyUnavailableError`` for ``reset_timeout_s``, then a single probe
+call decides whether it closes again. Retries are done here only, the
+clients' own transport retries are disabled.
+
+A non-idempotent call that fails after it may have been processed (timeout,
+dropped connection, 5xx) is not retried and raises ``AmbiguousWriteError``:
+the caller must find out whether it took effect before calling again.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from src.domain.services import AmbiguousWriteError, DependencyUnavailableError
+from src.observability.metrics import DEPENDENCY_CALLS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Status codes worth retrying; the first two mean the request was not
+# processed, so they are the only ones retried for non-idempotent calls.
+REJECTED_STATUSES = {429, 503}
+TRANSIENT_STATUSES = REJECTED_STATUSES | {408, 500, 502, 504}
+# Exception classes of litellm and msrest (network errors) matched by name,
+# so that neither library has to be imported here.
+TRANSIENT_ERROR_NAMES = {
+    "APIConnectionError",
+    "ClientRequestError",
+    "InternalServerError",
+    "RateLimitError",
+    "ServiceUnavailableError",
+    "Timeout",
+}
+# Azure DevOps SDK errors carry the status code in the message only.
+_AZDO_STATUS = re.compile(r"returned a (\d{3}) status code")
+
+
+def _status_code(error: Exception) -> int | None:
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status
+    match = _AZDO_STATUS.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def is_transient_error(error: Exception, idempotent: bool = True) -> bool:
+    """Whether ``error`` is a dependency failure that a retry may fix."""
+    status = _status_code(error)
+    if status is not None:
+        return status in (TRANSIENT_STATUSES if idempotent else REJECTED_STATUSES)
+    if not idempotent:
+        # A timeout or a dropped connection may hide a processed request.
+        return False
+    return isinstance(error, (ConnectionError, TimeoutError)) or (
+        type(error).__name__ in TRANSIENT_ERROR_NAMES
+    )
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Attempts and backoff of the calls to a dependency."""
+
+    max_attempts: int = 3
+    base_delay_s: float = 0.5
+    max_delay_s: float = 8.0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (0-based), full jitter."""
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * 2**attempt))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker of one dependency."""
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout_s: float = 30.0
+    ):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_s = reset_timeout_s
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _retry_after(self) -> float:
+        return max(0.0, self._opened_at + self._reset_timeout_s - time.monotonic())
+
+    def before_call(self) -> None:
+        """Let a call through, or raise if the breaker is open."""
+        with self._lock:
+            if self._state == OPEN:
+                if self._retry_after() > 0:
+                    DEPENDENCY_CALLS_TOTAL.inc(dependency=self.name, outcome="rejected")
+                    raise DependencyUnavailableError(self.name, self._retry_after())
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probing:
+                    DEPENDENCY_CALLS_TOTAL.inc(dependency=self.name, outcome="rejected")
+                    raise DependencyUnavailableError(self.name, self._reset_timeout_s)
+                self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or self._failures >= self._failure_threshold:
+                self._opened_at = time.monotonic()
+                if self._state != OPEN:
+                    self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        logger.warning("Circuit breaker %s: %s -> %s", self.name, self._state, state)
+        self._state = state
+
+    def snapshot(self) -> dict:
+        """State for the health endpoint."""
+        with self._lock:
+            snapshot = {"state": self._state, "consecutive_failures": self._failures}
+            if self._state == OPEN:
+                snapshot["retry_after_s"] = round(self._retry_after(), 1)
+            return snapshot
+
+
+def call_with_resilience[T](
+    fn: Callable[[], T],
+    breaker: CircuitBreaker,
+    policy: RetryPolicy,
+    idempotent: bool = True,
+) -> T:
+    """
+    Call ``fn`` through ``breaker``, retrying transient failures.
+
+    Raises:
+        DependencyUnavailableError: if the breaker is open, or transient
+            failures persist after the last attempt
+        AmbiguousWriteError: if a non-idempotent call failed after it may
+            have been processed
+    """
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_transient_error(e):
+                # The dependency answered: the failure is the request's.
+                breaker.record_success()
+                DEPENDENCY_CALLS_TOTAL.inc(dependency=breaker.name, outcome="error")
+                raise
+            breaker.record_failure()
+            if not is_transient_error(e, idempotent):
+                DEPENDENCY_CALLS_TOTAL.inc(dependency=breaker.name, outcome="ambiguous")
+                raise AmbiguousWriteError(breaker.name) from e
+            attempt += 1
+            if attempt >= policy.max_attempts:
+                DEPENDENCY_CALLS_TOTAL.inc(dependency=breaker.name, outcome="failure")
+                raise DependencyUnavailableError(
+                    breaker.name, breaker.snapshot().get("retry_after_s")
+                ) from e
+            delay = policy.backoff(attempt - 1)
+            DEPENDENCY_CALLS_TOTAL.inc(dependency=breaker.name, outcome="retry")
+            logger.warning(
+                "%s call failed (%s: %s), retry %d in %.2fs",
+                breaker.name,
+                type(e).__name__,
+                e,
+                attempt,
+                delay,
+            )
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            DEPENDENCY_CALLS_TOTAL.inc(dependency=breaker.name, outcome="success")
+            return result
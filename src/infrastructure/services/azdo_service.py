@@ -1,30 +1,161 @@
 """Azure DevOps service implementation."""
 
+import html
 import logging
+import re
+from collections.abc import Callable
+from datetime import datetime
 
-import src.azdo_client as legacy_azdo_client
-from src.domain.entities import PBI
-from src.domain.services import AzureDevOpsService
+from src.domain.entities import PBI, BacklogItem
+from src.domain.services import (
+    AmbiguousWriteError,
+    AzureDevOpsService,
+    WorkItemSyncError,
+)
+from src.infrastructure.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    call_with_resilience,
+)
+from src.models import PBI as PBIModel
+from src.observability.metrics import ERRORS_TOTAL, STAGE_DURATION_SECONDS
 
 logger = logging.getLogger(__name__)
 
+_HTML_TAG = re.compile(r"<[^>]+>")
+# Items in this state are gone from the backlog.
+REMOVED_STATE = "Removed"
+
+
+def _to_model(pbi: PBI) -> PBIModel:
+    # Convert domain PBIs to the format expected by legacy client
+    return PBIModel(title=pbi.title, description=pbi.description)
+
+
+def _plain_text(value: str | None) -> str:
+    # Work item descriptions are HTML.
+    return html.unescape(_HTML_TAG.sub(" ", value or "")).strip()
+
 
 class AzureDevOpsServiceImpl(AzureDevOpsService):
     """Azure DevOps operations implementation."""
 
-    def create_pbis(self, pbis: list[PBI], organization: str, project: str) -> None:
+    def __init__(
+        self,
+        breaker: CircuitBreaker | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ):
+        self._breaker = breaker
+        self._retry_policy = retry_policy or RetryPolicy()
+
+    def _call[T](self, fn: Callable[[], T], idempotent: bool = True) -> T:
+        """Run one Azure DevOps request, with retries and breaker if configured."""
+        if self._breaker is None:
+            return fn()
+        return call_with_resilience(
+            fn, self._breaker, self._retry_policy, idempotent=idempotent
+        )
+
+    def _work_item_client(self, organization: str):
+        import src.azdo_client as legacy_azdo_client
+
+        return self._call(lambda: legacy_azdo_client.get_work_item_client(organization))
+
+    def create_pbis(
+        self, pbis: list[PBI], organization: str, project: str
+    ) -> list[int]:
         """Create PBIs in Azure DevOps."""
-        # Convert domain PBIs to the format expected by legacy client
+        # Deferred: the legacy client imports the Azure DevOps SDK, which is
+        # only needed once a user confirms PBI creation.
+        import src.azdo_client as legacy_azdo_client
+
+        work_item_ids: list[int] = []
+        try:
+            with STAGE_DURATION_SECONDS.time(stage="azdo_create"):
+                wit_client = self._work_item_client(organization)
+                for pbi in pbis:
+                    # Not idempotent: a timed-out creation is not retried.
+                    work_item_ids.append(
+                        self._call(
+                            lambda pbi=pbi: legacy_azdo_client.create_work_item(
+                                wit_client, project, _to_model(pbi)
+                            ),
+                            idempotent=False,
+                        )
+                    )
+            logger.info("Created %d PBIs in project %s", len(pbis), project)
+            return work_item_ids
+        except Exception as e:
+            ERRORS_TOTAL.inc(stage="azdo_create", type=type(e).__name__)
+            logger.error("Error creating PBIs in Azure DevOps: %s", e, exc_info=True)
+            raise WorkItemSyncError(
+                str(e),
+                work_item_ids,
+                outcome_unknown=isinstance(e, AmbiguousWriteError),
+            ) from e
 
-        created_pbis = [
-            PBI(title=pbi.title, description=pbi.description) for pbi in pbis
-        ]
+    def update_pbis(self, pbis: list[PBI], organization: str, project: str) -> None:
+        """Update the work items of PBIs already created in Azure DevOps."""
+        import src.azdo_client as legacy_azdo_client
 
         try:
-            legacy_azdo_client.add_pbi(
-                pbis=created_pbis, organization=organization, project=project
+            with STAGE_DURATION_SECONDS.time(stage="azdo_update"):
+                wit_client = self._work_item_client(organization)
+                for pbi in pbis:
+                    self._call(
+                        lambda pbi=pbi: legacy_azdo_client.update_work_item(
+                            wit_client, project, pbi.work_item_id, _to_model(pbi)
+                        )
+                    )
+            logger.info("Updated %d PBIs in project %s", len(pbis), project)
+        except Exception as e:
+            ERRORS_TOTAL.inc(stage="azdo_update", type=type(e).__name__)
+            logger.error("Error updating PBIs in Azure DevOps: %s", e, exc_info=True)
+            raise
+
+    def fetch_backlog_items(
+        self, organization: str, project: str, changed_since: datetime | None = None
+    ) -> list[BacklogItem]:
+        """PBIs of a project changed at or after ``changed_since`` (all if None)."""
+        import src.azdo_client as legacy_azdo_client
+
+        try:
+            with STAGE_DURATION_SECONDS.time(stage="azdo_backlog_query"):
+                wit_client = self._work_item_client(organization)
+                work_items = self._call(
+                    lambda: legacy_azdo_client.query_backlog(
+                        wit_client,
+                        project,
+                        changed_since.isoformat() if changed_since else None,
+                    )
+                )
+        except Exception as e:
+            ERRORS_TOTAL.inc(stage="azdo_backlog_query", type=type(e).__name__)
+            raise
+
+        items = []
+        for work_item in work_items:
+            fields = work_item.fields or {}
+            items.append(
+                BacklogItem(
+                    work_item_id=work_item.id,
+                    title=fields.get("System.Title") or "",
+                    description=_plain_text(fields.get("System.Description")),
+                    changed_date=datetime.fromisoformat(fields["System.ChangedDate"]),
+                    removed=fields.get("System.State") == REMOVED_STATE,
+                )
             )
-            logger.info(f"Created {len(pbis)} PBIs in project {project}")
+        return items
+
+    def list_projects(self, organization: str) -> list[str]:
+        """Names of the projects of the organization."""
+        import src.azdo_client as legacy_azdo_client
+
+        try:
+            with STAGE_DURATION_SECONDS.time(stage="azdo_projects"):
+                return self._call(
+                    lambda: legacy_azdo_client.list_projects(organization)
+                )
         except Exception as e:
-            logger.error(f"Error creating PBIs in Azure DevOps: {e}", exc_info=True)
+            ERRORS_TOTAL.inc(stage="azdo_projects", type=type(e).__name__)
             raise
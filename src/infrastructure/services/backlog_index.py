@@ -0,0 +1,225 @@
+"""Local duplicate detection against existing project backlogs.
+
+The work items of each project are kept in a MinHash LSH index: an extracted
+PBI is compared exactly (``pbi_similarity``) only with the few items that
+share an LSH bucket with it, so a lookup takes milliseconds and makes no
+remote calls. A project is indexed on first lookup and then kept up to date
+in the background, fetching only the items changed since the latest
+``ChangedDate`` seen.
+"""
+
+import hashlib
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from uuid import UUID
+
+from src.domain.entities import PBI, BacklogItem, DuplicateCandidate
+from src.domain.pbi_matching import DUPLICATE_THRESHOLD, normalize_text, pbi_similarity
+from src.domain.services import AzureDevOpsService, BacklogIndex
+from src.observability.metrics import ERRORS_TOTAL, STAGE_DURATION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 32 bands of 2 rows: items with a token Jaccard similarity of 0.3 share a
+# bucket with probability ~0.95, 0.1 with ~0.3; candidates are then ranked
+# exactly, so false positives only cost a comparison.
+NUM_PERMUTATIONS = 64
+BANDS = 32
+ROWS = NUM_PERMUTATIONS // BANDS
+MIN_TOKEN_LENGTH = 3
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def _tokens(title: str, description: str) -> set[str]:
+    """Words of title and description, plus title bigrams."""
+    title_words = normalize_text(title).split()
+    words = title_words + normalize_text(description).split()
+    tokens = {word for word in words if len(word) >= MIN_TOKEN_LENGTH}
+    tokens.update(f"{a} {b}" for a, b in zip(title_words, title_words[1:]))
+    return tokens
+
+
+def minhash(tokens: set[str]) -> tuple[int, ...] | None:
+    """MinHash signature of a token set, None if it is empty."""
+    if not tokens:
+        return None
+    hashes = [
+        int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "big")
+        for t in tokens
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _bands(signature: tuple[int, ...]) -> list[tuple[int, ...]]:
+    return [signature[i * ROWS : (i + 1) * ROWS] for i in range(BANDS)]
+
+
+class _ProjectBacklog:
+    """LSH index of the work items of one project."""
+
+    def __init__(self):
+        self.items: dict[int, BacklogItem] = {}
+        self._bands: dict[int, list[tuple[int, ...]]] = {}
+        self._buckets: list[dict[tuple[int, ...], set[int]]] = [
+            {} for _ in range(BANDS)
+        ]
+        self.watermark: datetime | None = None
+        self.attempted_at: float | None = None
+        self.lock = threading.Lock()
+
+    def remove(self, work_item_id: int) -> None:
+        self.items.pop(work_item_id, None)
+        for band, key in enumerate(self._bands.pop(work_item_id, [])):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(work_item_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def upsert(self, item: BacklogItem) -> None:
+        self.remove(item.work_item_id)
+        if item.removed:
+            return
+        signature = minhash(_tokens(item.title, item.description))
+        if signature is None:
+            return
+        self.items[item.work_item_id] = item
+        self._bands[item.work_item_id] = _bands(signature)
+        for band, key in enumerate(self._bands[item.work_item_id]):
+            self._buckets[band].setdefault(key, set()).add(item.work_item_id)
+
+    def candidates(self, signature: tuple[int, ...]) -> list[BacklogItem]:
+        ids: set[int] = set()
+        for band, key in enumerate(_bands(signature)):
+            ids.update(self._buckets[band].get(key, ()))
+        return [self.items[i] for i in ids]
+
+
+class MinHashBacklogIndex(BacklogIndex):
+    """Backlog index kept in memory and synced from Azure DevOps."""
+
+    def __init__(
+        self,
+        azdo_service: AzureDevOpsService,
+        organization: str,
+        sync_interval_s: float = 300.0,
+        threshold: float = DUPLICATE_THRESHOLD,
+        max_candidates: int = 3,
+    ):
+        self._azdo_service = azdo_service
+        self._organization = organization
+        self._sync_interval_s = sync_interval_s
+        self._threshold = threshold
+        self._max_candidates = max_candidates
+        self._projects: dict[str, _ProjectBacklog] = {}
+        self._syncing: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="backlog-sync"
+        )
+
+    def _backlog(self, project: str) -> _ProjectBacklog:
+        with self._lock:
+            backlog = self._projects.get(project)
+            if backlog is None:
+                backlog = self._projects[project] = _ProjectBacklog()
+            return backlog
+
+    def find_duplicates(
+        self, project: str, pbis: list[PBI]
+    ) -> dict[UUID, list[DuplicateCandidate]]:
+        """Likely duplicates of ``pbis`` among the project's work items."""
+        with STAGE_DURATION_SECONDS.time(stage="duplicate_check"):
+            backlog = self._backlog(project)
+            self._schedule_sync(project, backlog)
+
+            duplicates: dict[UUID, list[DuplicateCandidate]] = {}
+            for pbi in pbis:
+                signature = minhash(_tokens(pbi.title, pbi.description))
+                if signature is None:
+                    continue
+                with backlog.lock:
+                    candidates = backlog.candidates(signature)
+                matches = []
+                for item in candidates:
+                    if item.work_item_id == pbi.work_item_id:
+                        continue
+                    score = pbi_similarity(pbi, item)
+                    if score >= self._threshold:
+                        matches.append(
+                            DuplicateCandidate(
+                                work_item_id=item.work_item_id,
+                                title=item.title,
+                                score=round(score, 3),
+                            )
+                        )
+                if matches:
+                    matches.sort(key=lambda c: c.score, reverse=True)
+                    duplicates[pbi.id] = matches[: self._max_candidates]
+            return duplicates
+
+    def record_work_items(self, project: str, pbis: list[PBI]) -> None:
+        """Index work items just created, without waiting for the next sync."""
+        backlog = self._backlog(project)
+        now = datetime.now(UTC)
+        with backlog.lock:
+            for pbi in pbis:
+                if pbi.work_item_id is not None:
+                    backlog.upsert(
+                        BacklogItem(pbi.work_item_id, pbi.title, pbi.description, now)
+                    )
+
+    def sync(self, project: str) -> int:
+        """Fetch the items changed since the last sync; returns how many."""
+        backlog = self._backlog(project)
+        backlog.attempted_at = time.monotonic()
+        with STAGE_DURATION_SECONDS.time(stage="backlog_sync"):
+            items = self._azdo_service.fetch_backlog_items(
+                self._organization, project, backlog.watermark
+            )
+            with backlog.lock:
+                for item in items:
+                    backlog.upsert(item)
+                if items:
+                    latest = max(item.changed_date for item in items)
+                    if backlog.watermark is None or latest > backlog.watermark:
+                        backlog.watermark = latest
+        logger.info(
+            "Synced backlog of %s: %d changed, %d indexed",
+            project,
+            len(items),
+            len(backlog.items),
+        )
+        return len(items)
+
+    def _schedule_sync(self, project: str, backlog: _ProjectBacklog) -> None:
+        if (
+            backlog.attempted_at is not None
+            and time.monotonic() - backlog.attempted_at < self._sync_interval_s
+        ):
+            return
+        with self._lock:
+            if project in self._syncing:
+                return
+            self._syncing.add(project)
+        self._executor.submit(self._sync_in_background, project)
+
+    def _sync_in_background(self, project: str) -> None:
+        try:
+            self.sync(project)
+        except Exception as e:
+            ERRORS_TOTAL.inc(stage="backlog_sync", type=type(e).__name__)
+            logger.warning("Backlog sync of %s failed: %s", project, e)
+        finally:
+            with self._lock:
+                self._syncing.discard(project)
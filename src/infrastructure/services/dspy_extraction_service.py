@@ -1,47 +1,403 @@
 """DSPy-based extraction service implementations."""
 
+import contextvars
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
-from src.domain.entities import PBI
-from src.domain.services import PBIExtractionService, ProjectExtractionService
-from src.extractors import ExtractPBIModule
-from src.extractors.azdo import ExtractAzdoModule
+from src.domain.entities import PBI, ExtractionMode, LMUsage
+from src.domain.services import (
+    DependencyUnavailableError,
+    PBIExtractionService,
+    ProjectExtractionService,
+)
+from src.extractors.chunking import merge_pbis, split_text
+from src.extractors.profiles import GenerationProfile, estimate_tokens, resolve_profile
+from src.extractors.prompt_cache import PromptPrefixCache
+from src.infrastructure.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    call_with_resilience,
+    is_transient_error,
+)
+from src.observability.metrics import (
+    ERRORS_TOTAL,
+    LM_CALLS_TOTAL,
+    LM_TOKENS_TOTAL,
+    LM_TRUNCATIONS_TOTAL,
+    STAGE_DURATION_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _call_extractor(
+    extractor, name: str, stage: str, conversation: str, usage, config: dict
+) -> tuple[Any, Exception | None, bool]:
+    """
+    Call a DSPy extractor once, recording its duration and LM usage.
+
+    Returns the result (or the error raised) and whether any LM completion
+    reached ``config["max_tokens"]``, i.e. was truncated.
+    """
+    # Imported here like the extractors: dspy is loaded on first use only.
+    from dspy import track_usage
+
+    result, error = None, None
+    start = time.perf_counter()
+    with track_usage() as tracker:
+        try:
+            result = extractor(summary=conversation, config=config)
+        except Exception as e:
+            error = e
+    elapsed = time.perf_counter() - start
+    STAGE_DURATION_SECONDS.observe(elapsed, stage=stage)
+
+    entries = [entry for model in tracker.usage_data.values() for entry in model]
+    prompt = sum(entry.get("prompt_tokens") or 0 for entry in entries)
+    completion = sum(entry.get("completion_tokens") or 0 for entry in entries)
+    # Prompt tokens served from the provider's context cache.
+    cached = sum(
+        (entry.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        for entry in entries
+    )
+    LM_CALLS_TOTAL.inc(len(entries), extractor=name)
+    LM_TOKENS_TOTAL.inc(prompt, extractor=name, kind="prompt")
+    LM_TOKENS_TOTAL.inc(completion, extractor=name, kind="completion")
+    LM_TOKENS_TOTAL.inc(cached, extractor=name, kind="cached")
+    if usage is not None:
+        usage.add(LMUsage(len(entries), prompt, completion, elapsed))
+
+    truncated = any(
+        (entry.get("completion_tokens") or 0) >= config["max_tokens"]
+        for entry in entries
+    )
+    return result, error, truncated
+
+
+def _call_guarded(
+    extractor,
+    name: str,
+    stage: str,
+    conversation: str,
+    usage,
+    config: dict,
+    breaker: CircuitBreaker | None,
+    retry_policy: RetryPolicy | None,
+) -> tuple[Any, Exception | None, bool]:
+    """``_call_extractor`` with transient LM failures retried and breaker-guarded."""
+    if breaker is None:
+        return _call_extractor(extractor, name, stage, conversation, usage, config)
+
+    def call():
+        result, error, truncated = _call_extractor(
+            extractor, name, stage, conversation, usage, config
+        )
+        if error is not None and is_transient_error(error):
+            raise error
+        return result, error, truncated
+
+    return call_with_resilience(call, breaker, retry_policy or RetryPolicy())
+
+
+def _run_instrumented(
+    extractor,
+    name: str,
+    stage: str,
+    conversation: str,
+    usage: LMUsage | None,
+    profile: GenerationProfile,
+    breaker: CircuitBreaker | None = None,
+    retry_policy: RetryPolicy | None = None,
+) -> Any:
+    """Call an extractor within its profile, retrying once if truncated."""
+    max_tokens = profile.max_tokens_for(conversation, extractor.reasoning)
+    for attempt in range(2):
+        result, error, truncated = _call_guarded(
+            extractor,
+            name,
+            stage,
+            conversation,
+            usage,
+            profile.lm_config(max_tokens),
+            breaker,
+            retry_policy,
+        )
+        if not truncated:
+            break
+        LM_TRUNCATIONS_TOTAL.inc(extractor=name)
+        if attempt == 1 or max_tokens >= profile.max_tokens:
+            logger.warning("%s extraction truncated at max_tokens=%d", name, max_tokens)
+            break
+        retry_max_tokens = profile.retry_max_tokens(max_tokens)
+        logger.warning(
+            "%s extraction truncated at max_tokens=%d, retrying with %d",
+            name,
+            max_tokens,
+            retry_max_tokens,
+        )
+        max_tokens = retry_max_tokens
+
+    if error is not None:
+        raise error
+    return result
+
+
+def _build_extractors(
+    module_cls,
+    llm_client,
+    program_path: str | None,
+    profile: GenerationProfile,
+    stable_prefix: bool = False,
+    prompt_cache: PromptPrefixCache | None = None,
+) -> dict:
+    """
+    Extractor per mode: the configured program, and one without reasoning.
+
+    With ``stable_prefix`` (implied by ``prompt_cache``) prompts are laid
+    out as a static prefix followed by the conversation.
+    """
+    from src.extractors.adapters import StablePrefixChatAdapter
+    from src.extractors.artifacts import load_program
+
+    full = (
+        load_program(module_cls, program_path)
+        if program_path
+        else module_cls(reasoning=profile.reasoning)
+    )
+    # A compiled program that already skips reasoning is the cheapest option.
+    economy = full if not full.reasoning else module_cls(reasoning=False)
+    adapter = (
+        StablePrefixChatAdapter(prompt_cache)
+        if stable_prefix or prompt_cache is not None
+        else None
+    )
+    for extractor in (full, economy):
+        extractor.set_lm(llm_client.lm)
+        extractor.adapter = adapter
+    return {ExtractionMode.FULL: full, ExtractionMode.ECONOMY: economy}
+
+
 class DSPyPBIExtractionService(PBIExtractionService):
-    """PBI extraction using DSPy."""
+    """
+    PBI extraction using DSPy.
+
+    Conversations longer than ``chunk_tokens`` are split at semantic
+    boundaries and the chunks extracted in parallel, at most
+    ``max_parallel_chunks`` at a time; near-identical PBIs found in more
+    than one chunk are merged.
+
+    ``name`` labels the LM metrics and the ``<name>_extraction`` stage, so
+    that a shadow pipeline is told apart from the served one. With
+    ``raise_errors`` extraction errors, of any chunk too, are raised instead
+    of yielding no PBIs, so that a shadow pipeline's failures are counted.
+    """
+
+    def __init__(
+        self,
+        llm_client,
+        program_path: str | None = None,
+        profile: GenerationProfile | None = None,
+        breaker: CircuitBreaker | None = None,
+        retry_policy: RetryPolicy | None = None,
+        stable_prefix: bool = False,
+        prompt_cache: PromptPrefixCache | None = None,
+        chunk_tokens: int = 0,
+        chunk_overlap_tokens: int = 0,
+        max_parallel_chunks: int = 4,
+        name: str = "pbi",
+        raise_errors: bool = False,
+    ):
+        # Deferred: the extractor modules import dspy.
+        from src.extractors.pbi import ExtractPBIModule
 
-    def __init__(self, llm_client):
         self._llm_client = llm_client
-        self._extractor = ExtractPBIModule()
-        self._extractor.set_lm(llm_client.lm)
+        self._name = name
+        self._raise_errors = raise_errors
+        self._breaker = breaker
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._profile = profile or resolve_profile("pbi")
+        self._extractors = _build_extractors(
+            ExtractPBIModule,
+            llm_client,
+            program_path,
+            self._profile,
+            stable_prefix,
+            prompt_cache,
+        )
+        self._chunk_tokens = chunk_tokens
+        self._chunk_overlap_tokens = chunk_overlap_tokens
+        self._chunk_executor = (
+            ThreadPoolExecutor(max_parallel_chunks, thread_name_prefix="pbi-chunk")
+            if chunk_tokens
+            else None
+        )
 
-    def extract_pbis(self, conversation: str) -> list[PBI]:
-        """Extract PBIs from conversation text."""
+    def _extract(
+        self, conversation: str, usage: LMUsage | None, mode: ExtractionMode
+    ) -> list[PBI]:
+        result = _run_instrumented(
+            self._extractors[mode],
+            self._name,
+            f"{self._name}_extraction",
+            conversation,
+            usage,
+            self._profile,
+            self._breaker,
+            self._retry_policy,
+        )
+        # Convert from Pydantic models to domain entities
+        return [PBI(title=pbi.title, description=pbi.description) for pbi in result]
+
+    def _extract_chunked(
+        self, chunks: list[str], usage: LMUsage | None, mode: ExtractionMode
+    ) -> list[PBI]:
+        """
+        Extract the chunks in parallel and merge their PBIs.
+
+        A failed chunk contributes no PBIs, unless the LM is unavailable or
+        errors are raised.
+        """
+        chunk_usages = [LMUsage() for _ in chunks]
+        start = time.perf_counter()
+        # Each chunk runs in a copy of the caller's context, so its stages
+        # still show up in the request trace.
+        futures = [
+            self._chunk_executor.submit(
+                contextvars.copy_context().run, self._extract, chunk, chunk_usage, mode
+            )
+            for chunk, chunk_usage in zip(chunks, chunk_usages, strict=True)
+        ]
+        groups, unavailable, failed = [], None, None
+        for future in futures:
+            try:
+                groups.append(future.result())
+            except DependencyUnavailableError as e:
+                unavailable = e
+            except Exception as e:
+                if self._raise_errors:
+                    # Raised below, and counted by extract_pbis.
+                    failed = failed or e
+                    continue
+                ERRORS_TOTAL.inc(
+                    stage=f"{self._name}_extraction", type=type(e).__name__
+                )
+                logger.error("Error extracting PBIs from a chunk: %s", e, exc_info=True)
+        if usage is not None:
+            total = LMUsage()
+            for chunk_usage in chunk_usages:
+                total.add(chunk_usage)
+            # The chunks overlap in time: count the wall time once.
+            total.wall_time_s = time.perf_counter() - start
+            usage.add(total)
+        if unavailable is not None:
+            raise unavailable
+        if failed is not None:
+            raise failed
+
+        merge_start = time.perf_counter()
+        pbis = merge_pbis(groups)
+        STAGE_DURATION_SECONDS.observe(
+            time.perf_counter() - merge_start, stage="pbi_merge"
+        )
+        logger.info(
+            "Extracted %d PBIs from %d chunks (%d before merging)",
+            len(pbis),
+            len(chunks),
+            sum(len(group) for group in groups),
+        )
+        return pbis
+
+    def extract_pbis(
+        self,
+        conversation: str,
+        usage: LMUsage | None = None,
+        mode: ExtractionMode = ExtractionMode.FULL,
+    ) -> list[PBI]:
+        """
+        Extract PBIs from conversation text.
+
+        Extraction errors yield no PBIs, except an unavailable LM (all are
+        raised with ``raise_errors``).
+        """
         try:
-            result = self._extractor(summary=conversation)
-            # Convert from Pydantic models to domain entities
-            return [PBI(title=pbi.title, description=pbi.description) for pbi in result]
+            if (
+                self._chunk_tokens
+                and estimate_tokens(conversation) > self._chunk_tokens
+            ):
+                chunks = split_text(
+                    conversation, self._chunk_tokens, self._chunk_overlap_tokens
+                )
+                if len(chunks) > 1:
+                    return self._extract_chunked(chunks, usage, mode)
+            return self._extract(conversation, usage, mode)
+        except DependencyUnavailableError as e:
+            ERRORS_TOTAL.inc(stage=f"{self._name}_extraction", type=type(e).__name__)
+            raise
         except Exception as e:
-            logger.error(f"Error extracting PBIs: {e}", exc_info=True)
+            ERRORS_TOTAL.inc(stage=f"{self._name}_extraction", type=type(e).__name__)
+            if self._raise_errors:
+                raise
+            logger.error("Error extracting PBIs: %s", e, exc_info=True)
             return []
 
 
 class DSPyProjectExtractionService(ProjectExtractionService):
     """Project extraction using DSPy."""
 
-    def __init__(self, llm_client):
+    def __init__(
+        self,
+        llm_client,
+        program_path: str | None = None,
+        profile: GenerationProfile | None = None,
+        breaker: CircuitBreaker | None = None,
+        retry_policy: RetryPolicy | None = None,
+        stable_prefix: bool = False,
+        prompt_cache: PromptPrefixCache | None = None,
+    ):
+        from src.extractors.azdo import ExtractAzdoModule
+
         self._llm_client = llm_client
-        self._extractor = ExtractAzdoModule()
-        self._extractor.set_lm(llm_client.lm)
+        self._breaker = breaker
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._profile = profile or resolve_profile("project")
+        self._extractors = _build_extractors(
+            ExtractAzdoModule,
+            llm_client,
+            program_path,
+            self._profile,
+            stable_prefix,
+            prompt_cache,
+        )
+
+    def extract_project(
+        self,
+        conversation: str,
+        usage: LMUsage | None = None,
+        mode: ExtractionMode = ExtractionMode.FULL,
+    ) -> str | None:
+        """
+        Extract project name from conversation text.
 
-    def extract_project(self, conversation: str) -> str | None:
-        """Extract project name from conversation text."""
+        Extraction errors yield no project, except an unavailable LM.
+        """
         try:
-            result = self._extractor(summary=conversation)
+            result = _run_instrumented(
+                self._extractors[mode],
+                "project",
+                "project_extraction",
+                conversation,
+                usage,
+                self._profile,
+                self._breaker,
+                self._retry_policy,
+            )
             return result if result else None
+        except DependencyUnavailableError as e:
+            ERRORS_TOTAL.inc(stage="project_extraction", type=type(e).__name__)
+            raise
         except Exception as e:
-            logger.error(f"Error extracting project: {e}", exc_info=True)
+            ERRORS_TOTAL.inc(stage="project_extraction", type=type(e).__name__)
+            logger.error("Error extracting project: %s", e, exc_info=True)
             return None
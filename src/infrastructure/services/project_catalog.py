@@ -0,0 +1,129 @@
+"""Cached catalogue of the Azure DevOps projects of the organization.
+
+Extracted project names are resolved against it locally, so a misspelt or
+wrongly cased name is corrected, or reported to the user, while the
+conversation is still going instead of failing at confirmation. The
+catalogue is reloaded in the background once older than its TTL, or soon
+after a failed load; lookups never wait for Azure DevOps.
+"""
+
+import difflib
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.domain.services import AzureDevOpsService, ProjectCatalog
+from src.observability.metrics import (
+    ERRORS_TOTAL,
+    PROJECT_RESOLUTIONS_TOTAL,
+    STAGE_DURATION_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_NON_ALPHANUMERIC = re.compile(r"[\W_]+")
+
+
+def _key(name: str) -> str:
+    """Comparison key: case, spaces and punctuation ignored."""
+    return _NON_ALPHANUMERIC.sub("", name.casefold())
+
+
+class CachedProjectCatalog(ProjectCatalog):
+    """
+    Project catalogue held in memory and refreshed every ``ttl_s``.
+
+    A failed load is retried after ``retry_s`` instead, so a catalogue
+    missing after an Azure DevOps outage comes back soon.
+    """
+
+    def __init__(
+        self,
+        azdo_service: AzureDevOpsService,
+        organization: str,
+        ttl_s: float = 600.0,
+        retry_s: float = 30.0,
+        fuzzy_cutoff: float = 0.8,
+        suggestion_cutoff: float = 0.5,
+    ):
+        self._azdo_service = azdo_service
+        self._organization = organization
+        self._ttl_s = ttl_s
+        self._retry_s = retry_s
+        self._fuzzy_cutoff = fuzzy_cutoff
+        self._suggestion_cutoff = suggestion_cutoff
+        # Canonical names by comparison key; None until the first load.
+        self._projects: dict[str, str] | None = None
+        # Monotonic time of the next background load; 0 loads on first use.
+        self._next_refresh_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="project-catalog"
+        )
+
+    def refresh(self) -> int:
+        """Reload the catalogue; returns the number of projects."""
+        try:
+            with STAGE_DURATION_SECONDS.time(stage="project_catalog_refresh"):
+                names = self._azdo_service.list_projects(self._organization)
+        except Exception:
+            self._next_refresh_at = time.monotonic() + self._retry_s
+            raise
+        self._projects = {_key(name): name for name in names}
+        self._next_refresh_at = time.monotonic() + self._ttl_s
+        logger.info("Loaded %d projects of %s", len(names), self._organization)
+        return len(names)
+
+    def resolve(self, name: str) -> str | None:
+        """Name of the existing project ``name`` refers to (see port)."""
+        self._schedule_refresh()
+        projects = self._projects
+        if projects is None:
+            PROJECT_RESOLUTIONS_TOTAL.inc(outcome="unavailable")
+            return name
+
+        key = _key(name)
+        canonical = projects.get(key)
+        if canonical is not None:
+            outcome = "exact" if canonical == name else "normalized"
+        else:
+            # Only an unambiguous close match is taken; otherwise the user
+            # is asked, with suggestions.
+            matches = difflib.get_close_matches(key, projects, 2, self._fuzzy_cutoff)
+            canonical = projects[matches[0]] if len(matches) == 1 else None
+            outcome = "fuzzy" if canonical is not None else "unknown"
+        PROJECT_RESOLUTIONS_TOTAL.inc(outcome=outcome)
+        if outcome == "fuzzy":
+            logger.info("Resolved project %r to %r", name, canonical)
+        return canonical
+
+    def suggest(self, name: str, limit: int = 3) -> list[str]:
+        """Project names loosely similar to ``name``, best first."""
+        projects = self._projects or {}
+        matches = difflib.get_close_matches(
+            _key(name), projects, limit, self._suggestion_cutoff
+        )
+        return [projects[match] for match in matches]
+
+    def _schedule_refresh(self) -> None:
+        if time.monotonic() < self._next_refresh_at:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        self._executor.submit(self._refresh_in_background)
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            # The previous catalogue, if any, stays in use until the next try.
+            ERRORS_TOTAL.inc(stage="project_catalog_refresh", type=type(e).__name__)
+            logger.warning("Project catalogue refresh failed: %s", e)
+        finally:
+            with self._lock:
+                self._refreshing = False
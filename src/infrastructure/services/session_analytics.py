@@ -0,0 +1,122 @@
+"""Session analytics maintained on every repository change.
+
+A repository listener compares each saved session with what it saw of it
+last time and updates a few counters: sessions by status, confirmations
+and the user turns they took, and work items created per project in daily
+buckets. A report reads the counters, whatever the number of sessions.
+"""
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from uuid import UUID
+
+from src.domain.entities import (
+    ChatSession,
+    DailyPBICount,
+    MessageRole,
+    SessionAnalyticsReport,
+    SessionStatus,
+)
+from src.domain.repositories import ChatSessionListener
+from src.domain.services import SessionAnalytics
+
+
+@dataclass
+class _SessionState:
+    """What the analytics last saw of a session."""
+
+    status: SessionStatus
+    messages: int = 0
+    user_turns: int = 0
+    # A session reopened and confirmed again counts as one confirmation.
+    confirmed: bool = False
+    # Work items of the session already counted as created.
+    work_items: set[int] = field(default_factory=set)
+
+
+class IncrementalSessionAnalytics(SessionAnalytics, ChatSessionListener):
+    """In-memory session analytics, fed by the repository."""
+
+    def __init__(self, retention_days: int = 90):
+        self._retention = timedelta(days=retention_days)
+        self._sessions: dict[UUID, _SessionState] = {}
+        self._by_status: Counter[SessionStatus] = Counter()
+        self._created: dict[date, Counter[str | None]] = {}
+        self._confirmations = 0
+        self._confirmation_turns = 0
+        self._lock = threading.Lock()
+
+    def session_saved(self, session: ChatSession) -> None:
+        """Count the changes since the session was last seen."""
+        with self._lock:
+            state = self._sessions.get(session.chat_id)
+            if state is None:
+                state = self._sessions[session.chat_id] = _SessionState(session.status)
+            else:
+                self._by_status[state.status] -= 1
+            self._by_status[session.status] += 1
+            state.status = session.status
+
+            # Messages are only appended: look at the new ones only.
+            state.user_turns += sum(
+                message.role == MessageRole.USER
+                for message in session.messages[state.messages :]
+            )
+            state.messages = len(session.messages)
+
+            if session.status == SessionStatus.COMPLETED and not state.confirmed:
+                state.confirmed = True
+                self._confirmations += 1
+                self._confirmation_turns += state.user_turns
+
+            created = {
+                pbi.work_item_id
+                for pbi in session.pbis
+                if pbi.work_item_id is not None
+                and pbi.work_item_id not in state.work_items
+            }
+            if created:
+                state.work_items |= created
+                self._count_created(
+                    session.updated_at.date(), session.project, len(created)
+                )
+
+    def session_deleted(self, chat_id: UUID) -> None:
+        """Forget a session; the work items it created stay counted."""
+        with self._lock:
+            state = self._sessions.pop(chat_id, None)
+            if state is not None:
+                self._by_status[state.status] -= 1
+
+    def _count_created(self, day: date, project: str | None, count: int) -> None:
+        bucket = self._created.get(day)
+        if bucket is None:
+            bucket = self._created[day] = Counter()
+            oldest = day - self._retention
+            for expired in [d for d in self._created if d < oldest]:
+                del self._created[expired]
+        bucket[project] += count
+
+    def report(self) -> SessionAnalyticsReport:
+        """Current counters."""
+        with self._lock:
+            return SessionAnalyticsReport(
+                sessions_by_status={
+                    status: self._by_status[status] for status in SessionStatus
+                },
+                pbis_created=[
+                    DailyPBICount(day=day, project=project, count=count)
+                    for day in sorted(self._created)
+                    for project, count in sorted(
+                        self._created[day].items(), key=lambda item: item[0] or ""
+                    )
+                ],
+                confirmations=self._confirmations,
+                average_turns_to_confirmation=(
+                    round(self._confirmation_turns / self._confirmations, 2)
+                    if self._confirmations
+                    else None
+                ),
+            )
@@ -0,0 +1,224 @@
+"""Full-text search over the chat sessions, kept up to date on every save.
+
+An inverted index maps each word to the sessions containing it: a search
+scores (BM25) only the sessions containing a query word, never the whole
+store. The index is a repository listener; a save reindexes the project
+and PBIs of the session, which are small and may change, and only the
+messages added since the previous save, which never change.
+"""
+
+import heapq
+import logging
+import math
+import threading
+from collections import Counter
+from datetime import datetime
+from uuid import UUID
+
+from src.domain.entities import (
+    ChatSession,
+    SessionSearchHit,
+    SessionSearchResults,
+    SessionStatus,
+)
+from src.domain.pbi_matching import normalize_text
+from src.domain.repositories import ChatSessionListener
+from src.domain.services import SessionSearchIndex
+from src.observability.metrics import STAGE_DURATION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# A word in the project name or a PBI title says more about the session
+# than the same word in one of its messages.
+FIELD_WEIGHTS = {
+    "project": 3.0,
+    "pbi_title": 2.5,
+    "pbi_description": 1.2,
+    "message": 1.0,
+}
+MIN_TOKEN_LENGTH = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalized words of ``text``, without single characters."""
+    return [w for w in normalize_text(text).split() if len(w) >= MIN_TOKEN_LENGTH]
+
+
+class _Document:
+    """Indexed words of one session, counted by field."""
+
+    __slots__ = (
+        "fields",
+        "indexed_messages",
+        "length",
+        "message_words",
+        "pbis",
+        "project",
+        "status",
+        "updated",
+    )
+
+    def __init__(self):
+        self.fields: dict[str, Counter[str]] = {f: Counter() for f in FIELD_WEIGHTS}
+        self.indexed_messages = 0
+        self.message_words = 0
+        # Weighted number of words, kept up to date on save.
+        self.length = 0.0
+        # Title and words of each current PBI, to report the matching ones.
+        self.pbis: list[tuple[str, frozenset[str]]] = []
+        self.project: str | None = None
+        self.status = SessionStatus.ACTIVE
+        self.updated: datetime | None = None
+
+    def measure(self) -> float:
+        self.length = FIELD_WEIGHTS["message"] * self.message_words + sum(
+            FIELD_WEIGHTS[name] * counts.total()
+            for name, counts in self.fields.items()
+            if name != "message"
+        )
+        return self.length
+
+    def derived_terms(self) -> set[str]:
+        """Words of the fields reindexed on every save."""
+        return {
+            term
+            for name, counts in self.fields.items()
+            if name != "message"
+            for term in counts
+        }
+
+
+class InvertedSessionIndex(SessionSearchIndex, ChatSessionListener):
+    """In-memory inverted index of the sessions, fed by the repository."""
+
+    def __init__(self):
+        self._documents: dict[UUID, _Document] = {}
+        self._postings: dict[str, set[UUID]] = {}
+        self._total_length = 0.0
+        self._lock = threading.Lock()
+
+    def session_saved(self, session: ChatSession) -> None:
+        """Index the changes of a session."""
+        with STAGE_DURATION_SECONDS.time(stage="search_index_update"):
+            with self._lock:
+                document = self._documents.get(session.chat_id)
+                if (
+                    document is None
+                    or len(session.messages) < document.indexed_messages
+                ):
+                    if document is not None:
+                        self._remove(session.chat_id)
+                    document = self._documents[session.chat_id] = _Document()
+                self._total_length -= document.length
+                before = document.derived_terms()
+
+                new_terms: set[str] = set()
+                messages = document.fields["message"]
+                for message in session.messages[document.indexed_messages :]:
+                    words = tokenize(message.content)
+                    messages.update(words)
+                    document.message_words += len(words)
+                    new_terms.update(words)
+                document.indexed_messages = len(session.messages)
+
+                document.fields["project"] = Counter(tokenize(session.project or ""))
+                document.fields["pbi_title"] = titles = Counter()
+                document.fields["pbi_description"] = descriptions = Counter()
+                document.pbis = []
+                for pbi in session.pbis:
+                    title, description = tokenize(pbi.title), tokenize(pbi.description)
+                    titles.update(title)
+                    descriptions.update(description)
+                    document.pbis.append((pbi.title, frozenset(title + description)))
+                after = document.derived_terms()
+                document.project = session.project
+                document.status = session.status
+                document.updated = session.updated_at
+                self._total_length += document.measure()
+
+                for term in new_terms | after:
+                    self._postings.setdefault(term, set()).add(session.chat_id)
+                for term in before - after:
+                    if term not in messages:
+                        self._discard(term, session.chat_id)
+
+    def session_deleted(self, chat_id: UUID) -> None:
+        """Drop a session from the index."""
+        with self._lock:
+            self._remove(chat_id)
+
+    def _remove(self, chat_id: UUID) -> None:
+        document = self._documents.pop(chat_id, None)
+        if document is None:
+            return
+        self._total_length -= document.length
+        for term in {term for counts in document.fields.values() for term in counts}:
+            self._discard(term, chat_id)
+
+    def _discard(self, term: str, chat_id: UUID) -> None:
+        ids = self._postings.get(term)
+        if ids is not None:
+            ids.discard(chat_id)
+            if not ids:
+                del self._postings[term]
+
+    def search(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> SessionSearchResults:
+        """Sessions containing words of ``query``, by BM25 score."""
+        terms = set(tokenize(query))
+        with STAGE_DURATION_SECONDS.time(stage="session_search"):
+            with self._lock:
+                if not terms or not self._documents:
+                    return SessionSearchResults(total=0, hits=[])
+                count = len(self._documents)
+                average_length = self._total_length / count or 1.0
+                idf = {
+                    term: math.log(1 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+                    for term in terms
+                    if (ids := self._postings.get(term))
+                }
+                candidates = set().union(*(self._postings[t] for t in idf))
+
+                scores: dict[UUID, float] = {}
+                for chat_id in candidates:
+                    document = self._documents[chat_id]
+                    norm = BM25_K1 * (
+                        1 - BM25_B + BM25_B * document.length / average_length
+                    )
+                    score = 0.0
+                    for term, weight in idf.items():
+                        tf = sum(
+                            FIELD_WEIGHTS[name] * counts[term]
+                            for name, counts in document.fields.items()
+                        )
+                        if tf:
+                            score += weight * tf * (BM25_K1 + 1) / (tf + norm)
+                    scores[chat_id] = score
+
+                page = heapq.nlargest(
+                    offset + limit, scores, key=lambda chat_id: scores[chat_id]
+                )[offset:]
+                hits = [self._hit(chat_id, scores[chat_id], terms) for chat_id in page]
+        logger.info("Search %r: %d sessions match", query, len(scores))
+        return SessionSearchResults(total=len(scores), hits=hits)
+
+    def _hit(self, chat_id: UUID, score: float, terms: set[str]) -> SessionSearchHit:
+        document = self._documents[chat_id]
+        return SessionSearchHit(
+            chat_id=chat_id,
+            score=round(score, 4),
+            project=document.project,
+            status=document.status,
+            updated_at=document.updated,
+            fields=tuple(
+                name
+                for name, counts in document.fields.items()
+                if any(term in counts for term in terms)
+            ),
+            pbi_titles=tuple(
+                title for title, words in document.pbis if not words.isdisjoint(terms)
+            ),
+        )
@@ -0,0 +1,210 @@
+"""Shadow evaluation of a candidate PBI extraction pipeline on live traffic.
+
+A sampled fraction of the extractions is run again, in the background,
+through a candidate pipeline (another model, compiled program or profile).
+The request only ever gets the primary's PBIs and waits for the primary
+only. Latency, tokens and the agreement (set F1) of the candidate's PBIs
+with the primary's are recorded on ``/metrics`` and summarized by
+``summary()``, to decide on evidence whether to promote the candidate.
+
+This module does not import dspy: both pipelines are injected.
+"""
+
+import copy
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from src.domain.entities import PBI, ExtractionMode, LMUsage
+from src.domain.pbi_matching import pbi_set_f1
+from src.domain.services import PBIExtractionService
+from src.observability.metrics import (
+    SHADOW_AGREEMENT,
+    SHADOW_EXTRACTIONS_TOTAL,
+    SHADOW_LATENCY_SECONDS,
+    SHADOW_TOKENS_TOTAL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PipelineTotals:
+    latency_s: float = 0.0
+    usage: LMUsage = field(default_factory=LMUsage)
+
+    def add(self, latency_s: float, usage: LMUsage) -> None:
+        self.latency_s += latency_s
+        self.usage.add(usage)
+
+    def summary(self, count: int) -> dict:
+        return {
+            "mean_latency_s": round(self.latency_s / count, 3) if count else None,
+            "mean_prompt_tokens": (
+                round(self.usage.prompt_tokens / count, 1) if count else None
+            ),
+            "mean_completion_tokens": (
+                round(self.usage.completion_tokens / count, 1) if count else None
+            ),
+        }
+
+
+class ShadowPBIExtractionService(PBIExtractionService):
+    """
+    Primary PBI extraction, shadowed by a candidate on a sample of calls.
+
+    At most ``max_pending`` shadow runs wait or run at a time; a sampled
+    call beyond that is dropped, so a slow candidate never builds a backlog.
+    The candidate's LM usage is not added to the session's. The candidate
+    must raise its extraction errors, counted as errors, rather than return
+    no PBIs, which would count as a disagreement.
+    """
+
+    def __init__(
+        self,
+        primary: PBIExtractionService,
+        candidate: PBIExtractionService,
+        fraction: float,
+        name: str = "candidate",
+        max_pending: int = 4,
+        seed: int | None = None,
+    ):
+        self._primary = primary
+        self._candidate = candidate
+        self._fraction = fraction
+        self.name = name
+        self._max_pending = max_pending
+        self._rng = random.Random(seed)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="pbi-shadow"
+        )
+        self._compared = 0
+        self._errors = 0
+        self._dropped = 0
+        self._agreement = 0.0
+        self._exact = 0
+        self._totals = {"primary": _PipelineTotals(), "candidate": _PipelineTotals()}
+
+    def extract_pbis(
+        self,
+        conversation: str,
+        usage: LMUsage | None = None,
+        mode: ExtractionMode = ExtractionMode.FULL,
+    ) -> list[PBI]:
+        """Extract PBIs with the primary, sampling the call for the candidate."""
+        with self._lock:
+            sampled = self._rng.random() < self._fraction
+        if not sampled:
+            return self._primary.extract_pbis(conversation, usage, mode)
+
+        primary_usage = LMUsage()
+        start = time.perf_counter()
+        pbis = self._primary.extract_pbis(conversation, primary_usage, mode)
+        latency_s = time.perf_counter() - start
+        if usage is not None:
+            usage.add(primary_usage)
+
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self._dropped += 1
+                SHADOW_EXTRACTIONS_TOTAL.inc(candidate=self.name, outcome="dropped")
+                return pbis
+            self._pending += 1
+        # The caller may change its PBIs (e.g. link work items) meanwhile.
+        served = [copy.copy(pbi) for pbi in pbis]
+        self._executor.submit(
+            self._shadow, conversation, mode, served, latency_s, primary_usage
+        )
+        return pbis
+
+    def _shadow(
+        self,
+        conversation: str,
+        mode: ExtractionMode,
+        served: list[PBI],
+        primary_latency_s: float,
+        primary_usage: LMUsage,
+    ) -> None:
+        try:
+            candidate_usage = LMUsage()
+            start = time.perf_counter()
+            try:
+                pbis = self._candidate.extract_pbis(conversation, candidate_usage, mode)
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                SHADOW_EXTRACTIONS_TOTAL.inc(candidate=self.name, outcome="error")
+                logger.warning("Shadow extraction by %s failed: %s", self.name, e)
+                return
+            latency_s = time.perf_counter() - start
+            agreement = pbi_set_f1(served, pbis)
+            self._record(
+                agreement,
+                ("primary", primary_latency_s, primary_usage),
+                ("candidate", latency_s, candidate_usage),
+            )
+            logger.info(
+                "Shadow extraction by %s: agreement %.2f, %d/%d PBIs, "
+                "%.2fs/%.2fs, %d/%d tokens",
+                self.name,
+                agreement,
+                len(pbis),
+                len(served),
+                latency_s,
+                primary_latency_s,
+                candidate_usage.total_tokens,
+                primary_usage.total_tokens,
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _record(self, agreement: float, *runs: tuple[str, float, LMUsage]) -> None:
+        SHADOW_EXTRACTIONS_TOTAL.inc(candidate=self.name, outcome="compared")
+        SHADOW_AGREEMENT.observe(agreement, candidate=self.name)
+        for pipeline, latency_s, usage in runs:
+            SHADOW_LATENCY_SECONDS.observe(
+                latency_s, candidate=self.name, pipeline=pipeline
+            )
+            SHADOW_TOKENS_TOTAL.inc(
+                usage.prompt_tokens,
+                candidate=self.name,
+                pipeline=pipeline,
+                kind="prompt",
+            )
+            SHADOW_TOKENS_TOTAL.inc(
+                usage.completion_tokens,
+                candidate=self.name,
+                pipeline=pipeline,
+                kind="completion",
+            )
+        with self._lock:
+            self._compared += 1
+            self._agreement += agreement
+            self._exact += agreement == 1.0
+            for pipeline, latency_s, usage in runs:
+                self._totals[pipeline].add(latency_s, usage)
+
+    def summary(self) -> dict:
+        """Comparisons so far: agreement, and latency and tokens per pipeline."""
+        with self._lock:
+            count = self._compared
+            return {
+                "candidate": self.name,
+                "fraction": self._fraction,
+                "compared": count,
+                "errors": self._errors,
+                "dropped": self._dropped,
+                "pending": self._pending,
+                "mean_agreement": round(self._agreement / count, 3) if count else None,
+                "exact_agreement_share": round(self._exact / count, 3)
+                if count
+                else None,
+                "primary": self._totals["primary"].summary(count),
+                "candidate_pipeline": self._totals["candidate"].summary(count),
+            }
@@ -0,0 +1,198 @@
+"""Local gate deciding whether a user turn is worth a new extraction.
+
+Acknowledgements ("ok", "grazie", "sì") and messages that only repeat the
+known project name cannot change the extraction: rules recognise them. The
+other turns are scored by a small naive Bayes model over words and word
+pairs, trained on turns labelled by past extractions (did the project or
+the PBIs change?). Without a model every other turn is extracted.
+
+Labelled turns come from the service logs (``TURN_GATE_LOG_LABELS``), or
+from a JSON Lines file of ``{"text": ..., "informative": true}`` objects:
+
+    uv run python -m src.infrastructure.services.turn_gate \\
+        logs/*.jsonl --output artifacts/turn_gate.json
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+from src.domain.entities import ChatSession
+from src.domain.pbi_matching import normalize_text
+from src.domain.services import TurnGate
+from src.observability.logs import TURN_LABEL_LOGGER
+from src.observability.metrics import TURN_GATE_DECISIONS_TOTAL
+
+# fmt: off
+# Normalized words of messages that only acknowledge the assistant.
+ACKNOWLEDGEMENTS = frozenset(
+    {
+        "ok", "okay", "okk", "va", "bene", "benissimo", "grazie", "mille",
+        "si", "certo", "esatto", "perfetto", "ottimo", "giusto", "chiaro",
+        "capito", "daccordo", "d", "accordo", "ciao", "salve", "buongiorno",
+        "buonasera", "allora", "quindi", "thanks", "thank", "you",
+    }
+)
+# Words around a project name that add nothing to it.
+PROJECT_FILLERS = frozenset(
+    {
+        "il", "lo", "la", "e", "progetto", "project", "nome", "si", "chiama",
+        "del", "di", "per", "su", "in", "azure", "devops", "sempre", "ancora",
+        "confermo", "te", "ho", "detto", "come",
+    }
+)
+# fmt: on
+INFORMATIVE = "informative"
+UNINFORMATIVE = "uninformative"
+
+
+def tokenize(text: str) -> list[str]:
+    return normalize_text(text).split()
+
+
+def _features(tokens: list[str]) -> list[str]:
+    length = "len:" + ("1" if len(tokens) <= 1 else "2-4" if len(tokens) <= 4 else "5+")
+    bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:], strict=False)]
+    return [*tokens, *bigrams, length]
+
+
+class TurnModel:
+    """Multinomial naive Bayes: probability that a turn is informative."""
+
+    def __init__(self, counts: dict[str, dict[str, int]], documents: dict[str, int]):
+        self._counts = counts
+        self._documents = documents
+        self._totals = {label: sum(c.values()) for label, c in counts.items()}
+        self._vocabulary = len(set().union(*(c.keys() for c in counts.values())))
+
+    @classmethod
+    def train(cls, samples: Iterable[tuple[str, bool]]) -> "TurnModel":
+        counts: dict[str, Counter[str]] = {
+            INFORMATIVE: Counter(),
+            UNINFORMATIVE: Counter(),
+        }
+        documents = {INFORMATIVE: 0, UNINFORMATIVE: 0}
+        for text, informative in samples:
+            label = INFORMATIVE if informative else UNINFORMATIVE
+            counts[label].update(_features(tokenize(text)))
+            documents[label] += 1
+        return cls({label: dict(c) for label, c in counts.items()}, documents)
+
+    def probability(self, text: str) -> float:
+        features = _features(tokenize(text))
+        total_documents = sum(self._documents.values())
+        scores = {}
+        for label, counts in self._counts.items():
+            # Laplace smoothing on both the prior and the likelihoods.
+            score = math.log((self._documents[label] + 1) / (total_documents + 2))
+            denominator = self._totals[label] + self._vocabulary + 1
+            for feature in features:
+                score += math.log((counts.get(feature, 0) + 1) / denominator)
+            scores[label] = score
+        difference = scores[UNINFORMATIVE] - scores[INFORMATIVE]
+        return 1 / (1 + math.exp(min(difference, 700)))
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(
+            json.dumps({"counts": self._counts, "documents": self._documents}),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TurnModel":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(data["counts"], data["documents"])
+
+
+class LexicalTurnGate(TurnGate):
+    """Rules, then the lexical model if any; extracts when unsure."""
+
+    def __init__(self, model: TurnModel | None = None, skip_below: float = 0.2):
+        self._model = model
+        self._skip_below = skip_below
+
+    def should_extract(self, message: str, session: ChatSession) -> bool:
+        """Whether the turn could change the extraction (see port)."""
+        extract, reason = self._decide(message, session)
+        TURN_GATE_DECISIONS_TOTAL.inc(
+            decision="extract" if extract else "skip", reason=reason
+        )
+        return extract
+
+    def _decide(self, message: str, session: ChatSession) -> tuple[bool, str]:
+        tokens = tokenize(message)
+        if all(token in ACKNOWLEDGEMENTS for token in tokens):
+            return False, "acknowledgement"
+        if session.project is not None:
+            words = set(tokens) - PROJECT_FILLERS - ACKNOWLEDGEMENTS
+            if words and words <= set(tokenize(session.project)):
+                return False, "known_project"
+        if self._model is None:
+            return True, "default"
+        return self._model.probability(message) >= self._skip_below, "model"
+
+
+def load_labelled_turns(paths: Iterable[Path]) -> list[tuple[str, bool]]:
+    """Turns from service logs (label records) or labelled JSON Lines files."""
+    samples = []
+    for path in paths:
+        with path.open(encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                    if record.get("logger") == TURN_LABEL_LOGGER:
+                        record = json.loads(record["message"])
+                    samples.append((record["text"], bool(record["informative"])))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+    return samples
+
+
+def evaluate(
+    model: TurnModel, samples: list[tuple[str, bool]], skip_below: float
+) -> dict:
+    """Skip rate, and share of informative turns wrongly skipped."""
+    gate = LexicalTurnGate(model, skip_below)
+    session = ChatSession()
+    skipped = [not gate._decide(text, session)[0] for text, _ in samples]
+    informative = [skip for skip, (_, label) in zip(skipped, samples) if label]
+    return {
+        "turns": len(samples),
+        "skip_rate": round(sum(skipped) / len(samples), 3) if samples else 0.0,
+        "missed_informative_rate": (
+            round(sum(informative) / len(informative), 3) if informative else 0.0
+        ),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train the turn gate model.")
+    parser.add_argument("inputs", type=Path, nargs="+", help="Logs or JSONL files")
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--skip-below", type=float, default=0.2)
+    parser.add_argument("--test-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    samples = load_labelled_turns(args.inputs)
+    if not samples:
+        print("No labelled turns found", file=sys.stderr)
+        return 1
+    random.Random(args.seed).shuffle(samples)
+    split = int(len(samples) * (1 - args.test_ratio))
+    train, test = samples[:split], samples[split:]
+
+    report = evaluate(TurnModel.train(train), test, args.skip_below)
+    print(f"Held-out evaluation on {report['turns']} turns: {report}")
+    TurnModel.train(samples).save(args.output)
+    print(f"Model trained on {len(samples)} turns saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,65 @@
-import dspy
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    import dspy
 
 
 class GeminiService:
-    lm: dspy.LM
+    lm: "dspy.LM"
 
-    def __init__(self, api_key: str, model: str = "gemini/gemini-2.5-flash"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini/gemini-2.5-flash",
+        lm: "dspy.BaseLM | None" = None,
+        timeout_s: float | None = None,
+        cassette_mode: Literal["record", "replay"] | None = None,
+        cassette_path: str | None = None,
+        replay_latency: bool = False,
+    ):
         self.api_key = api_key
         self.model = model
-        self._configure_dspy()
+        self.timeout_s = timeout_s
+        if cassette_mode == "replay":
+            # Recorded answers only (src/infrastructure/lm_cassette.py).
+            self.lm = self._cassette(cassette_mode, cassette_path, replay_latency)
+            return
+        if lm is not None:
+            # Injected LM (e.g. a fake backend for benchmarks); used as is.
+            self.lm = lm
+        else:
+            self._configure_dspy()
+        if cassette_mode is not None:
+            self.lm = self._cassette(cassette_mode, cassette_path, replay_latency)
+
+    def _cassette(
+        self, mode: str, path: str | None, replay_latency: bool
+    ) -> "dspy.BaseLM":
+        if not path:
+            raise ValueError("Percorso della cassetta LM non impostato.")
+        from src.infrastructure.lm_cassette import CassetteLM
+
+        lm = getattr(self, "lm", None)
+        return CassetteLM(path, mode, lm, self.model, replay_latency)
 
     def _configure_dspy(self) -> None:
         if not self.api_key:
             raise ValueError(
                 "GEMINI_API_KEY non impostata. Configura la variabile d'ambiente."
             )
+        # dspy (and litellm behind it) is heavy to import: load it only when
+        # an LM is actually needed, not when the module is imported.
+        import dspy
+
+        # max_tokens is only a default: the extraction services pass a limit
+        # per call from their generation profile (src/extractors/profiles.py).
+        # No litellm retries: the extraction services retry transient errors
+        # behind a circuit breaker (src/infrastructure/resilience.py).
         self.lm = dspy.LM(
             self.model,
             api_key=self.api_key,
             cache=False,
             max_tokens=24000,
+            num_retries=0,
+            timeout=self.timeout_s,
         )
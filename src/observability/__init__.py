@@ -0,0 +1,6 @@
+"""
+Observability - metrics and logging shared by every layer.
+
+Cross-cutting and dependency-free: domain-adjacent code (use cases,
+repositories) may record metrics without depending on infrastructure.
+"""
@@ -0,0 +1,169 @@
+"""Non-blocking structured logging for the service.
+
+Request threads only filter log records and put them on a bounded queue; a
+``QueueListener`` thread formats them and writes them to stderr. Together
+with %-style logger calls this keeps message formatting and log I/O off the
+request path:
+
+- ``SamplingFilter`` keeps a configurable fraction of the records below
+  WARNING per logger, so hot-path INFO messages can be thinned out.
+- ``ContextFilter`` stamps each record with the request and chat
+  correlation ids held in context variables (set by the API middleware).
+- ``NonBlockingQueueHandler`` drops records when the queue is full instead
+  of blocking the caller.
+- ``JsonFormatter`` writes one JSON object per line.
+
+Call ``configure_logging()`` once at startup and ``shutdown_logging()`` on
+exit to flush the queue.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from src.observability.metrics import LOG_RECORDS_DROPPED_TOTAL
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Logger of the turns labelled by their extraction, the training data of the
+# turn gate (see src/infrastructure/services/turn_gate.py).
+TURN_LABEL_LOGGER = "src.use_cases.turn_labels"
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+chat_id_var: ContextVar[str | None] = ContextVar("chat_id", default=None)
+
+_listener: QueueListener | None = None
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the records below WARNING, by logger name prefix."""
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self._rates = dict(rates)
+        self._resolved: dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            parts = name.split(".")
+            for end in range(len(parts), 0, -1):
+                prefix = ".".join(parts[:end])
+                if prefix in self._rates:
+                    rate = self._rates[prefix]
+                    break
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        LOG_RECORDS_DROPPED_TOTAL.inc(reason="sampled")
+        return False
+
+
+class ContextFilter(logging.Filter):
+    """Attach the current request and chat ids unless given via ``extra``."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        if not hasattr(record, "chat_id"):
+            record.chat_id = chat_id_var.get()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that never blocks and defers formatting to the listener."""
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue is in-process, so the record is passed on unformatted;
+        # only tracebacks are rendered now, while the frames are still valid.
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED_TOTAL.inc(reason="queue_full")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with correlation ids."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "chat_id": getattr(record, "chat_id", None),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "text",
+    sample_rates: dict[str, float] | None = None,
+    queue_size: int = 10000,
+) -> None:
+    """
+    Route the root logger through a queue to a background listener.
+
+    Like ``logging.basicConfig``, does nothing if the root logger already
+    has handlers (e.g. configured by the embedding application).
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(
+        JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rates or {}))
+    handler.addFilter(ContextFilter())
+
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Stop the listener after writing the queued records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,401 @@
+"""In-process metrics with Prometheus text exposition.
+
+A deliberately small subset of the Prometheus client model (counters,
+gauges and histograms with labels), implemented on the standard library so that the
+instrumented layers stay dependency-free. Recording a sample costs a dict
+lookup, a bisect and a short critical section.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Iterable
+from contextvars import ContextVar
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], **extra) -> str:
+    pairs = [*zip(names, values, strict=True), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """Exposition lines of this metric, header included."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, tuple(labelnames))
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in values
+        ]
+
+
+class Gauge(_Metric):
+    """Value per label set that goes up and down."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, tuple(labelnames))
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in values
+        ]
+
+
+class _HistogramTimer:
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: "Histogram", labels: dict[str, str]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_HistogramTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, tuple(labelnames))
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last)], sum, count
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels: str) -> _HistogramTimer:
+        """Context manager observing the elapsed wall time of its block."""
+        return _HistogramTimer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = [(k, [list(s[0]), s[1], s[2]]) for k, s in self._values.items()]
+        lines = self._header()
+        for key, (bucket_counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(
+                (*self.buckets, float("inf")), bucket_counts, strict=True
+            ):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, le=_format_value(bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class StageHistogram(Histogram):
+    """
+    Histogram of request stages that also feeds the active request trace.
+
+    Tracing is off unless a middleware sets ``stage_trace_var`` (see
+    ``src.observability.profiling``): the extra cost is a context lookup.
+    """
+
+    def observe(self, value: float, **labels: str) -> None:
+        super().observe(value, **labels)
+        trace = stage_trace_var.get()
+        if trace is not None:
+            trace.append((labels.get("stage", ""), time.perf_counter() - value, value))
+
+
+# Stages of the current request: (stage, start perf_counter, duration).
+stage_trace_var: ContextVar[list[tuple[str, float, float]] | None] = ContextVar(
+    "stage_trace", default=None
+)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on ``/metrics``."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register[M: _Metric](self, metric: M) -> M:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Stages of request processing, labelled by ``stage``:
+# repository_get, repository_save, repository_get_all, repository_delete,
+# conversation_build, project_extraction, pbi_extraction, pbi_merge,
+# azdo_create, azdo_update, azdo_backlog_query, azdo_projects,
+# duplicate_check, backlog_sync, project_catalog_refresh,
+# search_index_update, session_search, session_pack, session_unpack,
+# pbi_shadow_extraction (the candidate of shadow evaluation).
+STAGE_DURATION_SECONDS = REGISTRY.register(
+    StageHistogram(
+        "pbi_stage_duration_seconds",
+        "Duration of each request processing stage.",
+        ("stage",),
+    )
+)
+
+HTTP_REQUEST_DURATION_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "End-to-end latency of HTTP requests by route template.",
+    ("method", "route", "status"),
+)
+
+LM_CALLS_TOTAL = REGISTRY.counter(
+    "lm_calls_total",
+    "Language model calls made by each extractor.",
+    ("extractor",),
+)
+
+LM_TOKENS_TOTAL = REGISTRY.counter(
+    "lm_tokens_total",
+    "Language model tokens by extractor and kind: prompt, completion, or cached "
+    "(prompt tokens served from the provider's context cache).",
+    ("extractor", "kind"),
+)
+
+ERRORS_TOTAL = REGISTRY.counter(
+    "pbi_errors_total",
+    "Errors by processing stage and exception type.",
+    ("stage", "type"),
+)
+
+BUDGET_EVENTS_TOTAL = REGISTRY.counter(
+    "session_budget_events_total",
+    "Extractions degraded or refused because a session exceeded its LM budget.",
+    ("outcome",),
+)
+
+LOG_RECORDS_DROPPED_TOTAL = REGISTRY.counter(
+    "log_records_dropped_total",
+    "Log records discarded by sampling or because the log queue was full.",
+    ("reason",),
+)
+
+LM_TRUNCATIONS_TOTAL = REGISTRY.counter(
+    "lm_truncations_total",
+    "Language model completions that reached their max_tokens limit.",
+    ("extractor",),
+)
+
+PROJECT_RESOLUTIONS_TOTAL = REGISTRY.counter(
+    "project_resolutions_total",
+    "Extracted project names by how they matched the project catalogue "
+    "(exact, normalized, fuzzy, unknown, unavailable).",
+    ("outcome",),
+)
+
+DEPENDENCY_CALLS_TOTAL = REGISTRY.counter(
+    "dependency_calls_total",
+    "Calls to external dependencies by outcome: success, error (not retried), "
+    "retry, failure (retries exhausted), ambiguous (a write that may have been "
+    "applied) or rejected (circuit breaker open).",
+    ("dependency", "outcome"),
+)
+
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "admission_in_flight",
+    "Admitted requests holding a worker slot, by priority.",
+    ("priority",),
+)
+
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "admission_queue_depth",
+    "Requests waiting for a worker slot, by priority.",
+    ("priority",),
+)
+
+ADMISSION_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "admission_queue_wait_seconds",
+    "Time admitted requests waited for a worker slot, by priority.",
+    ("priority",),
+)
+
+ADMISSION_SHED_TOTAL = REGISTRY.counter(
+    "admission_shed_total",
+    "Requests refused by admission control, by priority and reason: "
+    "queue_full, evicted (by higher priority work) or queue_timeout.",
+    ("priority", "reason"),
+)
+
+TURN_GATE_DECISIONS_TOTAL = REGISTRY.counter(
+    "turn_gate_decisions_total",
+    "User turns extracted or skipped (previous analysis reused) by the turn "
+    "gate, by the rule or model that decided.",
+    ("decision", "reason"),
+)
+
+SESSION_CONFLICTS_TOTAL = REGISTRY.counter(
+    "session_conflicts_total",
+    "Session saves refused because the session changed since it was read, by "
+    "operation and outcome: retried, failed (retries exhausted) or superseded "
+    "(analysis dropped for that of a later user message).",
+    ("operation", "outcome"),
+)
+
+SESSIONS_PACKED_TOTAL = REGISTRY.counter(
+    "sessions_packed_total",
+    "Sessions whose messages were compressed in memory, by reason: completed or idle.",
+    ("reason",),
+)
+
+SHADOW_EXTRACTIONS_TOTAL = REGISTRY.counter(
+    "shadow_extractions_total",
+    "PBI extractions sampled for shadow evaluation, by candidate pipeline and "
+    "outcome: compared, error (candidate raised) or dropped (too many pending).",
+    ("candidate", "outcome"),
+)
+
+SHADOW_LATENCY_SECONDS = REGISTRY.histogram(
+    "shadow_extraction_latency_seconds",
+    "Latency of the primary and candidate pipeline on the compared extractions.",
+    ("candidate", "pipeline"),
+)
+
+SHADOW_TOKENS_TOTAL = REGISTRY.counter(
+    "shadow_extraction_tokens_total",
+    "LM tokens of the primary and candidate pipeline on the compared "
+    "extractions, by kind: prompt or completion.",
+    ("candidate", "pipeline", "kind"),
+)
+
+SHADOW_AGREEMENT = REGISTRY.histogram(
+    "shadow_extraction_agreement",
+    "Set F1 of the candidate's PBIs against the primary's.",
+    ("candidate",),
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0),
+)
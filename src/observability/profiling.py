@@ -0,0 +1,219 @@
+"""On-demand diagnostics of a running process, for the admin endpoints.
+
+- ``sample_cpu_profile`` samples the stacks of every thread for a while
+  and returns them in the folded format of flamegraph.pl and speedscope.
+- ``MemoryProfiler`` runs tracemalloc between ``start`` and ``stop`` and
+  attributes the traced memory to the repository, the sessions and DSPy,
+  with the growth since the previous snapshot.
+- ``SlowRequestLog`` keeps, per route, the latest requests slower than a
+  threshold with the breakdown of their stages.
+
+Nothing runs until asked: sampling and tracemalloc only for the duration
+of a request to an admin endpoint, slow-request tracing only when its
+middleware is installed. Standard library only.
+"""
+
+import gc
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict, deque
+from datetime import UTC, datetime
+
+# Allocation sites attributed to a component, by path fragment. The frames
+# of a traceback are scanned from the innermost: the first match wins.
+MEMORY_COMPONENTS = (
+    ("repository", "src/infrastructure/repositories/"),
+    ("sessions", "src/domain/"),
+    ("dspy", "/dspy/"),
+    ("litellm", "/litellm/"),
+    ("application", "/src/"),
+)
+# Live objects counted by the memory snapshot, by module prefix.
+CENSUS_MODULES = ("src.domain.", "dspy.")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_qualname}"
+
+
+def sample_cpu_profile(duration_s: float, interval_s: float = 0.005) -> str:
+    """
+    Sample all thread stacks for ``duration_s`` seconds.
+
+    Returns one line per distinct stack, root first, with its sample count:
+    ``thread;module:func;module:func 42``.
+    """
+    samples: Counter[str] = Counter()
+    own_thread = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    deadline = time.monotonic() + duration_s
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            samples[";".join(reversed(stack))] += 1
+        time.sleep(interval_s)
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+def _component(traceback: tracemalloc.Traceback) -> str:
+    for frame in reversed(traceback):
+        filename = frame.filename.replace("\\", "/")
+        for component, fragment in MEMORY_COMPONENTS:
+            if fragment in filename:
+                return component
+    return "other"
+
+
+def _census() -> dict[str, int]:
+    """Live objects of the domain and DSPy classes, by class."""
+    counts: Counter[str] = Counter()
+    for obj in gc.get_objects():
+        module = type(obj).__module__
+        if isinstance(module, str) and module.startswith(CENSUS_MODULES):
+            counts[f"{module}.{type(obj).__qualname__}"] += 1
+    return dict(counts.most_common(30))
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots taken on demand, with their differences."""
+
+    def __init__(self):
+        self._previous: tracemalloc.Snapshot | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 25) -> None:
+        """Start tracing; allocations made before are not seen."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._previous = None
+
+    def stop(self) -> None:
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+
+    def snapshot(self, limit: int = 20) -> dict:
+        """
+        Traced memory by component and top allocation sites, with the growth
+        since the previous snapshot, and a census of live objects.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc is not tracing")
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+                )
+            )
+            previous, self._previous = self._previous, snapshot
+
+        components: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"size_bytes": 0, "count": 0, "growth_bytes": 0}
+        )
+        for stat in snapshot.statistics("traceback"):
+            component = components[_component(stat.traceback)]
+            component["size_bytes"] += stat.size
+            component["count"] += stat.count
+        if previous is not None:
+            for stat in snapshot.compare_to(previous, "traceback"):
+                components[_component(stat.traceback)]["growth_bytes"] += stat.size_diff
+
+        def site(stat) -> dict:
+            frame = stat.traceback[0]
+            return {
+                "site": f"{frame.filename}:{frame.lineno}",
+                "component": _component(stat.traceback),
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+
+        current, peak = tracemalloc.get_traced_memory()
+        result = {
+            "taken_at": datetime.now(UTC).isoformat(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "components": dict(components),
+            "top_sites": [site(stat) for stat in snapshot.statistics("lineno")[:limit]],
+            "objects": _census(),
+        }
+        if previous is not None:
+            result["top_growth"] = [
+                {**site(stat), "size_diff_bytes": stat.size_diff}
+                for stat in snapshot.compare_to(previous, "lineno")[:limit]
+            ]
+        return result
+
+
+class SlowRequestLog:
+    """Latest slow requests per route, with their stage breakdown."""
+
+    def __init__(self, threshold_s: float = 1.0, per_route: int = 20):
+        self.threshold_s = threshold_s
+        self._per_route = per_route
+        self._traces: dict[str, deque[dict]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        route: str,
+        method: str,
+        status: int,
+        start: float,
+        duration_s: float,
+        stages: list[tuple[str, float, float]],
+        request_id: str | None = None,
+    ) -> None:
+        """Keep the request if it is slow; ``stages`` as in ``stage_trace_var``."""
+        if duration_s < self.threshold_s:
+            return
+        trace = {
+            "request_id": request_id,
+            "method": method,
+            "status": status,
+            "finished_at": datetime.now(UTC).isoformat(),
+            "duration_ms": round(duration_s * 1000, 2),
+            "stages": [
+                {
+                    "stage": stage,
+                    "start_ms": round((stage_start - start) * 1000, 2),
+                    "duration_ms": round(stage_duration * 1000, 2),
+                }
+                for stage, stage_start, stage_duration in sorted(
+                    stages, key=lambda entry: entry[1]
+                )
+            ],
+        }
+        with self._lock:
+            traces = self._traces.get(route)
+            if traces is None:
+                traces = self._traces[route] = deque(maxlen=self._per_route)
+            traces.append(trace)
+
+    def dump(self, route: str | None = None) -> dict[str, list[dict]]:
+        """Traces by route, newest first."""
+        with self._lock:
+            return {
+                name: list(reversed(traces))
+                for name, traces in self._traces.items()
+                if route is None or name == route
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
@@ -8,34 +8,182 @@ This module demonstrates clean architecture principles:
 - Python philosophy (explicit, simple, readable)
 """
 
+import asyncio
+import contextlib
+import importlib
 import logging
+import math
+import threading
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from src.api import admin
+from src.api.admission import RequestShedError
+from src.api.dependencies import (
+    get_admin_settings,
+    get_azdo_breaker,
+    get_lm_breaker,
+    get_pbi_extraction_service,
+    get_project_catalog,
+    get_project_extraction_service,
+    get_repository,
+    get_settings,
+    get_slow_request_log,
+)
+from src.api.middleware import (
+    CorrelationIdMiddleware,
+    MetricsMiddleware,
+    SlowRequestMiddleware,
+)
 from src.api.routes import router as chat_router
+from src.config.settings import LoggingSettings
+from src.infrastructure.repositories.in_memory_chat_repository import (
+    InMemoryChatRepository,
+)
+from src.observability.logs import configure_logging
+from src.observability.metrics import ERRORS_TOTAL, REGISTRY
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Configure logging: formatting and I/O happen on a background thread
+_log_settings = LoggingSettings()
+configure_logging(
+    level=_log_settings.level,
+    fmt=_log_settings.format,
+    sample_rates=_log_settings.sample_rates,
+    queue_size=_log_settings.queue_size,
 )
 
 logger = logging.getLogger(__name__)
 
+# Heavy modules (dspy, litellm, Azure DevOps SDK) that the request path needs
+# eventually but that must not delay startup.
+WARM_UP_MODULES = (
+    "src.extractors.pbi",
+    "src.extractors.azdo",
+    "src.azdo_client",
+)
+# Chat sessions gone idle are looked for, and packed, this often.
+IDLE_SWEEP_INTERVAL_S = 60.0
+
+
+def _warm_up() -> None:
+    """Import heavy modules and load extraction programs in the background."""
+    for module_name in WARM_UP_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            logger.warning("Warm-up import of %s failed: %s", module_name, e)
+
+    # Build the cached extraction services so compiled program artifacts are
+    # loaded before the first request needs them.
+    for factory in (get_pbi_extraction_service, get_project_extraction_service):
+        try:
+            factory()
+        except Exception as e:
+            logger.warning("Warm-up of %s failed: %s", factory.__name__, e)
+
+    # Load the project catalogue before the first extraction resolves a name.
+    try:
+        catalog = get_project_catalog()
+        if catalog is not None:
+            catalog.refresh()
+    except Exception as e:
+        logger.warning("Warm-up of the project catalogue failed: %s", e)
+
+
+async def _pack_idle_sessions() -> None:
+    """Pack the idle chat sessions every ``IDLE_SWEEP_INTERVAL_S``."""
+    try:
+        idle_s = get_settings().session_pack_idle_after_s
+        repository = get_repository()
+    except Exception as e:
+        logger.warning("Idle session packing not started: %s", e)
+        return
+    if not idle_s or not isinstance(repository, InMemoryChatRepository):
+        return
+
+    while True:
+        await asyncio.sleep(IDLE_SWEEP_INTERVAL_S)
+        try:
+            await asyncio.to_thread(repository.pack_idle, idle_s)
+        except Exception as e:
+            ERRORS_TOTAL.inc(stage="session_pack", type=type(e).__name__)
+            logger.exception("Packing idle chat sessions failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start accepting requests immediately and warm up heavy imports."""
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+    idle_sweeps = asyncio.create_task(_pack_idle_sessions())
+    yield
+    idle_sweeps.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await idle_sweeps
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Azure DevOps PBI Extraction API",
     version="2.0.0",
     description="Clean Architecture implementation for conversational PBI extraction",
+    lifespan=lifespan,
 )
 
+app.add_middleware(MetricsMiddleware)
+
+# Admin diagnostics: nothing is installed unless enabled with a token.
+_admin_settings = get_admin_settings()
+if _admin_settings.enabled and _admin_settings.token:
+    app.add_middleware(SlowRequestMiddleware, log=get_slow_request_log())
+    app.include_router(admin.router)
+elif _admin_settings.enabled:
+    logger.warning("ADMIN_ENABLED is set without ADMIN_TOKEN: admin routes disabled")
+
+app.add_middleware(CorrelationIdMiddleware)
+
 # Include routers
 app.include_router(chat_router)
 
 
+@app.exception_handler(RequestShedError)
+async def request_shed_handler(request: Request, exc: RequestShedError):
+    """Refusal by admission control: the client should retry later."""
+    return JSONResponse(
+        {"detail": "Servizio sovraccarico: riprova tra qualche istante."},
+        status_code=exc.status_code,
+        headers={"Retry-After": str(math.ceil(exc.retry_after_s))},
+    )
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy", "version": "2.0.0"}
+    """
+    Health check endpoint, with the circuit breaker state of each dependency.
+
+    Answers 503 only while the LM breaker is open, when no message can be
+    analysed. With Azure DevOps down chat and reads still work: the replica
+    stays in rotation, reported as degraded.
+    """
+    lm_breaker = get_lm_breaker()
+    dependencies = {
+        breaker.name: breaker.snapshot() for breaker in (lm_breaker, get_azdo_breaker())
+    }
+    states = {dependency["state"] for dependency in dependencies.values()}
+    status = "healthy" if states == {"closed"} else "degraded"
+    return JSONResponse(
+        {"status": status, "version": "2.0.0", "dependencies": dependencies},
+        status_code=503 if dependencies[lm_breaker.name]["state"] == "open" else 200,
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus metrics endpoint."""
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 @app.get("/")
@@ -47,6 +195,7 @@ async def root():
         "architecture": "Clean Architecture",
         "docs": "/docs",
         "health": "/health",
+        "metrics": "/metrics",
     }
 
 
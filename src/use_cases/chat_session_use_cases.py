@@ -1,19 +1,129 @@
 """Use cases for chat session management."""
 
+import asyncio
+import copy
+import json
 import logging
+from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
-from src.domain.entities import ChatSession, MessageRole, SessionStatus
-from src.domain.repositories import ChatSessionRepository
+from src.domain.entities import (
+    PBI,
+    ChatSession,
+    ExtractionMode,
+    LMUsage,
+    MessageRole,
+    SessionAnalyticsReport,
+    SessionBudget,
+    SessionSearchResults,
+    SessionStatus,
+)
+from src.domain.pbi_matching import normalize_text
+from src.domain.repositories import (
+    AsyncChatSessionRepository,
+    ChatSessionRepository,
+    ConcurrentModificationError,
+)
 from src.domain.services import (
     AzureDevOpsService,
+    BacklogIndex,
+    DependencyUnavailableError,
     PBIExtractionService,
+    ProjectCatalog,
     ProjectExtractionService,
+    SessionAnalytics,
+    SessionSearchIndex,
+    TurnGate,
+    WorkItemSyncError,
+)
+from src.observability.logs import TURN_LABEL_LOGGER
+from src.observability.metrics import (
+    BUDGET_EVENTS_TOTAL,
+    SESSION_CONFLICTS_TOTAL,
+    STAGE_DURATION_SECONDS,
+    TURN_GATE_DECISIONS_TOTAL,
 )
 
 logger = logging.getLogger(__name__)
 
+_turn_label_logger = logging.getLogger(TURN_LABEL_LOGGER)
+
+# Further attempts of a change whose save found the session changed since it
+# was read (see ChatSessionRepository.save).
+CONFLICT_RETRIES = 3
+# Margin for the clock difference with Azure DevOps when looking for work
+# items whose creation had an unknown outcome.
+CREATE_LOOKUP_MARGIN = timedelta(minutes=5)
+
+
+def _retry_conflict(operation: str, attempt: int) -> bool:
+    """Whether to retry after a save conflict on attempt ``attempt``."""
+    retry = attempt < CONFLICT_RETRIES
+    SESSION_CONFLICTS_TOTAL.inc(
+        operation=operation, outcome="retried" if retry else "failed"
+    )
+    return retry
+
+
+def _found(session: ChatSession | None, chat_id: UUID) -> ChatSession:
+    """``session``, or ValueError if it does not exist."""
+    if not session:
+        raise ValueError(f"Chat session not found: {chat_id}")
+    return session
+
+
+def _superseded(latest: ChatSession, turn: int) -> bool:
+    """
+    Whether a user message came after the one at index ``turn``.
+
+    Its analysis, saved or still running, covers the conversation up to it:
+    the analysis of ``turn`` is then not saved, only returned.
+    """
+    superseded = any(
+        message.role == MessageRole.USER for message in latest.messages[turn + 1 :]
+    )
+    if superseded:
+        SESSION_CONFLICTS_TOTAL.inc(operation="analysis", outcome="superseded")
+    return superseded
+
+
+def _update(
+    repository: ChatSessionRepository,
+    chat_id: UUID,
+    change: Callable[[ChatSession], object],
+    operation: str,
+) -> ChatSession:
+    """Apply ``change`` to the latest session and save it, retrying on conflict."""
+    for attempt in range(CONFLICT_RETRIES + 1):
+        session = _found(repository.get_by_id(chat_id), chat_id)
+        change(session)
+        try:
+            repository.save(session)
+            return session
+        except ConcurrentModificationError:
+            if not _retry_conflict(operation, attempt):
+                raise
+
+
+async def _update_async(
+    repository: AsyncChatSessionRepository,
+    chat_id: UUID,
+    change: Callable[[ChatSession], object],
+    operation: str,
+) -> ChatSession:
+    """``_update`` awaiting the repository."""
+    for attempt in range(CONFLICT_RETRIES + 1):
+        session = _found(await repository.get_by_id(chat_id), chat_id)
+        change(session)
+        try:
+            await repository.save(session)
+            return session
+        except ConcurrentModificationError:
+            if not _retry_conflict(operation, attempt):
+                raise
+
 
 @dataclass
 class CreateChatSessionUseCase:
@@ -25,65 +135,165 @@ class CreateChatSessionUseCase:
         """Execute the use case."""
         session = ChatSession()
         self.repository.save(session)
-        logger.info(f"Created chat session: {session.chat_id}")
+        logger.info("Created chat session: %s", session.chat_id)
         return session
 
 
 @dataclass
-class AddMessageUseCase:
-    """Add a message to a chat session."""
+class AsyncCreateChatSessionUseCase:
+    """Create a new chat session, awaiting the repository."""
 
-    repository: ChatSessionRepository
-    pbi_extraction: PBIExtractionService
-    project_extraction: ProjectExtractionService
+    repository: AsyncChatSessionRepository
 
-    def execute(
-        self, chat_id: UUID, role: MessageRole, content: str
-    ) -> tuple[ChatSession, str | None]:
-        """
-        Execute the use case.
+    async def execute(self) -> ChatSession:
+        """Execute the use case."""
+        session = ChatSession()
+        await self.repository.save(session)
+        logger.info("Created chat session: %s", session.chat_id)
+        return session
 
-        Returns:
-            tuple: (updated_session, assistant_response)
-        """
-        session = self.repository.get_by_id(chat_id)
-        if not session:
-            raise ValueError(f"Chat session not found: {chat_id}")
 
-        # Add the message
-        session.add_message(role, content)
-        self.repository.save(session)
+@dataclass
+class _Extraction:
+    """Extractors' result on a conversation, applied to the session after."""
 
-        # If it's a user message, analyze and generate assistant response
-        if role == MessageRole.USER:
-            assistant_response = self._analyze_and_respond(session)
+    conversation: str
+    project: str | None
+    # As extracted: the session gets copies.
+    pbis: list[PBI]
+    usage: LMUsage
 
-            # Add assistant response to session
-            if assistant_response:
-                session.add_message(MessageRole.ASSISTANT, assistant_response)
-                self.repository.save(session)
 
-            return session, assistant_response
+class _MessageAnalysis:
+    """
+    Analysis of a user turn, shared by the sync and async use cases.
 
-        return session, None
+    Works on the session only: the repository is left to the caller.
+    """
 
-    def _analyze_and_respond(self, session: ChatSession) -> str:
-        """Analyze session and generate appropriate response."""
-        if not session.is_ready_for_extraction():
-            return "Come posso aiutarti con l'estrazione di PBI?"
+    pbi_extraction: PBIExtractionService
+    project_extraction: ProjectExtractionService
+    budget: SessionBudget | None
+    backlog_index: BacklogIndex | None
+    project_catalog: ProjectCatalog | None
+    turn_gate: TurnGate | None
+    log_turn_labels: bool
+
+    def _analyze_and_respond(
+        self, session: ChatSession, previous: _Extraction | None = None
+    ) -> tuple[str, _Extraction | None]:
+        """
+        Analyze session and generate appropriate response.
 
-        conversation = session.get_conversation_history()
+        ``previous`` is the extraction of an attempt whose save conflicted:
+        it is applied again, without LM calls, if the conversation is the
+        same. Returns the response and the extraction it is based on, if any.
+        """
+        if not session.is_ready_for_extraction():
+            return "Come posso aiutarti con l'estrazione di PBI?", None
+
+        with STAGE_DURATION_SECONDS.time(stage="conversation_build"):
+            conversation = session.get_conversation_history()
+        if previous is not None and previous.conversation == conversation:
+            return self._apply_extraction(session, previous), previous
+
+        extraction = self._extract(session, conversation)
+        if isinstance(extraction, str):
+            return extraction, None
+        return self._apply_extraction(session, extraction), extraction
+
+    def _extract(self, session: ChatSession, conversation: str) -> _Extraction | str:
+        """Run the extractors, or return the reply of a turn not extracted."""
+        message = session.messages[-1].content
+        if self.turn_gate is not None:
+            if session.last_analysis is None:
+                TURN_GATE_DECISIONS_TOTAL.inc(decision="extract", reason="no_analysis")
+            elif not self.turn_gate.should_extract(message, session):
+                # Nothing new for the extractors: same result, same reply.
+                return session.last_analysis
+
+        mode = (
+            self.budget.extraction_mode(session.lm_usage)
+            if self.budget
+            else ExtractionMode.FULL
+        )
+        if mode is None:
+            BUDGET_EVENTS_TOTAL.inc(outcome="refused")
+            logger.warning(
+                "LM budget exhausted for chat %s: %s",
+                session.chat_id,
+                repr(session.lm_usage),
+            )
+            return "Questa sessione ha raggiunto il limite di utilizzo del modello. Conferma i PBI già estratti o avvia una nuova sessione."
+        if mode == ExtractionMode.ECONOMY:
+            BUDGET_EVENTS_TOTAL.inc(outcome="degraded")
 
         # Extract information
-        project = self.project_extraction.extract_project(conversation)
-        pbis = self.pbi_extraction.extract_pbis(conversation)
+        usage = LMUsage()
+        try:
+            if mode == ExtractionMode.ECONOMY and session.project is not None:
+                # Save a call: the project rarely changes once identified.
+                project = session.project
+            else:
+                project = self.project_extraction.extract_project(
+                    conversation, usage, mode
+                )
+            pbis = self.pbi_extraction.extract_pbis(conversation, usage, mode)
+        except DependencyUnavailableError as e:
+            # The next message re-extracts from the whole conversation.
+            session.record_lm_usage(usage)
+            logger.warning("Extraction skipped for chat %s: %s", session.chat_id, e)
+            return "Il servizio di analisi non è al momento disponibile. Riprova tra qualche istante: terrò conto di tutta la conversazione."
+        return _Extraction(conversation, project, pbis, usage)
+
+    def _apply_extraction(self, session: ChatSession, extraction: _Extraction) -> str:
+        """Update the session with an extraction and reply to the turn."""
+        project = extraction.project
+        pbis = [copy.copy(pbi) for pbi in extraction.pbis]
+        message = session.messages[-1].content
+
+        # Catch misspelt or unknown projects now rather than at confirmation.
+        unknown_project = None
+        if project is not None and self.project_catalog:
+            resolved = self.project_catalog.resolve(project)
+            if resolved is None:
+                unknown_project = project
+            project = resolved
 
         # Update session
+        previous_project = session.project
+        session.record_lm_usage(extraction.usage)
         session.update_extraction(project, pbis)
+        if self.log_turn_labels:
+            changed = session.project != previous_project or any(
+                (
+                    session.pbi_diff.added,
+                    session.pbi_diff.changed,
+                    session.pbi_diff.removed,
+                )
+            )
+            _turn_label_logger.info(
+                "%s",
+                json.dumps(
+                    {"text": message, "informative": changed}, ensure_ascii=False
+                ),
+            )
+
+        session.last_analysis = self._respond(session, project, unknown_project)
+        return session.last_analysis
+
+    def _respond(
+        self, session: ChatSession, project: str | None, unknown_project: str | None
+    ) -> str:
+        """Reply to an analysed turn and update the session status."""
 
         # Determine response based on what's missing
         if session.needs_project_info():
             session.update_status(SessionStatus.NEEDS_INFO)
+            if unknown_project is not None:
+                return _unknown_project_message(
+                    unknown_project, self.project_catalog.suggest(unknown_project)
+                )
             return "Non ho identificato il progetto Azure DevOps. Puoi specificare il nome del progetto?"
 
         if session.needs_requirements():
@@ -93,87 +303,463 @@ class AddMessageUseCase:
         # All info present - ready for confirmation
         session.update_status(SessionStatus.READY_FOR_CONFIRMATION)
         session.awaiting_confirmation = True
+        if self.backlog_index:
+            session.duplicates = self.backlog_index.find_duplicates(
+                project, session.pbis_to_create()
+            )
 
         pbi_summary = "\n".join(
-            f"{i + 1}. {pbi.title}" for i, pbi in enumerate(session.pbis)
+            f"{i + 1}. {pbi.title}{_sync_note(pbi)}{_duplicate_note(session, pbi)}"
+            for i, pbi in enumerate(session.pbis)
         )
+        if session.duplicates:
+            pbi_summary += f"\n\nAttenzione: {len(session.duplicates)} PBI potrebbero essere già presenti nel backlog del progetto."
 
         return f"Perfetto! Ho identificato il progetto '{project}' e ho estratto {len(session.pbis)} PBI:\n\n{pbi_summary}\n\nVuoi che proceda con la creazione di questi PBI in Azure DevOps? (Usa l'endpoint /chat/sessions/{session.chat_id}/confirm per confermare)"
 
 
 @dataclass
-class ConfirmPBICreationUseCase:
-    """Confirm and create PBIs in Azure DevOps."""
+class AddMessageUseCase(_MessageAnalysis):
+    """Add a message to a chat session."""
 
     repository: ChatSessionRepository
-    azdo_service: AzureDevOpsService
-    organization: str
+    pbi_extraction: PBIExtractionService
+    project_extraction: ProjectExtractionService
+    budget: SessionBudget | None = None
+    backlog_index: BacklogIndex | None = None
+    project_catalog: ProjectCatalog | None = None
+    turn_gate: TurnGate | None = None
+    # Log each extracted turn with whether it changed the extraction. The
+    # records contain the message text.
+    log_turn_labels: bool = False
 
-    def execute(self, chat_id: UUID, confirmed: bool) -> tuple[bool, str]:
+    def execute(
+        self, chat_id: UUID, role: MessageRole, content: str
+    ) -> tuple[ChatSession, str | None]:
         """
         Execute the use case.
 
         Returns:
-            tuple: (success, message)
+            tuple: (updated_session, assistant_response)
         """
-        session = self.repository.get_by_id(chat_id)
-        if not session:
-            raise ValueError(f"Chat session not found: {chat_id}")
+        # Add the message
+        session = _update(
+            self.repository,
+            chat_id,
+            lambda session: session.add_message(role, content),
+            "add_message",
+        )
 
-        if not session.awaiting_confirmation:
-            raise ValueError(
-                "This session is not awaiting confirmation. Add messages with requirements first."
+        # If it's a user message, analyze and generate assistant response
+        if role != MessageRole.USER:
+            return session, None
+
+        turn = len(session.messages) - 1
+        extraction = None
+        for attempt in range(CONFLICT_RETRIES + 1):
+            assistant_response, extraction = self._analyze_and_respond(
+                session, extraction
             )
 
-        if not confirmed:
-            # User rejected - reset status
-            session.update_status(SessionStatus.ACTIVE)
-            session.awaiting_confirmation = False
-            session.add_message(
-                MessageRole.ASSISTANT,
-                "Ok, nessun problema. Puoi modificare o aggiungere ulteriori requisiti.",
+            # Add assistant response to session
+            if assistant_response:
+                session.add_message(MessageRole.ASSISTANT, assistant_response)
+            try:
+                self.repository.save(session)
+                return session, assistant_response
+            except ConcurrentModificationError:
+                latest = _found(self.repository.get_by_id(chat_id), chat_id)
+                if _superseded(latest, turn):
+                    return latest, assistant_response
+                if not _retry_conflict("analysis", attempt):
+                    raise
+                # Changed meanwhile: apply the extraction to the latest
+                # session, extracting again only if its conversation differs.
+                session = latest
+
+
+@dataclass
+class AsyncAddMessageUseCase(_MessageAnalysis):
+    """
+    Add a message to a chat session, awaiting the repository.
+
+    The analysis calls the LM synchronously: it runs on a worker thread,
+    with the caller's context.
+    """
+
+    repository: AsyncChatSessionRepository
+    pbi_extraction: PBIExtractionService
+    project_extraction: ProjectExtractionService
+    budget: SessionBudget | None = None
+    backlog_index: BacklogIndex | None = None
+    project_catalog: ProjectCatalog | None = None
+    turn_gate: TurnGate | None = None
+    log_turn_labels: bool = False
+
+    async def execute(
+        self, chat_id: UUID, role: MessageRole, content: str
+    ) -> tuple[ChatSession, str | None]:
+        """
+        Execute the use case.
+
+        Returns:
+            tuple: (updated_session, assistant_response)
+        """
+        session = await _update_async(
+            self.repository,
+            chat_id,
+            lambda session: session.add_message(role, content),
+            "add_message",
+        )
+        if role != MessageRole.USER:
+            return session, None
+
+        turn = len(session.messages) - 1
+        extraction = None
+        for attempt in range(CONFLICT_RETRIES + 1):
+            assistant_response, extraction = await asyncio.to_thread(
+                self._analyze_and_respond, session, extraction
             )
-            self.repository.save(session)
-            return (
-                True,
-                "Creazione PBI annullata. Puoi continuare a modificare i requisiti.",
+            if assistant_response:
+                session.add_message(MessageRole.ASSISTANT, assistant_response)
+            try:
+                await self.repository.save(session)
+                return session, assistant_response
+            except ConcurrentModificationError:
+                latest = _found(await self.repository.get_by_id(chat_id), chat_id)
+                if _superseded(latest, turn):
+                    return latest, assistant_response
+                if not _retry_conflict("analysis", attempt):
+                    raise
+                session = latest
+
+
+def _unknown_project_message(name: str, suggestions: list[str]) -> str:
+    """Ask for a valid project name, offering the closest existing ones."""
+    message = f"Il progetto '{name}' non esiste nell'organizzazione Azure DevOps."
+    if suggestions:
+        names = ", ".join(f"'{suggestion}'" for suggestion in suggestions)
+        message += f" Forse intendevi {names}?"
+    return f"{message} Puoi indicare il nome corretto del progetto?"
+
+
+def _sync_note(pbi: PBI) -> str:
+    """Suffix telling whether a PBI already has a work item."""
+    if pbi.work_item_id is None:
+        return ""
+    if pbi.needs_update():
+        return f" (da aggiornare, #{pbi.work_item_id})"
+    return f" (già creato, #{pbi.work_item_id})"
+
+
+def _duplicate_note(session: ChatSession, pbi: PBI) -> str:
+    """Suffix pointing at the most similar existing work item, if any."""
+    candidates = session.duplicates.get(pbi.id)
+    if not candidates:
+        return ""
+    best = candidates[0]
+    return f" (possibile duplicato di #{best.work_item_id} «{best.title}»)"
+
+
+class _PBIConfirmation:
+    """
+    Confirmation of the extracted PBIs, shared by the sync and async use
+    cases. Works on the session only: the repository is left to the caller.
+    """
+
+    azdo_service: AzureDevOpsService
+    organization: str
+    backlog_index: BacklogIndex | None
+
+    @staticmethod
+    def _check(session: ChatSession, confirmed: bool) -> None:
+        """Raise ValueError unless the session can be confirmed or rejected now."""
+        if not session.awaiting_confirmation:
+            raise ValueError(
+                "This session is not awaiting confirmation. Add messages with requirements first."
             )
 
-        # User confirmed - create PBIs
-        if not session.is_complete():
+        if confirmed and not session.is_complete():
             raise ValueError("Missing information. Project or PBIs not identified.")
 
-        try:
-            self.azdo_service.create_pbis(
-                session.pbis, self.organization, session.project
+    def _reject(self, session: ChatSession) -> None:
+        self._check(session, False)
+        # User rejected - reset status
+        session.update_status(SessionStatus.ACTIVE)
+        session.awaiting_confirmation = False
+        session.last_analysis = None
+        session.add_message(
+            MessageRole.ASSISTANT,
+            "Ok, nessun problema. Puoi modificare o aggiungere ulteriori requisiti.",
+        )
+
+    def _claim(self, session: ChatSession) -> None:
+        """Take the confirmation: once saved, a concurrent one fails the check."""
+        self._check(session, True)
+        session.awaiting_confirmation = False
+
+    @staticmethod
+    def _carry_over(outcome: ChatSession, latest: ChatSession) -> None:
+        """
+        Apply the outcome of a confirmation to the session as changed since.
+
+        Only the work items and the reply are taken from the outcome. The
+        work items go to the PBIs with the same ids, which then show up as
+        to update if their content changed meanwhile. A message analysed
+        meanwhile keeps the status, analysis and duplicates it set.
+        """
+        synced = {pbi.id: pbi for pbi in outcome.pbis}
+        for pbi in (*latest.pbis, *latest.retired_pbis):
+            done = synced.get(pbi.id)
+            if done is None:
+                continue
+            if done.work_item_id is not None:
+                pbi.work_item_id = done.work_item_id
+                pbi.synced_fingerprint = done.synced_fingerprint
+            pbi.create_attempted_at = done.create_attempted_at
+        latest.messages.append(outcome.messages[-1])
+
+        # Left at READY_FOR_CONFIRMATION by the claim, or by an analysis that
+        # presented the PBIs again.
+        if latest.status != SessionStatus.READY_FOR_CONFIRMATION:
+            return
+        if latest.pbis_to_create() or latest.pbis_to_update():
+            # Some are not synced: they can be confirmed again.
+            latest.awaiting_confirmation = True
+            if outcome.status == SessionStatus.ERROR:
+                latest.update_status(SessionStatus.ERROR)
+        else:
+            latest.update_status(SessionStatus.COMPLETED)
+            latest.awaiting_confirmation = False
+            latest.last_analysis = None
+
+    def _find_uncertain_creations(self, session: ChatSession) -> None:
+        """
+        Link the PBIs whose creation had an unknown outcome to their work item.
+
+        The work items changed since the attempt are looked up by title. A
+        PBI found gets the work item, synced with the content found (so that
+        it is updated if it differs); the others are created again.
+        """
+        uncertain = [
+            pbi
+            for pbi in session.pbis_to_create()
+            if pbi.create_attempted_at is not None
+        ]
+        if not uncertain:
+            return
+        since = min(pbi.create_attempted_at for pbi in uncertain)
+        linked = {pbi.work_item_id for pbi in (*session.pbis, *session.retired_pbis)}
+        items = {}
+        for item in self.azdo_service.fetch_backlog_items(
+            self.organization, session.project, since - CREATE_LOOKUP_MARGIN
+        ):
+            if not item.removed and item.work_item_id not in linked:
+                items.setdefault(normalize_text(item.title), item)
+        for pbi in uncertain:
+            item = items.pop(normalize_text(pbi.title), None)
+            if item is None:
+                continue
+            pbi.work_item_id = item.work_item_id
+            pbi.synced_fingerprint = item.fingerprint()
+            pbi.create_attempted_at = None
+            logger.info(
+                "PBI %s of chat %s was created as work item %d",
+                pbi.id,
+                session.chat_id,
+                item.work_item_id,
             )
 
+    def _confirm(self, session: ChatSession) -> tuple[bool, str]:
+        """Create and update the work items of a claimed session."""
+        try:
+            self._find_uncertain_creations(session)
+            # User confirmed - create new PBIs and update the changed ones only
+            to_create = session.pbis_to_create()
+            to_update = session.pbis_to_update()
+            if self.backlog_index:
+                # The index may have synced since the PBIs were presented.
+                session.duplicates = self.backlog_index.find_duplicates(
+                    session.project, to_create
+                )
+
+            if to_update:
+                self.azdo_service.update_pbis(
+                    to_update, self.organization, session.project
+                )
+                for pbi in to_update:
+                    pbi.mark_synced()
+            if to_create:
+                # Stays empty if the creation fails without a WorkItemSyncError.
+                work_item_ids: list[int] = []
+                attempted_at = datetime.now(UTC)
+                try:
+                    work_item_ids = self.azdo_service.create_pbis(
+                        to_create, self.organization, session.project
+                    )
+                except WorkItemSyncError as e:
+                    # Keep the work items created before the failure, so that
+                    # a retry does not create them again.
+                    work_item_ids = e.created_ids
+                    if e.outcome_unknown:
+                        # Looked for before creating it again.
+                        to_create[len(work_item_ids)].create_attempted_at = attempted_at
+                    raise
+                finally:
+                    for pbi, work_item_id in zip(to_create, work_item_ids):
+                        pbi.mark_synced(work_item_id)
+                    if self.backlog_index:
+                        self.backlog_index.record_work_items(
+                            session.project, to_create[: len(work_item_ids)]
+                        )
+
             session.update_status(SessionStatus.COMPLETED)
             session.awaiting_confirmation = False
-            session.add_message(
-                MessageRole.ASSISTANT,
-                f"Perfetto! Ho creato {len(session.pbis)} PBI nel progetto '{session.project}' in Azure DevOps.",
-            )
-            self.repository.save(session)
+            session.last_analysis = None
+            if to_create or to_update:
+                changes = _describe_sync(len(to_create), len(to_update))
+                done = _describe_sync(
+                    len(to_create), len(to_update), ("creati", "aggiornati")
+                )
+                assistant_message = f"Perfetto! Ho {changes} nel progetto '{session.project}' in Azure DevOps."
+                result_message = f"Sincronizzazione completata nel progetto '{session.project}': {done}."
+                if session.duplicates:
+                    result_message += f" Attenzione: {len(session.duplicates)} PBI creati potrebbero duplicare work item esistenti."
+            else:
+                assistant_message = f"I PBI sono già aggiornati nel progetto '{session.project}' in Azure DevOps."
+                result_message = f"Nessun PBI da creare o aggiornare nel progetto '{session.project}'."
+            session.add_message(MessageRole.ASSISTANT, assistant_message)
 
             logger.info(
-                f"Successfully created {len(session.pbis)} PBIs for chat {chat_id}"
+                "Synced PBIs for chat %s: %d created, %d updated",
+                session.chat_id,
+                len(to_create),
+                len(to_update),
             )
 
+            return True, result_message
+
+        except Exception as e:
+            logger.error("Error creating PBIs: %s", e, exc_info=True)
+            session.update_status(SessionStatus.ERROR)
+            # Give the claim back: confirming again creates the work items
+            # that are missing only.
+            session.awaiting_confirmation = True
+            if isinstance(e, WorkItemSyncError) and e.outcome_unknown:
+                assistant_message = "Azure DevOps non ha confermato la creazione di un PBI: alla prossima conferma verrà cercato nel backlog prima di crearlo di nuovo."
+            else:
+                assistant_message = "Si è verificato un errore durante la creazione dei PBI. Riprova più tardi."
+            session.add_message(MessageRole.ASSISTANT, assistant_message)
+            raise
+
+
+@dataclass
+class ConfirmPBICreationUseCase(_PBIConfirmation):
+    """Confirm and create PBIs in Azure DevOps."""
+
+    repository: ChatSessionRepository
+    azdo_service: AzureDevOpsService
+    organization: str
+    backlog_index: BacklogIndex | None = None
+
+    def execute(self, chat_id: UUID, confirmed: bool) -> tuple[bool, str]:
+        """
+        Execute the use case.
+
+        Returns:
+            tuple: (success, message)
+        """
+        if not confirmed:
+            _update(self.repository, chat_id, self._reject, "confirm")
             return (
                 True,
-                f"Creati con successo {len(session.pbis)} PBI nel progetto '{session.project}'.",
+                "Creazione PBI annullata. Puoi continuare a modificare i requisiti.",
             )
 
-        except Exception as e:
-            logger.error(f"Error creating PBIs: {e}", exc_info=True)
-            session.update_status(SessionStatus.ERROR)
-            session.add_message(
-                MessageRole.ASSISTANT,
-                "Si è verificato un errore durante la creazione dei PBI. Riprova più tardi.",
+        session = _update(self.repository, chat_id, self._claim, "confirm")
+        try:
+            return self._confirm(session)
+        finally:
+            # Saved on failure too: the error status and the work items
+            # created before it.
+            self._save_outcome(session)
+
+    def _save_outcome(self, session: ChatSession) -> None:
+        outcome = session
+        for attempt in range(CONFLICT_RETRIES + 1):
+            try:
+                self.repository.save(session)
+                return
+            except ConcurrentModificationError:
+                if not _retry_conflict("confirm", attempt):
+                    raise
+                session = self.repository.get_by_id(outcome.chat_id)
+                if session is None:
+                    logger.warning("Chat %s deleted while confirming", outcome.chat_id)
+                    return
+                self._carry_over(outcome, session)
+
+
+@dataclass
+class AsyncConfirmPBICreationUseCase(_PBIConfirmation):
+    """
+    Confirm and create PBIs in Azure DevOps, awaiting the repository.
+
+    The Azure DevOps calls are synchronous: they run on a worker thread,
+    with the caller's context.
+    """
+
+    repository: AsyncChatSessionRepository
+    azdo_service: AzureDevOpsService
+    organization: str
+    backlog_index: BacklogIndex | None = None
+
+    async def execute(self, chat_id: UUID, confirmed: bool) -> tuple[bool, str]:
+        """
+        Execute the use case.
+
+        Returns:
+            tuple: (success, message)
+        """
+        if not confirmed:
+            await _update_async(self.repository, chat_id, self._reject, "confirm")
+            return (
+                True,
+                "Creazione PBI annullata. Puoi continuare a modificare i requisiti.",
             )
-            self.repository.save(session)
-            raise
+
+        session = await _update_async(self.repository, chat_id, self._claim, "confirm")
+        try:
+            return await asyncio.to_thread(self._confirm, session)
+        finally:
+            await self._save_outcome(session)
+
+    async def _save_outcome(self, session: ChatSession) -> None:
+        outcome = session
+        for attempt in range(CONFLICT_RETRIES + 1):
+            try:
+                await self.repository.save(session)
+                return
+            except ConcurrentModificationError:
+                if not _retry_conflict("confirm", attempt):
+                    raise
+                session = await self.repository.get_by_id(outcome.chat_id)
+                if session is None:
+                    logger.warning("Chat %s deleted while confirming", outcome.chat_id)
+                    return
+                self._carry_over(outcome, session)
+
+
+def _describe_sync(
+    created: int, updated: int, verbs: tuple[str, str] = ("creato", "aggiornato")
+) -> str:
+    """Italian summary of a sync, e.g. "creato 2 PBI e aggiornato 1 PBI"."""
+    parts = []
+    if created:
+        parts.append(f"{verbs[0]} {created} PBI")
+    if updated:
+        parts.append(f"{verbs[1]} {updated} PBI")
+    return " e ".join(parts)
 
 
 @dataclass
@@ -207,3 +793,60 @@ class DeleteChatSessionUseCase:
     def execute(self, chat_id: UUID) -> bool:
         """Execute the use case."""
         return self.repository.delete(chat_id)
+
+
+@dataclass
+class SearchChatSessionsUseCase:
+    """Search chat sessions by the words of their messages, PBIs and project."""
+
+    search_index: SessionSearchIndex
+
+    def execute(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> SessionSearchResults:
+        """Execute the use case."""
+        return self.search_index.search(query, limit=limit, offset=offset)
+
+
+@dataclass
+class GetSessionAnalyticsUseCase:
+    """Report aggregate figures about the chat sessions."""
+
+    analytics: SessionAnalytics
+
+    def execute(self) -> SessionAnalyticsReport:
+        """Execute the use case."""
+        return self.analytics.report()
+
+
+@dataclass
+class AsyncGetChatSessionUseCase:
+    """Retrieve a chat session, awaiting the repository."""
+
+    repository: AsyncChatSessionRepository
+
+    async def execute(self, chat_id: UUID) -> ChatSession | None:
+        """Execute the use case."""
+        return await self.repository.get_by_id(chat_id)
+
+
+@dataclass
+class AsyncListChatSessionsUseCase:
+    """List all chat sessions, awaiting the repository."""
+
+    repository: AsyncChatSessionRepository
+
+    async def execute(self) -> list[ChatSession]:
+        """Execute the use case."""
+        return await self.repository.get_all()
+
+
+@dataclass
+class AsyncDeleteChatSessionUseCase:
+    """Delete a chat session, awaiting the repository."""
+
+    repository: AsyncChatSessionRepository
+
+    async def execute(self, chat_id: UUID) -> bool:
+        """Execute the use case."""
+        return await self.repository.delete(chat_id)